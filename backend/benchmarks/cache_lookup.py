@@ -0,0 +1,107 @@
+"""Compare pokemon_cache lookup latency on embedded SQLite and on Postgres.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.cache_lookup
+    python -m backend.benchmarks.cache_lookup --postgres-url postgresql+asyncpg://...
+
+SQLite runs against a temporary file. Postgres is only benchmarked when a URL
+is given; point it at a scratch database, since the benchmark migrates it and
+writes rows named bench-* into pokemon_cache.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from alembic import command
+from alembic.config import Config
+from backend.benchmarks.response_serialization import sample_pokemon_data
+from backend.db.database import create_engine
+from backend.db.storage import PokemonStore
+
+RECORDS = 1000
+LOOKUPS = 2000
+BATCH_SIZE = 10
+
+
+def migrate(url: str) -> None:
+    os.environ["DATABASE_URL"] = url
+    command.upgrade(Config("backend/db/migrations/alembic.ini"), "head")
+
+
+def sample_records() -> list[dict]:
+    template = sample_pokemon_data()
+    return [
+        {**template, "id": 100_000 + i, "name": f"bench-{i:04d}"}
+        for i in range(RECORDS)
+    ]
+
+
+async def time_calls(call, count: int) -> list[float]:
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def describe(timings: list[float]) -> str:
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"{statistics.median(ordered):>10.0f} {p95:>10.0f}"
+
+
+async def benchmark(name: str, url: str) -> None:
+    engine = create_engine(url)
+    store = PokemonStore(engine)
+    records = sample_records()
+    names = [record["name"] for record in records]
+    rng = random.Random(0)
+
+    try:
+        for start in range(0, RECORDS, 100):
+            await store.upsert_pokemon(records[start : start + 100])
+
+        # Warm up connections and caches before timing
+        await time_calls(lambda: store.get_pokemon(rng.choice(names)), 100)
+
+        single = await time_calls(lambda: store.get_pokemon(rng.choice(names)), LOOKUPS)
+        batch = await time_calls(
+            lambda: store.get_many_pokemon(rng.sample(names, BATCH_SIZE)),
+            LOOKUPS // 10,
+        )
+        upsert = await time_calls(
+            lambda: store.upsert_pokemon([rng.choice(records)]), LOOKUPS // 10
+        )
+    finally:
+        await engine.dispose()
+
+    print(f"{name + ' get':<22} {describe(single)}")
+    print(f"{name + f' get_many({BATCH_SIZE})':<22} {describe(batch)}")
+    print(f"{name + ' upsert':<22} {describe(upsert)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--postgres-url")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        backends = {"sqlite": f"sqlite+aiosqlite:///{directory}/bench.db"}
+        if args.postgres_url:
+            backends["postgres"] = args.postgres_url
+
+        print(f"{'operation':<22} {'p50 us':>10} {'p95 us':>10}")
+        for name, url in backends.items():
+            migrate(url)
+            asyncio.run(benchmark(name, url))
+
+
+if __name__ == "__main__":
+    main()
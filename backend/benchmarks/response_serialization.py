@@ -0,0 +1,123 @@
+"""Compare per-response CPU and bytes for the chat response encoders.
+
+Run from the repository root:
+
+    python -m backend.benchmarks.response_serialization
+"""
+
+import gzip
+import json
+import timeit
+
+import brotli
+import msgspec
+from backend.web_service.app.schemas import (
+    ChatResponse,
+    Section,
+    StructuredData,
+    to_pokemon_data,
+)
+
+ITERATIONS = 20_000
+SPRITE_BASE = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+
+
+def sample_pokemon_data() -> dict:
+    """A get_basic_pokemon_data result with the full set of 16 sprites."""
+    sprite_keys = [
+        "default",
+        "shiny",
+        "female",
+        "shiny_female",
+        "back_default",
+        "back_shiny",
+        "back_female",
+        "back_shiny_female",
+    ]
+    return {
+        "id": 25,
+        "name": "pikachu",
+        "height": 4,
+        "weight": 60,
+        "types": ["electric"],
+        "abilities": ["static", "lightning-rod"],
+        "base_stats": {
+            "hp": 35,
+            "attack": 55,
+            "defense": 40,
+            "special-attack": 50,
+            "special-defense": 50,
+            "speed": 90,
+        },
+        "sprites": {key: f"{SPRITE_BASE}/{key}/25.png" for key in sprite_keys},
+        "animated_sprites": {
+            f"animated_{key}": f"{SPRITE_BASE}/versions/generation-v/black-white/animated/{key}/25.gif"
+            for key in sprite_keys
+        },
+        "default_sprite": f"{SPRITE_BASE}/25.png",
+        "cry_url": "https://play.pokemonshowdown.com/audio/cries/pikachu.mp3",
+        "cry_url_backup": "https://projectpokemon.org/images/normal-sprite/cries/25.ogg",
+    }
+
+
+def sample_sections() -> list:
+    return [
+        {
+            "title": title,
+            "content": "Pikachu is an Electric-type Pokémon introduced in Generation I. "
+            * 4,
+        }
+        for title in (
+            "Summary",
+            "Types",
+            "Base Stats",
+            "Abilities",
+            "Evolution",
+            "Additional Info",
+        )
+    ]
+
+
+def main() -> None:
+    sections = sample_sections()
+    markdown = "\n\n".join(f"## {s['title']}\n\n{s['content']}" for s in sections)
+    as_dict = {
+        "structured_data": {"sections": sections},
+        "text": markdown,
+        "pokemon_data": sample_pokemon_data(),
+    }
+    as_struct = ChatResponse(
+        structured_data=StructuredData(sections=[Section(**s) for s in sections]),
+        text=markdown,
+        pokemon_data=to_pokemon_data(sample_pokemon_data()),
+    )
+
+    encoder = msgspec.json.Encoder()
+    encoders = {
+        "json.dumps(dict)": lambda: json.dumps(as_dict).encode(),
+        "msgspec(dict)": lambda: encoder.encode(as_dict),
+        "msgspec(Struct)": lambda: encoder.encode(as_struct),
+    }
+
+    print(f"{'encoder':<20} {'us/response':>12}")
+    for name, encode in encoders.items():
+        seconds = timeit.timeit(encode, number=ITERATIONS)
+        print(f"{name:<20} {seconds / ITERATIONS * 1e6:>12.2f}")
+
+    body = encoder.encode(as_struct)
+    variants = {
+        "identity": lambda: body,
+        "gzip-9": lambda: gzip.compress(body, compresslevel=9),
+        "brotli-5": lambda: brotli.compress(body, quality=5),
+    }
+
+    print()
+    print(f"{'encoding':<20} {'bytes':>8} {'us/response':>12}")
+    for name, compress in variants.items():
+        size = len(compress())
+        seconds = timeit.timeit(compress, number=ITERATIONS // 10)
+        print(f"{name:<20} {size:>8} {seconds / (ITERATIONS // 10) * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
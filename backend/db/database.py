@@ -2,9 +2,12 @@ import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
@@ -19,14 +22,38 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 
 Base = declarative_base()
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,  # Set to True to see SQL queries
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_recycle=1800,
-)
+
+def create_engine(url: str) -> AsyncEngine:
+    """Create an engine for Postgres (asyncpg) or embedded SQLite (aiosqlite).
+
+    SQLite databases run in WAL mode, so lookups don't block on the writer.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_async_engine(
+            url,
+            echo=False,  # Set to True to see SQL queries
+            pool_size=5,
+            max_overflow=10,
+            pool_timeout=30,
+            pool_recycle=1800,
+        )
+
+    sqlite_engine = create_async_engine(url, echo=False)
+
+    @event.listens_for(sqlite_engine.sync_engine, "connect")
+    def configure_sqlite(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    return sqlite_engine
+
+
+# Without a DATABASE_URL (e.g. offline snapshot mode) there is no engine, and
+# init_db refuses to start
+engine = create_engine(DATABASE_URL) if DATABASE_URL else None
 
 async_session_maker = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
@@ -39,6 +66,9 @@ RETRY_DELAY = 2  # seconds
 
 async def init_db() -> None:
     """Initialize the database connection."""
+    if engine is None:
+        raise RuntimeError("DATABASE_URL is not set")
+
     attempts = 0
     while attempts < MAX_ATTEMPTS:
         try:
@@ -61,9 +91,15 @@ async def init_db() -> None:
 
 
 @asynccontextmanager
-async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Provide a database session context manager."""
-    session = async_session_maker()
+async def get_db_session(
+    session_maker: Optional[async_sessionmaker] = None,
+) -> AsyncGenerator[AsyncSession, None]:
+    """Provide a database session context manager.
+
+    Sessions are on the DATABASE_URL engine unless another engine's session
+    maker is given, as PokemonStore does.
+    """
+    session = (session_maker or async_session_maker)()
     try:
         yield session
         await session.commit()
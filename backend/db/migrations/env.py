@@ -4,7 +4,11 @@ from logging.config import fileConfig
 
 from alembic import context
 from backend.db.models.pokemon_cache import Base
+from sqlalchemy import JSON, TextClause
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
 
 config = context.config
 
@@ -19,6 +23,24 @@ fileConfig(config.config_file_name)
 target_metadata = Base.metadata
 
 
+# The first revision was written for Postgres only. These let it run on the
+# embedded SQLite store; later revisions use SQLite-friendly types and defaults.
+@compiles(JSONB, "sqlite")
+def compile_jsonb_for_sqlite(type_, compiler, **kw):
+    return compiler.process(JSON(), **kw)
+
+
+@compiles(CreateColumn, "sqlite")
+def compile_text_default_for_sqlite(create, compiler, **kw):
+    """SQLite only accepts expression defaults in parentheses: DEFAULT (now())."""
+    spec = compiler.visit_create_column(create, **kw)
+    default = create.element.server_default
+    if default is not None and isinstance(default.arg, TextClause):
+        text = default.arg.text
+        spec = spec.replace(f" DEFAULT {text}", f" DEFAULT ({text})", 1)
+    return spec
+
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -39,8 +61,12 @@ def run_migrations_online():
     engine = create_async_engine(url)
 
     async def run_async_migrations():
-        async with engine.begin() as conn:
-            await conn.run_sync(do_run_migrations)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(do_run_migrations)
+        finally:
+            # Close the pool on this loop; asyncio.run closes the loop after
+            await engine.dispose()
 
     asyncio.run(run_async_migrations())
 
@@ -0,0 +1,37 @@
+"""Create evolution chain table
+
+Revision ID: evolution_chain_table
+Revises: pokemon_cache_typed_columns
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+# revision identifiers, used by Alembic.
+revision = "evolution_chain_table"
+down_revision = "pokemon_cache_typed_columns"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create evolution_chain table."""
+    op.create_table(
+        "evolution_chain",
+        sa.Column("chain_id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("data", JSONB().with_variant(sa.JSON(), "sqlite"), nullable=False),
+        sa.Column(
+            "last_updated",
+            sa.DateTime(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Drop evolution_chain table."""
+    op.drop_table("evolution_chain")
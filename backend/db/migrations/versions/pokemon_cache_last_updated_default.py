@@ -0,0 +1,39 @@
+"""Use a portable default for the Pokemon cache's last_updated
+
+Revision ID: pokemon_cache_last_updated_default
+Revises: search_history_table
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "pokemon_cache_last_updated_default"
+down_revision = "search_history_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Replace the literal now() default, which SQLite can't evaluate."""
+    # SQLite can't alter a column in place; batch mode copies the table
+    with op.batch_alter_table("pokemon_cache") as batch_op:
+        batch_op.alter_column(
+            "last_updated",
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=sa.func.now(),
+        )
+
+
+def downgrade() -> None:
+    """Restore the original now() default."""
+    with op.batch_alter_table("pokemon_cache") as batch_op:
+        batch_op.alter_column(
+            "last_updated",
+            existing_type=sa.DateTime(),
+            existing_nullable=False,
+            server_default=sa.text("now()"),
+        )
@@ -0,0 +1,75 @@
+"""Add typed, indexed columns to the Pokemon cache
+
+Revision ID: pokemon_cache_typed_columns
+Revises: pokemon_cache_table
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import ARRAY
+
+# revision identifiers, used by Alembic.
+revision = "pokemon_cache_typed_columns"
+down_revision = "pokemon_cache_table"
+branch_labels = None
+depends_on = None
+
+STAT_COLUMNS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
+
+INTEGER_COLUMNS = ["height", "weight", *STAT_COLUMNS.values()]
+
+
+def upgrade() -> None:
+    """Add typed columns, backfill them from data and index them."""
+    op.add_column(
+        "pokemon_cache",
+        sa.Column("types", ARRAY(sa.String(32)).with_variant(sa.JSON(), "sqlite")),
+    )
+    for column in INTEGER_COLUMNS:
+        op.add_column("pokemon_cache", sa.Column(column, sa.Integer()))
+
+    # SQLite databases start out empty at this revision; only Postgres needs
+    # the backfill
+    if op.get_bind().dialect.name == "postgresql":
+        backfill_typed_columns()
+
+    op.create_index(
+        "ix_pokemon_cache_types", "pokemon_cache", ["types"], postgresql_using="gin"
+    )
+    for column in INTEGER_COLUMNS:
+        op.create_index(f"ix_pokemon_cache_{column}", "pokemon_cache", [column])
+
+
+def backfill_typed_columns() -> None:
+    """Fill the typed columns of existing rows from their JSONB data."""
+    stat_assignments = ",\n".join(
+        f"{column} = (data -> 'base_stats' ->> '{stat}')::integer"
+        for stat, column in STAT_COLUMNS.items()
+    )
+    op.execute(
+        f"""
+        UPDATE pokemon_cache SET
+            types = ARRAY(SELECT jsonb_array_elements_text(data -> 'types')),
+            height = (data ->> 'height')::integer,
+            weight = (data ->> 'weight')::integer,
+            {stat_assignments}
+        """
+    )
+
+
+def downgrade() -> None:
+    """Drop the typed columns and their indexes."""
+    for column in INTEGER_COLUMNS:
+        op.drop_index(f"ix_pokemon_cache_{column}", table_name="pokemon_cache")
+        op.drop_column("pokemon_cache", column)
+    op.drop_index("ix_pokemon_cache_types", table_name="pokemon_cache")
+    op.drop_column("pokemon_cache", "types")
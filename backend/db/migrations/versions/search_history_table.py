@@ -0,0 +1,51 @@
+"""Create search history table
+
+Revision ID: search_history_table
+Revises: evolution_chain_table
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "search_history_table"
+down_revision = "evolution_chain_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create search_history table with indexes for time and per-Pokemon queries."""
+    op.create_table(
+        "search_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("query", sa.Text(), nullable=False),
+        sa.Column("response_data", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column("source", sa.String(16), server_default="chat", nullable=False),
+        sa.Column("resolved_pokemon", sa.String(255), nullable=True),
+        sa.Column("cache_hit", sa.Boolean(), nullable=True),
+        sa.Column("latency_ms", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_search_history_created_at", "search_history", ["created_at"])
+    op.create_index(
+        "ix_search_history_resolved_pokemon_created_at",
+        "search_history",
+        ["resolved_pokemon", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    """Drop search_history table."""
+    op.drop_index(
+        "ix_search_history_resolved_pokemon_created_at", table_name="search_history"
+    )
+    op.drop_index("ix_search_history_created_at", table_name="search_history")
+    op.drop_table("search_history")
@@ -0,0 +1,25 @@
+import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, func
+from backend.db.database import Base
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+class EvolutionChain(Base):
+    """Model to store compact evolution chains built from PokeAPI."""
+
+    __tablename__ = "evolution_chain"
+
+    chain_id = Column(Integer, primary_key=True, autoincrement=False)
+    data = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)
+    last_updated = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<EvolutionChain(chain_id={self.chain_id})>"
+
+    def is_expired(self):
+        """Check if the chain is older than 30 days."""
+        if not self.last_updated:
+            return True
+        expiration_time = datetime.timedelta(days=30)
+        return (datetime.datetime.now() - self.last_updated) > expiration_time
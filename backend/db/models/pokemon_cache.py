@@ -1,21 +1,47 @@
 import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, func
 from backend.db.database import Base
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+
+# How long a cache entry is served before it is refreshed from PokeAPI.
+CACHE_TTL = datetime.timedelta(days=7)
+
+# Keys of essential_data["base_stats"] mapped to their typed column names.
+STAT_COLUMNS = {
+    "hp": "hp",
+    "attack": "attack",
+    "defense": "defense",
+    "special-attack": "special_attack",
+    "special-defense": "special_defense",
+    "speed": "speed",
+}
 
 
 class PokemonCache(Base):
     """Model to store cached Pokemon data from PokeAPI."""
 
     __tablename__ = "pokemon_cache"
+    __table_args__ = (Index("ix_pokemon_cache_types", "types", postgresql_using="gin"),)
 
     id = Column(Integer, primary_key=True)
     pokemon_id = Column(Integer, nullable=False, index=True)
     pokemon_name = Column(String(255), nullable=False, unique=True, index=True)
-    data = Column(JSONB, nullable=False)
+    data = Column(JSONB().with_variant(JSON(), "sqlite"), nullable=False)
     last_updated = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    # Typed copies of fields in data, so they can be filtered and sorted in SQL
+    # (a JSON list on SQLite, which has no arrays)
+    types = Column(ARRAY(String(32)).with_variant(JSON(), "sqlite"), nullable=True)
+    height = Column(Integer, nullable=True, index=True)
+    weight = Column(Integer, nullable=True, index=True)
+    hp = Column(Integer, nullable=True, index=True)
+    attack = Column(Integer, nullable=True, index=True)
+    defense = Column(Integer, nullable=True, index=True)
+    special_attack = Column(Integer, nullable=True, index=True)
+    special_defense = Column(Integer, nullable=True, index=True)
+    speed = Column(Integer, nullable=True, index=True)
+
     def __repr__(self):
         return f"<PokemonCache(id={self.id}, pokemon_name='{self.pokemon_name}')>"
 
@@ -23,5 +49,17 @@ class PokemonCache(Base):
         """Check if the cache entry is older than 7 days."""
         if not self.last_updated:
             return True
-        expiration_time = datetime.timedelta(days=7)
-        return (datetime.datetime.now() - self.last_updated) > expiration_time
+        return (datetime.datetime.now() - self.last_updated) > CACHE_TTL
+
+    @staticmethod
+    def typed_columns(data):
+        """Extract the typed column values from essential Pokemon data."""
+        base_stats = data.get("base_stats") or {}
+        columns = {
+            "types": data.get("types") or [],
+            "height": data.get("height"),
+            "weight": data.get("weight"),
+        }
+        for stat, column in STAT_COLUMNS.items():
+            columns[column] = base_stats.get(stat)
+        return columns
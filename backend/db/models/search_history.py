@@ -1,17 +1,29 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text, func
 from backend.db.database import Base
 
 
 class SearchHistory(Base):
     """Model to store user search history."""
 
-    from sqlalchemy import Column, DateTime, Integer, String, Text, func
-
     __tablename__ = "search_history"
+    __table_args__ = (
+        Index(
+            "ix_search_history_resolved_pokemon_created_at",
+            "resolved_pokemon",
+            "created_at",
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
-    query = Column(String(255), nullable=False)
+    query = Column(Text, nullable=False)
     response_data = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, default=func.now(), index=True)
+
+    # What the search resolved to and how it was served
+    source = Column(String(16), nullable=False, default="chat")
+    resolved_pokemon = Column(String(255), nullable=True)
+    cache_hit = Column(Boolean, nullable=True)
+    latency_ms = Column(Integer, nullable=True)
 
     def __repr__(self):
         return f"<SearchHistory(id={self.id}, query='{self.query}')>"
@@ -0,0 +1,208 @@
+"""Storage behind the MCP tools, on Postgres or on embedded SQLite.
+
+The tools only talk to a PokemonStore. The SQL is shared between backends
+except for three things the dialects do differently: upserts, matching a
+list of names and filtering on the types array (a JSON list on SQLite).
+Pick the backend with DATABASE_URL, e.g. ``postgresql+asyncpg://...`` or
+``sqlite+aiosqlite:///pokedex.db``.
+"""
+
+import datetime
+from contextlib import AbstractAsyncContextManager
+
+from backend.db import database
+from backend.db.models.evolution_chain import EvolutionChain
+from backend.db.models.pokemon_cache import STAT_COLUMNS, PokemonCache
+from backend.db.models.search_history import SearchHistory
+from sqlalchemy import String, and_, any_, bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+# Columns search_pokemon reads instead of the JSON data
+SEARCH_COLUMNS = [
+    PokemonCache.pokemon_id,
+    PokemonCache.pokemon_name,
+    PokemonCache.types,
+    PokemonCache.height,
+    PokemonCache.weight,
+    *(getattr(PokemonCache, column) for column in STAT_COLUMNS.values()),
+]
+
+
+class PokemonStore:
+    """Pokemon cache, evolution chains and search history for one database."""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.dialect = engine.dialect.name
+        self.session_maker = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+
+    def session(self) -> AbstractAsyncContextManager[AsyncSession]:
+        return database.get_db_session(self.session_maker)
+
+    def _insert(self, model):
+        if self.dialect == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
+
+    def _name_in(self, names: list[str]):
+        if self.dialect == "postgresql":
+            # ANY() keeps it a single prepared statement whatever the list length
+            return PokemonCache.pokemon_name == any_(
+                bindparam("names", names, type_=postgresql.ARRAY(String))
+            )
+        return PokemonCache.pokemon_name.in_(names)
+
+    def _has_types(self, types: list[str]):
+        if self.dialect == "postgresql":
+            return PokemonCache.types.contains(types)
+        conditions = []
+        for pokemon_type in types:
+            elements = func.json_each(PokemonCache.types).table_valued("value")
+            conditions.append(
+                select(elements.c.value)
+                .where(elements.c.value == pokemon_type)
+                .exists()
+            )
+        return and_(*conditions)
+
+    async def get_pokemon(self, pokemon_name: str) -> PokemonCache | None:
+        async with self.session() as session:
+            result = await session.execute(
+                select(PokemonCache).where(PokemonCache.pokemon_name == pokemon_name)
+            )
+            return result.scalars().first()
+
+    async def get_many_pokemon(self, pokemon_names: list[str]) -> list[PokemonCache]:
+        """Look up a batch of names in one query."""
+        async with self.session() as session:
+            result = await session.execute(
+                select(PokemonCache).where(self._name_in(pokemon_names))
+            )
+            return list(result.scalars().all())
+
+    async def last_updated(self, pokemon_names: list[str]) -> dict:
+        """When each of these pokemon was last cached."""
+        async with self.session() as session:
+            result = await session.execute(
+                select(PokemonCache.pokemon_name, PokemonCache.last_updated).where(
+                    self._name_in(pokemon_names)
+                )
+            )
+            return {name: last_updated for name, last_updated in result.all()}
+
+    async def upsert_pokemon(self, records: list[dict]) -> datetime.datetime | None:
+        """Insert or refresh cache entries for essential Pokemon data in one statement.
+
+        Returns the last_updated time the entries were stored with.
+        """
+        if not records:
+            return None
+
+        now = datetime.datetime.now()
+        rows = [
+            {
+                "pokemon_id": record["id"],
+                "pokemon_name": record["name"],
+                "data": record,
+                "last_updated": now,
+                **PokemonCache.typed_columns(record),
+            }
+            for record in records
+        ]
+        statement = self._insert(PokemonCache).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PokemonCache.pokemon_name],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column != "pokemon_name"
+            },
+        )
+        async with self.session() as session:
+            await session.execute(statement)
+        return now
+
+    async def list_pokemon(self) -> list[PokemonCache]:
+        async with self.session() as session:
+            result = await session.execute(select(PokemonCache))
+            return list(result.scalars().all())
+
+    async def all_pokemon_data(self) -> list[dict]:
+        async with self.session() as session:
+            result = await session.execute(select(PokemonCache.data))
+            return list(result.scalars().all())
+
+    async def search_pokemon(
+        self,
+        types: list[str],
+        minimums: dict[str, int],
+        maximums: dict[str, int],
+        sort_column: str,
+        descending: bool,
+        limit: int,
+    ) -> list:
+        """Filter and sort on the typed columns, keyed by column name."""
+        query = select(*SEARCH_COLUMNS)
+        if types:
+            query = query.where(self._has_types(types))
+        for column, value in minimums.items():
+            query = query.where(getattr(PokemonCache, column) >= value)
+        for column, value in maximums.items():
+            query = query.where(getattr(PokemonCache, column) <= value)
+
+        order = getattr(PokemonCache, sort_column)
+        order = order.desc() if descending else order.asc()
+        query = query.order_by(order.nulls_last(), PokemonCache.pokemon_id).limit(limit)
+
+        async with self.session() as session:
+            result = await session.execute(query)
+            return list(result.all())
+
+    async def evolution_chains(self) -> list[EvolutionChain]:
+        async with self.session() as session:
+            result = await session.execute(select(EvolutionChain))
+            return list(result.scalars().all())
+
+    async def store_evolution_chain(self, chain: dict) -> None:
+        """Persist a compact evolution chain."""
+        statement = self._insert(EvolutionChain).values(
+            chain_id=chain["chain_id"], data=chain, last_updated=datetime.datetime.now()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[EvolutionChain.chain_id],
+            set_={
+                "data": statement.excluded.data,
+                "last_updated": statement.excluded.last_updated,
+            },
+        )
+        async with self.session() as session:
+            await session.execute(statement)
+
+    async def popularity_counts(self, since: datetime.datetime) -> list[tuple]:
+        """How often each pokemon was searched for since a point in time."""
+        async with self.session() as session:
+            result = await session.execute(
+                select(SearchHistory.resolved_pokemon, func.count())
+                .where(
+                    SearchHistory.resolved_pokemon.is_not(None),
+                    SearchHistory.created_at >= since,
+                )
+                .group_by(SearchHistory.resolved_pokemon)
+            )
+            return list(result.all())
+
+
+STORE: PokemonStore | None = None
+
+
+def get_store() -> PokemonStore:
+    """The store for DATABASE_URL."""
+    global STORE
+    if STORE is None:
+        if database.engine is None:
+            raise RuntimeError("DATABASE_URL is not set")
+        STORE = PokemonStore(database.engine)
+    return STORE
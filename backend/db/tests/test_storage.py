@@ -0,0 +1,82 @@
+import datetime
+
+from sqlalchemy.dialects import postgresql
+
+
+def test_upsert_and_lookup(database_url, records, run_with_store):
+    async def test(store):
+        await store.upsert_pokemon(records)
+        await store.upsert_pokemon([{**records[1], "height": 4}])
+
+        pikachu = await store.get_pokemon("pikachu")
+        assert pikachu.pokemon_id == 25
+        assert pikachu.data["height"] == 4
+        assert pikachu.types == ["electric"]
+        assert not pikachu.is_expired()
+        assert await store.get_pokemon("missingno") is None
+
+        many = await store.get_many_pokemon(["pikachu", "rayquaza", "missingno"])
+        assert sorted(entry.pokemon_name for entry in many) == ["pikachu", "rayquaza"]
+
+        updated = await store.last_updated(["charizard", "missingno"])
+        assert list(updated) == ["charizard"]
+        assert isinstance(updated["charizard"], datetime.datetime)
+
+        assert len(await store.list_pokemon()) == 4
+        assert len(await store.all_pokemon_data()) == 4
+
+    run_with_store(database_url, test)
+
+
+def test_search_pokemon(database_url, records, run_with_store):
+    async def test(store):
+        await store.upsert_pokemon(records)
+
+        rows = await store.search_pokemon(
+            types=["dragon", "flying"],
+            minimums={"attack": 100},
+            maximums={},
+            sort_column="speed",
+            descending=True,
+            limit=10,
+        )
+        assert [row.pokemon_name for row in rows] == ["rayquaza", "dragonite"]
+
+        rows = await store.search_pokemon(
+            types=["flying"],
+            minimums={},
+            maximums={"attack": 140},
+            sort_column="pokemon_id",
+            descending=False,
+            limit=1,
+        )
+        assert [row.pokemon_name for row in rows] == ["charizard"]
+
+    run_with_store(database_url, test)
+
+
+def test_evolution_chains_and_popularity(database_url, records, run_with_store):
+    async def test(store):
+        chain = {"chain_id": 10, "stages": [{"species": "pichu"}]}
+        await store.store_evolution_chain(chain)
+        await store.store_evolution_chain({**chain, "stages": [{"species": "pikachu"}]})
+
+        chains = await store.evolution_chains()
+        assert [entry.data["stages"][0]["species"] for entry in chains] == ["pikachu"]
+
+        since = datetime.datetime.now() - datetime.timedelta(days=1)
+        assert await store.popularity_counts(since) == []
+
+    run_with_store(database_url, test)
+
+
+def test_batch_lookup_is_one_statement_per_dialect(tmp_path, run_with_store):
+    async def test(store):
+        names = ["pikachu", "rayquaza"]
+        clause = str(store._name_in(names).compile(dialect=store.engine.dialect))
+        assert " IN (" in clause
+        store.dialect = "postgresql"
+        clause = str(store._name_in(names).compile(dialect=postgresql.dialect()))
+        assert "= ANY (" in clause
+
+    run_with_store(f"sqlite+aiosqlite:///{tmp_path / 'pokedex.db'}", test)
@@ -0,0 +1,48 @@
+import os
+from typing import Dict, Optional, Tuple
+
+# Upstream hosts we proxy sprites and cries from, keyed by the name used in
+# proxied URLs: /service/assets/<origin>/<path>.
+ASSET_ORIGINS = {
+    "sprites": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/",
+    "showdown-cries": "https://play.pokemonshowdown.com/audio/cries/",
+    "projectpokemon-cries": "https://projectpokemon.org/images/normal-sprite/cries/",
+}
+
+# Where the web service mounts the asset proxy. Set to an empty string to
+# hand out the upstream URLs unchanged.
+ASSET_PROXY_PREFIX = os.environ.get("ASSET_PROXY_PREFIX", "/service/assets")
+
+
+def split_asset_url(url: str) -> Optional[Tuple[str, str]]:
+    """Split an upstream asset URL into (origin name, path), if we proxy it."""
+    for origin, base in ASSET_ORIGINS.items():
+        if url.startswith(base):
+            return origin, url[len(base) :]
+    return None
+
+
+def proxy_asset_url(url: Optional[str]) -> Optional[str]:
+    """Rewrite an upstream asset URL to go through the asset proxy."""
+    if not url or not ASSET_PROXY_PREFIX:
+        return url
+    parts = split_asset_url(url)
+    if parts is None:
+        return url
+    origin, path = parts
+    return f"{ASSET_PROXY_PREFIX}/{origin}/{path}"
+
+
+def proxy_pokemon_assets(data: Dict) -> Dict:
+    """Return a copy of essential Pokémon data with asset URLs proxied."""
+    if not ASSET_PROXY_PREFIX or "error" in data:
+        return data
+
+    proxied = dict(data)
+    for key in ("sprites", "animated_sprites"):
+        if proxied.get(key):
+            proxied[key] = {k: proxy_asset_url(v) for k, v in proxied[key].items()}
+    for key in ("default_sprite", "cry_url", "cry_url_backup"):
+        if proxied.get(key):
+            proxied[key] = proxy_asset_url(proxied[key])
+    return proxied
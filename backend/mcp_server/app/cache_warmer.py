@@ -0,0 +1,197 @@
+"""Keep popular pokemon_cache entries warm by refreshing them before they expire.
+
+Lookups feed a PopularityTracker of exponentially decayed request counts.
+Every few minutes the CacheWarmer takes the top entries and refreshes the ones
+whose deadline has passed. The deadline is a little before expiry, minus a
+per-entry jitter, so entries cached together don't all refresh together.
+Refreshes are spaced out to stay under a per-minute cap, and a name whose
+refresh fails (e.g. a 404 upstream) is backed off exponentially so it doesn't
+use up the budget on every pass.
+"""
+
+import asyncio
+import datetime
+import logging
+import math
+import os
+import random
+import time
+from typing import Awaitable, Callable
+
+logger = logging.getLogger("pokeapi-mcp-server")
+
+CACHE_WARM_TOP_N = int(os.environ.get("CACHE_WARM_TOP_N", "100"))
+CACHE_WARM_INTERVAL = float(os.environ.get("CACHE_WARM_INTERVAL", "600"))
+CACHE_WARM_PER_MINUTE = float(os.environ.get("CACHE_WARM_PER_MINUTE", "20"))
+# Refresh this long before expiry, minus up to CACHE_WARM_JITTER more
+CACHE_WARM_LEAD = datetime.timedelta(
+    hours=float(os.environ.get("CACHE_WARM_LEAD_HOURS", "24"))
+)
+CACHE_WARM_JITTER = datetime.timedelta(
+    hours=float(os.environ.get("CACHE_WARM_JITTER_HOURS", "12"))
+)
+# Wait this long before retrying a failed refresh, doubling up to a day
+CACHE_WARM_RETRY_AFTER = float(os.environ.get("CACHE_WARM_RETRY_AFTER", "3600"))
+CACHE_WARM_MAX_RETRY_AFTER = 24 * 3600
+# How quickly old requests stop counting towards popularity
+POPULARITY_HALF_LIFE = float(os.environ.get("POPULARITY_HALF_LIFE_HOURS", "24")) * 3600
+MAX_TRACKED = 5000
+
+
+class PopularityTracker:
+    """Request counts per pokemon that halve every ``half_life`` seconds."""
+
+    def __init__(self, half_life: float = POPULARITY_HALF_LIFE):
+        self.half_life = half_life
+        # name -> (score, time the score was last brought up to date)
+        self.scores: dict[str, tuple[float, float]] = {}
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * math.pow(0.5, (now - updated) / self.half_life)
+
+    def touch(self, name: str, weight: float = 1) -> None:
+        now = time.time()
+        score, updated = self.scores.get(name, (0.0, now))
+        self.scores[name] = (self._decayed(score, updated, now) + weight, now)
+        if len(self.scores) > MAX_TRACKED:
+            self.scores = {
+                name: self.scores[name] for name in self.top(MAX_TRACKED // 2)
+            }
+
+    def score(self, name: str) -> float:
+        if name not in self.scores:
+            return 0.0
+        return self._decayed(*self.scores[name], time.time())
+
+    def top(self, n: int) -> list[str]:
+        """The n most requested names, most popular first."""
+        now = time.time()
+        ranked = sorted(
+            self.scores,
+            key=lambda name: self._decayed(*self.scores[name], now),
+            reverse=True,
+        )
+        return ranked[:n]
+
+
+def refresh_deadline(
+    name: str,
+    last_updated: datetime.datetime,
+    ttl: datetime.timedelta,
+    lead: datetime.timedelta = CACHE_WARM_LEAD,
+    jitter: datetime.timedelta = CACHE_WARM_JITTER,
+) -> datetime.datetime:
+    """When to refresh an entry: ``lead`` before expiry, less a stable jitter.
+
+    The jitter is derived from the name and the last update, so it doesn't
+    move between checks but differs between entries cached at the same time.
+    """
+    spread = random.Random(f"{name}:{last_updated.isoformat()}").random()
+    return last_updated + ttl - lead - jitter * spread
+
+
+class CacheWarmer:
+    """Background loop that refreshes the hottest cache entries ahead of expiry.
+
+    The storage and PokeAPI sides are passed in:
+
+    - ``last_updated(names)`` returns when each name was cached, or None
+    - ``refresh(name)`` re-fetches and stores one entry, returning success
+    - ``upstream_available()`` says whether PokeAPI is worth calling now
+    """
+
+    def __init__(
+        self,
+        popularity: PopularityTracker,
+        ttl: datetime.timedelta,
+        last_updated: Callable[[list[str]], Awaitable[dict]],
+        refresh: Callable[[str], Awaitable[bool]],
+        upstream_available: Callable[[], bool] = lambda: True,
+        top_n: int = CACHE_WARM_TOP_N,
+        interval: float = CACHE_WARM_INTERVAL,
+        per_minute: float = CACHE_WARM_PER_MINUTE,
+        retry_after: float = CACHE_WARM_RETRY_AFTER,
+    ):
+        self.popularity = popularity
+        self.ttl = ttl
+        self.last_updated = last_updated
+        self.refresh = refresh
+        self.upstream_available = upstream_available
+        self.top_n = top_n
+        self.interval = interval
+        self.min_spacing = 60 / per_minute
+        self.retry_after = retry_after
+        self.task: asyncio.Task | None = None
+        self._last_refresh = 0.0
+        # name -> (failed refreshes in a row, monotonic time to retry at)
+        self._backoff: dict[str, tuple[int, float]] = {}
+
+    def start(self) -> None:
+        if self.task is None and self.top_n > 0:
+            self.task = asyncio.create_task(self._run())
+            logger.info(f"Cache warmer started for the top {self.top_n} pokemon")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                refreshed = await self.warm()
+                if refreshed:
+                    logger.info(f"Cache warmer refreshed {refreshed} entries")
+            except Exception as e:
+                logger.error(f"Error warming the cache: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def due(self) -> list[str]:
+        """Top names whose refresh deadline has passed, most popular first.
+
+        Names still backing off from a failed refresh are left out.
+        """
+        clock = time.monotonic()
+        names = [
+            name
+            for name in self.popularity.top(self.top_n)
+            if self._backoff.get(name, (0, 0.0))[1] <= clock
+        ]
+        if not names:
+            return []
+        updated = await self.last_updated(names)
+        now = datetime.datetime.now()
+        return [
+            name
+            for name in names
+            if updated.get(name) is None
+            or refresh_deadline(name, updated[name], self.ttl) <= now
+        ]
+
+    def _failed(self, name: str) -> None:
+        failures = self._backoff.get(name, (0, 0.0))[0] + 1
+        delay = min(self.retry_after * 2 ** (failures - 1), CACHE_WARM_MAX_RETRY_AFTER)
+        self._backoff[name] = (failures, time.monotonic() + delay)
+        if len(self._backoff) > MAX_TRACKED:
+            tracked = set(self.popularity.scores)
+            self._backoff = {
+                key: entry for key, entry in self._backoff.items() if key in tracked
+            }
+
+    async def warm(self) -> int:
+        """Refresh every due entry, spaced to the rate cap. Returns how many."""
+        refreshed = 0
+        for name in await self.due():
+            if not self.upstream_available():
+                logger.info("PokeAPI unavailable, postponing cache warming")
+                break
+
+            wait = self._last_refresh + self.min_spacing - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_refresh = time.monotonic()
+
+            if await self.refresh(name):
+                self._backoff.pop(name, None)
+                refreshed += 1
+            else:
+                self._failed(name)
+        return refreshed
@@ -0,0 +1,140 @@
+import datetime
+
+# Chains older than this are served as-is and refreshed in the background.
+EVOLUTION_MAX_AGE = datetime.timedelta(days=30)
+
+
+def _resource_name(value):
+    """Reduce a PokeAPI named resource ({"name": ..., "url": ...}) to its name."""
+    if isinstance(value, dict) and "name" in value:
+        return value["name"]
+    return value
+
+
+def compact_evolution_details(details: list[dict]) -> list[dict]:
+    """Keep only the conditions that are actually set for each evolution method."""
+    conditions = []
+    for detail in details:
+        condition = {}
+        for key, value in detail.items():
+            if value is None or value is False or value == "":
+                continue
+            condition[key] = _resource_name(value)
+        conditions.append(condition)
+    return conditions
+
+
+def compact_evolution_chain(chain_resource: dict) -> dict:
+    """Flatten a PokeAPI evolution-chain resource into an ordered list of stages.
+
+    Each stage names its species, the species it evolves from and the
+    conditions (trigger, level, item, ...) for that evolution. Stages are in
+    breadth-first order, so the base form always comes first.
+    """
+    stages = []
+    queue = [(chain_resource["chain"], None, 1)]
+    while queue:
+        node, evolves_from, stage = queue.pop(0)
+        species = node["species"]["name"]
+        stages.append(
+            {
+                "species": species,
+                "stage": stage,
+                "evolves_from": evolves_from,
+                "conditions": compact_evolution_details(
+                    node.get("evolution_details", [])
+                ),
+            }
+        )
+        for child in node.get("evolves_to", []):
+            queue.append((child, species, stage + 1))
+
+    return {"chain_id": chain_resource["id"], "stages": stages}
+
+
+class EvolutionGraph:
+    """In-memory index of evolution chains, keyed by species and chain id.
+
+    Lookups are a dict hit plus a copy of the chain, so they cost
+    O(chain length). Pokemon names that differ from their species name
+    (e.g. giratina-altered) are remembered as aliases once resolved, and kept
+    under the chain's "aliases" key so they are stored along with it.
+    """
+
+    def __init__(self):
+        self.chains: dict[int, dict] = {}
+        self.updated_at: dict[int, datetime.datetime] = {}
+        self.species_to_chain: dict[str, int] = {}
+        self.aliases: dict[str, str] = {}
+
+    def __len__(self):
+        return len(self.chains)
+
+    def add(self, chain: dict, last_updated: datetime.datetime | None = None) -> dict:
+        """Add or replace a chain and index all of its species and aliases.
+
+        A replaced chain keeps the aliases learned for it. Returns the chain
+        as indexed, which is what should be stored.
+        """
+        chain_id = chain["chain_id"]
+        previous = self.chains.get(chain_id)
+        if previous:
+            for stage in previous["stages"]:
+                self.species_to_chain.pop(stage["species"], None)
+            aliases = {**previous.get("aliases", {}), **chain.get("aliases", {})}
+            if aliases:
+                chain = {**chain, "aliases": aliases}
+
+        self.chains[chain_id] = chain
+        self.updated_at[chain_id] = last_updated or datetime.datetime.now()
+        for stage in chain["stages"]:
+            self.species_to_chain[stage["species"]] = chain_id
+        self.aliases.update(chain.get("aliases", {}))
+        return chain
+
+    def add_alias(self, pokemon_name: str, species: str) -> bool:
+        """Remember a pokemon name for a species whose chain is known.
+
+        Returns True when the alias is new, so the chain should be stored again.
+        """
+        chain_id = self.species_to_chain.get(species)
+        if (
+            pokemon_name == species
+            or chain_id is None
+            or self.aliases.get(pokemon_name) == species
+        ):
+            return False
+
+        self.aliases[pokemon_name] = species
+        chain = self.chains[chain_id]
+        self.chains[chain_id] = {
+            **chain,
+            "aliases": {**chain.get("aliases", {}), pokemon_name: species},
+        }
+        return True
+
+    def resolve_species(self, name: str) -> str:
+        return self.aliases.get(name, name)
+
+    def chain_id_for(self, name: str) -> int | None:
+        return self.species_to_chain.get(self.resolve_species(name))
+
+    def is_stale(self, chain_id: int) -> bool:
+        updated_at = self.updated_at.get(chain_id)
+        return updated_at is None or (
+            datetime.datetime.now() - updated_at > EVOLUTION_MAX_AGE
+        )
+
+    def lookup(self, name: str) -> dict | None:
+        """Return the chain containing a species or pokemon name, if known."""
+        chain_id = self.chain_id_for(name)
+        if chain_id is None:
+            return None
+
+        species = self.resolve_species(name)
+        chain = self.chains[chain_id]
+        return {
+            "pokemon": species,
+            "chain_id": chain_id,
+            "stages": list(chain["stages"]),
+        }
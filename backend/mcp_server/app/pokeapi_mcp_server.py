@@ -1,21 +1,68 @@
+import asyncio
 import datetime
 import logging
-import sys
+import os
+from contextlib import asynccontextmanager
 
 import httpx
-from backend.db.database import get_db_session, init_db
-from backend.db.models.pokemon_cache import PokemonCache
+from backend.db.database import init_db
+from backend.db.models.pokemon_cache import CACHE_TTL, STAT_COLUMNS
+from backend.db.storage import get_store
+from backend.mcp_server.app.asset_urls import proxy_pokemon_assets
+from backend.mcp_server.app.cache_warmer import CacheWarmer, PopularityTracker
+from backend.mcp_server.app.evolution import EvolutionGraph, compact_evolution_chain
+from backend.mcp_server.app.snapshot import Snapshot
+from backend.mcp_server.app.upstream import (
+    CircuitBreaker,
+    UpstreamUnavailable,
+    hedged_get,
+)
 from mcp.server.fastmcp import FastMCP
-from sqlalchemy import select
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("pokeapi-mcp-server")
-mcp = FastMCP("pokeapi")
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Initialize the database and load the evolution graph before serving."""
+    if SNAPSHOT is None:
+        await ensure_db_initialized()
+    yield
+
+
+mcp = FastMCP("pokeapi", lifespan=lifespan)
 
 POKEAPI_BASE = "https://pokeapi.co/api/v2"
+POKEAPI_BREAKER = CircuitBreaker()
+UPSTREAM_UNAVAILABLE = {"error": "Upstream unavailable: PokeAPI is not responding"}
+
+# Fields search_pokemon can filter and sort on, mapped to pokemon_cache columns
+SEARCHABLE_FIELDS = {"height": "height", "weight": "weight", **STAT_COLUMNS}
+MAX_SEARCH_LIMIT = 50
+
+# Limits for get_many_pokemon_data
+MAX_BATCH_SIZE = 10
+FETCH_CONCURRENCY = 4
 
 # Initialize database connection
 DATABASE_INITIALIZED = False
+HTTP_CLIENT = None
+
+# Offline mode: serve pokemon data from a snapshot file instead of
+# PokeAPI and the database
+SNAPSHOT_PATH = os.environ.get("POKEDEX_SNAPSHOT")
+SNAPSHOT = Snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+SNAPSHOT_UNSUPPORTED = {"error": "This tool is not available in offline snapshot mode"}
+
+# Evolution chains, loaded from the database at startup
+EVOLUTION_GRAPH = EvolutionGraph()
+EVOLUTION_REFRESHES: dict[int, asyncio.Task] = {}
+
+# Recent lookups, seeded from search_history, that decide what the cache
+# warmer keeps fresh
+POPULARITY = PopularityTracker()
+POPULARITY_SEED_WINDOW = datetime.timedelta(days=7)
 
 
 async def ensure_db_initialized():
@@ -24,18 +71,167 @@ async def ensure_db_initialized():
     if not DATABASE_INITIALIZED:
         await init_db()
         DATABASE_INITIALIZED = True
+        await load_evolution_graph()
+        await seed_popularity()
+        CACHE_WARMER.start()
 
 
-async def make_request(url: str) -> dict:
-    """Make a request to the PokeAPI with error handling."""
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            logger.error(f"An error occurred: {e}", file=sys.stderr)
-    return None
+async def seed_popularity():
+    """Seed popularity from the last week of search_history."""
+    since = datetime.datetime.now() - POPULARITY_SEED_WINDOW
+    try:
+        for pokemon_name, count in await get_store().popularity_counts(since):
+            POPULARITY.touch(pokemon_name, count)
+        logger.info(f"Seeded popularity for {len(POPULARITY)} pokemon")
+    except Exception as e:
+        logger.error(f"Error seeding popularity from search history: {e}")
+
+
+async def load_evolution_graph():
+    """Load every stored evolution chain into the in-memory graph."""
+    try:
+        for entry in await get_store().evolution_chains():
+            EVOLUTION_GRAPH.add(entry.data, entry.last_updated)
+        logger.info(f"Loaded {len(EVOLUTION_GRAPH)} evolution chains")
+    except Exception as e:
+        logger.error(f"Error loading evolution chains: {e}")
+
+
+async def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, so connections to PokeAPI are reused."""
+    global HTTP_CLIENT
+    if HTTP_CLIENT is None:
+        HTTP_CLIENT = httpx.AsyncClient()
+    return HTTP_CLIENT
+
+
+async def make_request(url: str) -> dict | None:
+    """Make a request to the PokeAPI through the circuit breaker.
+
+    Returns None if PokeAPI doesn't have the resource, and raises
+    UpstreamUnavailable if PokeAPI can't be reached right now.
+    """
+    client = await get_http_client()
+    return await hedged_get(client, url, POKEAPI_BREAKER)
+
+
+def mark_stale(data: dict, last_updated: datetime.datetime | None) -> dict:
+    """Flag expired cached data served because PokeAPI is unavailable."""
+    return {
+        **data,
+        "stale": True,
+        "last_updated": last_updated.isoformat() if last_updated else None,
+        "warning": "Upstream unavailable; this cached data may be out of date",
+    }
+
+
+def cache_time(last_updated: datetime.datetime | None) -> dict:
+    """When data was cached, for HTTP caching headers; nothing if it wasn't."""
+    return {"last_updated": last_updated.isoformat()} if last_updated else {}
+
+
+def normalize_pokemon_name(pokemon_name: str) -> str:
+    """Normalize a pokemon name (lowercase, replace spaces with hyphens)."""
+    return pokemon_name.strip().lower().replace(" ", "-")
+
+
+def build_essential_data(data: dict) -> dict:
+    """Extract the data we cache and return from a PokeAPI pokemon resource."""
+    # Extract sprites and organize them
+    sprites = data.get("sprites", {})
+    all_sprites = {
+        "default": sprites.get("front_default"),
+        "shiny": sprites.get("front_shiny"),
+        "female": sprites.get("front_female"),
+        "shiny_female": sprites.get("front_shiny_female"),
+        "back_default": sprites.get("back_default"),
+        "back_shiny": sprites.get("back_shiny"),
+        "back_female": sprites.get("back_female"),
+        "back_shiny_female": sprites.get("back_shiny_female"),
+    }
+
+    # Filter out None values
+    all_sprites = {k: v for k, v in all_sprites.items() if v}
+
+    # Get animated versions if available
+    animated_sprites = {}
+    try:
+        animated = (
+            sprites.get("versions", {})
+            .get("generation-v", {})
+            .get("black-white", {})
+            .get("animated", {})
+        )
+        if animated:
+            animated_sprites = {
+                "animated_front": animated.get("front_default"),
+                "animated_front_shiny": animated.get("front_shiny"),
+                "animated_back": animated.get("back_default"),
+                "animated_back_shiny": animated.get("back_shiny"),
+                "animated_front_female": animated.get("front_female"),
+                "animated_front_shiny_female": animated.get("front_shiny_female"),
+                "animated_back_female": animated.get("back_female"),
+                "animated_back_shiny_female": animated.get("back_shiny_female"),
+            }
+            # Filter out None values
+            animated_sprites = {k: v for k, v in animated_sprites.items() if v}
+    except Exception as e:
+        logger.error(f"Error getting animated sprites: {e}")
+
+    # Build the essential data
+    return {
+        "id": data.get("id"),
+        "name": data.get("name"),
+        "height": data.get("height"),
+        "weight": data.get("weight"),
+        "types": [t["type"]["name"] for t in data.get("types", [])],
+        "abilities": [a["ability"]["name"] for a in data.get("abilities", [])],
+        "base_stats": {
+            stat["stat"]["name"]: stat["base_stat"] for stat in data.get("stats", [])
+        },
+        "sprites": all_sprites,
+        "animated_sprites": animated_sprites,
+        "default_sprite": sprites.get("front_default"),
+        "cry_url": f"https://play.pokemonshowdown.com/audio/cries/{data.get('name').lower()}.mp3",
+        "cry_url_backup": f"https://projectpokemon.org/images/normal-sprite/cries/{data.get('id')}.ogg",
+    }
+
+
+async def upsert_pokemon_data(
+    records: list[dict],
+) -> datetime.datetime | None:
+    """Insert or refresh cache entries for essential Pokemon data in one statement."""
+    return await get_store().upsert_pokemon(records)
+
+
+async def fetch_essential_data(pokemon_name: str) -> dict | None:
+    """Fetch a pokemon from PokeAPI and extract its essential data."""
+    data = await make_request(f"{POKEAPI_BASE}/pokemon/{pokemon_name}")
+    if not data:
+        return None
+    return build_essential_data(data)
+
+
+async def refresh_cached_pokemon(pokemon_name: str) -> bool:
+    """Re-fetch one pokemon from PokeAPI and store it in the cache."""
+    try:
+        essential_data = await fetch_essential_data(pokemon_name)
+        if not essential_data:
+            return False
+        await upsert_pokemon_data([essential_data])
+        return True
+    except Exception as e:
+        logger.warning(f"Could not refresh {pokemon_name}: {e}")
+        return False
+
+
+CACHE_WARMER = CacheWarmer(
+    POPULARITY,
+    ttl=CACHE_TTL,
+    last_updated=lambda names: get_store().last_updated(names),
+    refresh=refresh_cached_pokemon,
+    upstream_available=lambda: POKEAPI_BREAKER.state == "closed",
+)
 
 
 @mcp.tool()
@@ -46,137 +242,290 @@ async def get_basic_pokemon_data(pokemon_name: str) -> dict:
     Returns:
          dict: The basic data for the pokemon.
     """
+    pokemon_name = normalize_pokemon_name(pokemon_name)
+
+    if SNAPSHOT is not None:
+        snapshot_data = SNAPSHOT.get(pokemon_name)
+        if not snapshot_data:
+            return {"error": "Pokemon not found"}
+        return proxy_pokemon_assets(
+            {
+                **snapshot_data,
+                "cache_status": "snapshot",
+                "last_updated": SNAPSHOT.created_at.isoformat(),
+            }
+        )
+
     # Ensure DB connection is initialized
     await ensure_db_initialized()
 
-    # Normalize the pokemon name (lowercase, replace spaces with hyphens)
-    pokemon_name = pokemon_name.lower().replace(" ", "-")
-
     # Check if we have a valid cached entry in the database
     cached_data = None
-    need_refresh = False
+    cached_at = None
+    stale_entry = None
 
-    async with get_db_session() as session:
-        try:
-            query = select(PokemonCache).where(
-                PokemonCache.pokemon_name == pokemon_name
-            )
-            result = await session.execute(query)
-            cache_entry = result.scalars().first()
-
-            if cache_entry:
-                logger.info(f"Found cached data for {pokemon_name}")
-
-                # Check if the cache entry is expired (older than 7 days)
-                if cache_entry.is_expired():
-                    logger.info(
-                        f"Cached data for {pokemon_name} is expired, refreshing..."
-                    )
-                    need_refresh = True
-                else:
-                    cached_data = cache_entry.data
+    try:
+        cache_entry = await get_store().get_pokemon(pokemon_name)
+
+        if cache_entry:
+            logger.info(f"Found cached data for {pokemon_name}")
+
+            # Check if the cache entry is expired (older than 7 days)
+            if cache_entry.is_expired():
+                logger.info(f"Cached data for {pokemon_name} is expired, refreshing...")
+                stale_entry = cache_entry
             else:
-                logger.info(f"No cached data found for {pokemon_name}")
-                need_refresh = True
+                cached_data = cache_entry.data
+                cached_at = cache_entry.last_updated
+        else:
+            logger.info(f"No cached data found for {pokemon_name}")
 
-        except Exception as e:
-            logger.error(f"Error retrieving from cache: {e}")
-            need_refresh = True
+    except Exception as e:
+        logger.error(f"Error retrieving from cache: {e}")
+
+    # Popularity is tracked by the cached name, which is what the cache warmer
+    # refreshes, whatever name or number the caller asked for
+    if cached_data:
+        POPULARITY.touch(cache_entry.pokemon_name)
+        return proxy_pokemon_assets(
+            {**cached_data, "cache_status": "hit", **cache_time(cached_at)}
+        )
 
     # If we need to refresh or don't have cached data, fetch it from the API
-    if need_refresh or not cached_data:
-        data = await make_request(f"{POKEAPI_BASE}/pokemon/{pokemon_name}")
-        if not data:
-            return {"error": "Pokemon not found"}
+    try:
+        essential_data = await fetch_essential_data(pokemon_name)
+    except UpstreamUnavailable as e:
+        logger.warning(f"Could not refresh {pokemon_name}: {e}")
+        if stale_entry:
+            POPULARITY.touch(stale_entry.pokemon_name)
+            return proxy_pokemon_assets(
+                {
+                    **mark_stale(stale_entry.data, stale_entry.last_updated),
+                    "cache_status": "stale",
+                }
+            )
+        return UPSTREAM_UNAVAILABLE
 
-        # Process the data
-        # Extract sprites and organize them
-        sprites = data.get("sprites", {})
-        all_sprites = {
-            "default": sprites.get("front_default"),
-            "shiny": sprites.get("front_shiny"),
-            "female": sprites.get("front_female"),
-            "shiny_female": sprites.get("front_shiny_female"),
-            "back_default": sprites.get("back_default"),
-            "back_shiny": sprites.get("back_shiny"),
-            "back_female": sprites.get("back_female"),
-            "back_shiny_female": sprites.get("back_shiny_female"),
-        }
+    if not essential_data:
+        return {"error": "Pokemon not found"}
+    POPULARITY.touch(essential_data["name"])
+
+    try:
+        cached_at = await upsert_pokemon_data([essential_data])
+        logger.info(f"Successfully cached data for {pokemon_name}")
+    except Exception as e:
+        # If caching fails, still return the fetched data
+        logger.error(f"Error caching Pokemon data: {e}")
+
+    return proxy_pokemon_assets(
+        {**essential_data, "cache_status": "miss", **cache_time(cached_at)}
+    )
+
+
+@mcp.tool()
+async def get_many_pokemon_data(pokemon_names: list[str]) -> dict:
+    """Get basic data for several pokemon at once, e.g. to compare them or build a team.
+    Args:
+         pokemon_names (list[str]): The names of up to 10 pokemon to get data for.
+    Returns:
+         dict: One result per requested name, in order, each with either the
+               pokemon's basic data or an error.
+    """
+    if len(pokemon_names) > MAX_BATCH_SIZE:
+        return {"error": f"Ask for at most {MAX_BATCH_SIZE} pokemon at a time"}
+
+    names = [normalize_pokemon_name(name) for name in pokemon_names]
+    unique_names = list(dict.fromkeys(names))
+    found = {}
+    stale = {}
+    unavailable = set()
+
+    if SNAPSHOT is not None:
+        for name in unique_names:
+            snapshot_data = SNAPSHOT.get(name)
+            if snapshot_data:
+                found[name] = snapshot_data
+        return batch_results(pokemon_names, names, found)
 
-        # Filter out None values
-        all_sprites = {k: v for k, v in all_sprites.items() if v}
+    await ensure_db_initialized()
+
+    # One lookup for the whole batch
+    try:
+        for entry in await get_store().get_many_pokemon(unique_names):
+            if entry.is_expired():
+                stale[entry.pokemon_name] = entry
+            else:
+                found[entry.pokemon_name] = entry.data
+    except Exception as e:
+        logger.error(f"Error retrieving from cache: {e}")
+
+    missing = [name for name in unique_names if name not in found]
+    if missing:
+        logger.info(f"Fetching {len(missing)} uncached pokemon: {', '.join(missing)}")
+        semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch(name: str) -> dict | None:
+            async with semaphore:
+                try:
+                    return await fetch_essential_data(name)
+                except UpstreamUnavailable as e:
+                    logger.warning(f"Could not refresh {name}: {e}")
+                    unavailable.add(name)
+                    return None
+
+        fetched = await asyncio.gather(*(fetch(name) for name in missing))
+        fetched_records = {}
+        for name, essential_data in zip(missing, fetched):
+            if essential_data:
+                found[name] = essential_data
+                fetched_records[essential_data["name"]] = essential_data
+            elif name in unavailable and name in stale:
+                found[name] = mark_stale(stale[name].data, stale[name].last_updated)
 
-        # Get animated versions if available
-        animated_sprites = {}
         try:
-            animated = (
-                sprites.get("versions", {})
-                .get("generation-v", {})
-                .get("black-white", {})
-                .get("animated", {})
-            )
-            if animated:
-                animated_sprites = {
-                    "animated_front": animated.get("front_default"),
-                    "animated_front_shiny": animated.get("front_shiny"),
-                    "animated_back": animated.get("back_default"),
-                    "animated_back_shiny": animated.get("back_shiny"),
-                    "animated_front_female": animated.get("front_female"),
-                    "animated_front_shiny_female": animated.get("front_shiny_female"),
-                    "animated_back_female": animated.get("back_female"),
-                    "animated_back_shiny_female": animated.get("back_shiny_female"),
-                }
-                # Filter out None values
-                animated_sprites = {k: v for k, v in animated_sprites.items() if v}
+            await upsert_pokemon_data(list(fetched_records.values()))
         except Exception as e:
-            logger.error(f"Error getting animated sprites: {e}")
-
-        # Build the essential data
-        essential_data = {
-            "id": data.get("id"),
-            "name": data.get("name"),
-            "height": data.get("height"),
-            "weight": data.get("weight"),
-            "types": [t["type"]["name"] for t in data.get("types", [])],
-            "abilities": [a["ability"]["name"] for a in data.get("abilities", [])],
-            "base_stats": {
-                stat["stat"]["name"]: stat["base_stat"]
-                for stat in data.get("stats", [])
-            },
-            "sprites": all_sprites,
-            "animated_sprites": animated_sprites,
-            "default_sprite": sprites.get("front_default"),
-            "cry_url": f"https://play.pokemonshowdown.com/audio/cries/{data.get('name').lower()}.mp3",
-            "cry_url_backup": f"https://projectpokemon.org/images/normal-sprite/cries/{data.get('id')}.ogg",
-        }
+            logger.error(f"Error caching Pokemon data: {e}")
+
+    for data in found.values():
+        POPULARITY.touch(data["name"])
+
+    return batch_results(pokemon_names, names, found, unavailable)
+
+
+def batch_results(
+    requested_names: list[str],
+    names: list[str],
+    found: dict,
+    unavailable: set[str] = frozenset(),
+) -> dict:
+    """Build get_many_pokemon_data results in request order."""
+    results = []
+    for requested, name in zip(requested_names, names):
+        if name in found:
+            results.append(
+                {"pokemon_name": requested, "data": proxy_pokemon_assets(found[name])}
+            )
+        elif name in unavailable:
+            results.append(
+                {"pokemon_name": requested, "error": UPSTREAM_UNAVAILABLE["error"]}
+            )
+        else:
+            results.append({"pokemon_name": requested, "error": "Pokemon not found"})
+    return {"count": len(results), "results": results}
 
-        async with get_db_session() as session:
-            try:
-                if need_refresh and cache_entry:
-                    cache_entry.data = essential_data
-                    cache_entry.last_updated = datetime.datetime.now()
-                    session.add(cache_entry)
-                else:
-                    new_cache_entry = PokemonCache(
-                        pokemon_id=essential_data["id"],
-                        pokemon_name=essential_data["name"],
-                        data=essential_data,
-                        last_updated=datetime.datetime.now(),
-                    )
-                    session.add(new_cache_entry)
 
-                await session.commit()
-                logger.info(f"Successfully cached data for {pokemon_name}")
+async def fetch_evolution_chain(chain_url: str) -> dict | None:
+    """Fetch an evolution-chain resource and compact it."""
+    resource = await make_request(chain_url)
+    if not resource:
+        return None
+    return compact_evolution_chain(resource)
 
-                return essential_data
 
-            except Exception as e:
-                logger.error(f"Error caching Pokemon data: {e}")
-                await session.rollback()
-                # If caching fails, still return the fetched data
-                return essential_data
+async def store_evolution_chain(chain: dict) -> None:
+    """Persist a compact evolution chain."""
+    await get_store().store_evolution_chain(chain)
 
-    return cached_data
+
+async def refresh_evolution_chain(chain_id: int) -> None:
+    """Re-fetch a stored chain from PokeAPI and replace it in the graph."""
+    try:
+        chain = await fetch_evolution_chain(
+            f"{POKEAPI_BASE}/evolution-chain/{chain_id}/"
+        )
+    except UpstreamUnavailable as e:
+        logger.warning(f"Could not refresh evolution chain {chain_id}: {e}")
+        return
+    if not chain:
+        return
+    chain = EVOLUTION_GRAPH.add(chain)
+    try:
+        await store_evolution_chain(chain)
+        logger.info(f"Refreshed evolution chain {chain_id}")
+    except Exception as e:
+        logger.error(f"Error storing evolution chain {chain_id}: {e}")
+
+
+def schedule_evolution_refresh(chain_id: int) -> None:
+    """Refresh a stale chain in the background, at most once at a time."""
+    if chain_id in EVOLUTION_REFRESHES:
+        return
+    task = asyncio.create_task(refresh_evolution_chain(chain_id))
+    EVOLUTION_REFRESHES[chain_id] = task
+    task.add_done_callback(lambda _: EVOLUTION_REFRESHES.pop(chain_id, None))
+
+
+async def fetch_species(pokemon_name: str) -> dict | None:
+    """Fetch the species resource for a species or pokemon name."""
+    species = await make_request(f"{POKEAPI_BASE}/pokemon-species/{pokemon_name}")
+    if species:
+        return species
+
+    # Forms like giratina-altered are pokemon, not species
+    pokemon = await make_request(f"{POKEAPI_BASE}/pokemon/{pokemon_name}")
+    if not pokemon:
+        return None
+    return await make_request(pokemon["species"]["url"])
+
+
+@mcp.tool()
+async def get_evolution_chain(pokemon_name: str) -> dict:
+    """Get the evolution chain of a pokemon, with how and when each evolution happens.
+    Args:
+         pokemon_name (str): The name of the pokemon to get the evolution chain for.
+    Returns:
+         dict: Every stage of the chain in order, with the species it evolves
+               from and the trigger, level, item or other conditions.
+    """
+    if SNAPSHOT is not None:
+        return SNAPSHOT_UNSUPPORTED
+
+    await ensure_db_initialized()
+
+    pokemon_name = normalize_pokemon_name(pokemon_name)
+
+    chain = EVOLUTION_GRAPH.lookup(pokemon_name)
+    if chain:
+        if EVOLUTION_GRAPH.is_stale(chain["chain_id"]):
+            schedule_evolution_refresh(chain["chain_id"])
+        return chain
+
+    try:
+        species = await fetch_species(pokemon_name)
+    except UpstreamUnavailable as e:
+        logger.warning(f"Could not fetch species for {pokemon_name}: {e}")
+        return UPSTREAM_UNAVAILABLE
+    if not species:
+        return {"error": "Pokemon not found"}
+
+    # The species may belong to a chain we already have under another name
+    chain_id = EVOLUTION_GRAPH.chain_id_for(species["name"])
+    new_chain = chain_id is None
+    if new_chain:
+        chain_url = (species.get("evolution_chain") or {}).get("url")
+        if not chain_url:
+            return {"error": f"No evolution data for {species['name']}"}
+
+        try:
+            chain = await fetch_evolution_chain(chain_url)
+        except UpstreamUnavailable as e:
+            logger.warning(f"Could not fetch evolution chain {chain_url}: {e}")
+            return UPSTREAM_UNAVAILABLE
+        if not chain:
+            return {"error": f"Could not fetch evolution data for {species['name']}"}
+
+        EVOLUTION_GRAPH.add(chain)
+        chain_id = chain["chain_id"]
+
+    # Aliases are stored with their chain, so they survive a restart
+    if EVOLUTION_GRAPH.add_alias(pokemon_name, species["name"]) or new_chain:
+        try:
+            await store_evolution_chain(EVOLUTION_GRAPH.chains[chain_id])
+        except Exception as e:
+            logger.error(f"Error storing evolution chain {chain_id}: {e}")
+
+    return EVOLUTION_GRAPH.lookup(pokemon_name)
 
 
 @mcp.tool()
@@ -186,32 +535,111 @@ async def list_cached_pokemon() -> dict:
     Returns:
         dict: Information about the cached Pokemon data.
     """
+    if SNAPSHOT is not None:
+        last_updated = SNAPSHOT.created_at.isoformat()
+        pokemon_list = [
+            {**entry, "last_updated": last_updated, "is_expired": False}
+            for entry in SNAPSHOT.entries()
+        ]
+        return {"count": len(pokemon_list), "pokemon": pokemon_list}
+
     await ensure_db_initialized()
 
     try:
-        async with get_db_session() as session:
-            query = select(PokemonCache)
-            result = await session.execute(query)
-            cache_entries = result.scalars().all()
+        cache_entries = await get_store().list_pokemon()
+
+        pokemon_list = [
+            {
+                "id": entry.pokemon_id,
+                "name": entry.pokemon_name,
+                "last_updated": entry.last_updated.isoformat()
+                if entry.last_updated
+                else None,
+                "is_expired": entry.is_expired(),
+            }
+            for entry in cache_entries
+        ]
+
+        return {"count": len(pokemon_list), "pokemon": pokemon_list}
 
-            pokemon_list = [
-                {
-                    "id": entry.pokemon_id,
-                    "name": entry.pokemon_name,
-                    "last_updated": entry.last_updated.isoformat()
-                    if entry.last_updated
-                    else None,
-                    "is_expired": entry.is_expired(),
-                }
-                for entry in cache_entries
-            ]
+    except Exception as e:
+        logger.error(f"Error listing cached Pokemon: {e}")
+        return {"error": str(e), "count": 0, "pokemon": []}
+
+
+@mcp.tool()
+async def search_pokemon(
+    types: list[str] | None = None,
+    min_values: dict[str, int] | None = None,
+    max_values: dict[str, int] | None = None,
+    sort_by: str = "id",
+    descending: bool = False,
+    limit: int = 10,
+) -> dict:
+    """Search cached Pokemon by type, base stats, height and weight.
+
+    Only Pokemon that have been looked up before are searched.
+    Filterable and sortable fields are hp, attack, defense, special-attack,
+    special-defense, speed, height (decimetres) and weight (hectograms).
+    Args:
+         types (list[str]): Only return Pokemon that have all of these types.
+         min_values (dict[str, int]): Minimum value per field, e.g. {"attack": 120}.
+         max_values (dict[str, int]): Maximum value per field.
+         sort_by (str): The field to sort by, or "id" or "name".
+         descending (bool): Sort from highest to lowest.
+         limit (int): Maximum number of results, up to 50.
+    Returns:
+         dict: The matching Pokemon with their types and base stats.
+    """
+    if SNAPSHOT is not None:
+        return SNAPSHOT_UNSUPPORTED
 
-            return {"count": len(pokemon_list), "pokemon": pokemon_list}
+    await ensure_db_initialized()
 
+    min_values = min_values or {}
+    max_values = max_values or {}
+    unknown = (set(min_values) | set(max_values)) - set(SEARCHABLE_FIELDS)
+    if unknown:
+        return {"error": f"Unknown fields: {', '.join(sorted(unknown))}"}
+
+    if sort_by == "id":
+        sort_column = "pokemon_id"
+    elif sort_by == "name":
+        sort_column = "pokemon_name"
+    elif sort_by in SEARCHABLE_FIELDS:
+        sort_column = SEARCHABLE_FIELDS[sort_by]
+    else:
+        return {"error": f"Cannot sort by {sort_by}"}
+
+    # Only the typed columns are read, never the JSON data
+    try:
+        rows = await get_store().search_pokemon(
+            types=[t.lower() for t in types or []],
+            minimums={SEARCHABLE_FIELDS[f]: v for f, v in min_values.items()},
+            maximums={SEARCHABLE_FIELDS[f]: v for f, v in max_values.items()},
+            sort_column=sort_column,
+            descending=descending,
+            limit=max(1, min(limit, MAX_SEARCH_LIMIT)),
+        )
     except Exception as e:
-        logger.error(f"Error listing cached Pokemon: {e}")
+        logger.error(f"Error searching cached Pokemon: {e}")
         return {"error": str(e), "count": 0, "pokemon": []}
 
+    pokemon_list = [
+        {
+            "id": row.pokemon_id,
+            "name": row.pokemon_name,
+            "types": row.types,
+            "height": row.height,
+            "weight": row.weight,
+            "base_stats": {
+                stat: getattr(row, column) for stat, column in STAT_COLUMNS.items()
+            },
+        }
+        for row in rows
+    ]
+    return {"count": len(pokemon_list), "pokemon": pokemon_list}
+
 
 if __name__ == "__main__":
     logger.info("Starting PokeAPI MCP server")
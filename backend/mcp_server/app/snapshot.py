@@ -0,0 +1,259 @@
+"""Compact, memory-mapped snapshot of essential Pokemon data.
+
+A snapshot lets the MCP server answer get_basic_pokemon_data and
+list_cached_pokemon with no network and no database. The file is laid out so
+that opening it costs almost nothing: the index is read straight out of the
+memory map and each record is only decompressed and decoded when asked for.
+
+Layout (little-endian):
+
+    header      magic, version, record count, creation time
+    name index  one fixed-size entry per record, sorted by name
+    id index    (pokemon id, name index position) pairs, sorted by id
+    names       the UTF-8 names the name index points into
+    records     zlib-compressed JSON of each record's essential data
+
+Build one from PokeAPI or from the pokemon_cache table with:
+
+    python -m backend.mcp_server.app.snapshot build pokedex.snap
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import mmap
+import struct
+import time
+import zlib
+from functools import lru_cache
+
+logger = logging.getLogger("pokeapi-mcp-server")
+
+MAGIC = b"PKDXSNAP"
+VERSION = 1
+
+# magic, version, flags, record count, creation time (unix seconds)
+HEADER = struct.Struct("<8sHHIQ")
+# pokemon id, name offset, name length, record offset, record length
+NAME_ENTRY = struct.Struct("<IIHxxQI")
+# pokemon id, position in the name index
+ID_ENTRY = struct.Struct("<II")
+
+DECODED_CACHE_SIZE = 256
+
+
+class SnapshotError(Exception):
+    """The snapshot file is missing, truncated or not a snapshot."""
+
+
+def write_snapshot(path: str, records: list[dict]) -> int:
+    """Write essential Pokemon data records to a snapshot file.
+
+    Args:
+        path (str): Where to write the snapshot.
+        records (list[dict]): essential_data dicts, each with an id and name.
+    Returns:
+        int: The number of records written.
+    """
+    unique = {record["name"]: record for record in records}
+    ordered = sorted(unique.values(), key=lambda record: record["name"])
+
+    names = [record["name"].encode() for record in ordered]
+    blobs = [
+        zlib.compress(json.dumps(record, separators=(",", ":")).encode(), 9)
+        for record in ordered
+    ]
+
+    count = len(ordered)
+    names_offset = HEADER.size + count * (NAME_ENTRY.size + ID_ENTRY.size)
+    records_offset = names_offset + sum(len(name) for name in names)
+
+    name_index = bytearray()
+    name_offset, record_offset = names_offset, records_offset
+    for record, name, blob in zip(ordered, names, blobs):
+        name_index += NAME_ENTRY.pack(
+            record["id"], name_offset, len(name), record_offset, len(blob)
+        )
+        name_offset += len(name)
+        record_offset += len(blob)
+
+    id_index = bytearray()
+    for position, record in sorted(enumerate(ordered), key=lambda item: item[1]["id"]):
+        id_index += ID_ENTRY.pack(record["id"], position)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, count, int(time.time())))
+        f.write(name_index)
+        f.write(id_index)
+        for name in names:
+            f.write(name)
+        for blob in blobs:
+            f.write(blob)
+
+    logger.info(f"Wrote {count} records to {path} ({record_offset} bytes)")
+    return count
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {e}") from e
+
+        if len(self._mmap) < HEADER.size:
+            raise SnapshotError(f"{path} is too small to be a snapshot")
+        magic, version, _, self.count, created = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError(f"{path} is not a version {VERSION} snapshot")
+
+        self.created_at = datetime.datetime.fromtimestamp(created)
+        self._id_index_offset = HEADER.size + self.count * NAME_ENTRY.size
+
+        # Records are written in name order, so the last one ends the file
+        end = self._id_index_offset + self.count * ID_ENTRY.size
+        if self.count and len(self._mmap) >= end:
+            _, _, record_offset, record_length = self._name_entry(self.count - 1)
+            end = record_offset + record_length
+        if len(self._mmap) < end:
+            raise SnapshotError(f"{path} is truncated")
+        self._decode = lru_cache(maxsize=DECODED_CACHE_SIZE)(self._decode_record)
+
+        logger.info(f"Opened snapshot {path} with {self.count} records")
+
+    def __len__(self):
+        return self.count
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    def _name_entry(self, position: int) -> tuple[int, bytes, int, int]:
+        pokemon_id, name_offset, name_length, record_offset, record_length = (
+            NAME_ENTRY.unpack_from(self._mmap, HEADER.size + position * NAME_ENTRY.size)
+        )
+        name = self._mmap[name_offset : name_offset + name_length]
+        return pokemon_id, name, record_offset, record_length
+
+    def _decode_record(self, position: int) -> dict:
+        _, _, record_offset, record_length = self._name_entry(position)
+        blob = self._mmap[record_offset : record_offset + record_length]
+        return json.loads(zlib.decompress(blob))
+
+    def _find_name(self, name: str) -> int | None:
+        target = name.encode()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_entry(middle)[1] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count and self._name_entry(low)[1] == target:
+            return low
+        return None
+
+    def _find_id(self, pokemon_id: int) -> int | None:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_id, _ = ID_ENTRY.unpack_from(
+                self._mmap, self._id_index_offset + middle * ID_ENTRY.size
+            )
+            if entry_id < pokemon_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            entry_id, position = ID_ENTRY.unpack_from(
+                self._mmap, self._id_index_offset + low * ID_ENTRY.size
+            )
+            if entry_id == pokemon_id:
+                return position
+        return None
+
+    def get(self, name_or_id: str | int) -> dict | None:
+        """Look up a record by normalized name or by pokedex number."""
+        if isinstance(name_or_id, int) or name_or_id.isdigit():
+            position = self._find_id(int(name_or_id))
+        else:
+            position = self._find_name(name_or_id)
+        if position is None:
+            return None
+        return self._decode(position)
+
+    def entries(self) -> list[dict]:
+        """List the id and name of every record, without decoding any of them."""
+        entries = []
+        for position in range(self.count):
+            pokemon_id, name, _, _ = self._name_entry(position)
+            entries.append({"id": pokemon_id, "name": name.decode()})
+        return entries
+
+
+async def records_from_pokeapi(concurrency: int) -> list[dict]:
+    """Fetch essential data for every pokemon PokeAPI knows about."""
+    from backend.mcp_server.app.pokeapi_mcp_server import (
+        POKEAPI_BASE,
+        fetch_essential_data,
+        make_request,
+    )
+    from backend.mcp_server.app.upstream import UpstreamUnavailable
+
+    listing = await make_request(f"{POKEAPI_BASE}/pokemon?limit=100000")
+    if not listing:
+        raise SnapshotError("Could not list pokemon from PokeAPI")
+    names = [entry["name"] for entry in listing["results"]]
+    logger.info(f"Fetching {len(names)} pokemon from PokeAPI")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(name: str) -> dict | None:
+        async with semaphore:
+            try:
+                return await fetch_essential_data(name)
+            except UpstreamUnavailable as e:
+                logger.warning(f"Could not fetch {name}: {e}")
+                return None
+
+    records = await asyncio.gather(*(fetch(name) for name in names))
+    missing = [name for name, record in zip(names, records) if not record]
+    if missing:
+        logger.warning(f"Could not fetch {len(missing)} pokemon: {', '.join(missing)}")
+    return [record for record in records if record]
+
+
+async def records_from_cache() -> list[dict]:
+    """Read essential data for every pokemon in the pokemon_cache table."""
+    from backend.db.database import init_db
+    from backend.db.storage import get_store
+
+    await init_db()
+    return await get_store().all_pokemon_data()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build an offline Pokemon snapshot.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Write a snapshot file")
+    build.add_argument("path")
+    build.add_argument(
+        "--source",
+        choices=["pokeapi", "cache"],
+        default="pokeapi",
+        help="Fetch everything from PokeAPI, or export the pokemon_cache table",
+    )
+    build.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.source == "cache":
+        records = asyncio.run(records_from_cache())
+    else:
+        records = asyncio.run(records_from_pokeapi(args.concurrency))
+    write_snapshot(args.path, records)
@@ -0,0 +1,153 @@
+"""Resilient GETs against PokeAPI: tight timeouts, hedged retries and a circuit breaker.
+
+A slow or failing PokeAPI should cost a tool call at most a few seconds, and
+once it is clearly down it should cost nothing at all: the breaker opens after
+a run of failures and calls fail fast until a single probe gets through.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+import httpx
+
+logger = logging.getLogger("pokeapi-mcp-server")
+
+# Per-attempt timeout, and how long to wait on a slow attempt before hedging
+UPSTREAM_TIMEOUT = float(os.environ.get("POKEAPI_TIMEOUT", "4"))
+UPSTREAM_HEDGE_DELAY = float(os.environ.get("POKEAPI_HEDGE_DELAY", "0.75"))
+UPSTREAM_MAX_ATTEMPTS = int(os.environ.get("POKEAPI_MAX_ATTEMPTS", "3"))
+
+# Consecutive failures that open the circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("POKEAPI_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("POKEAPI_RESET_TIMEOUT", "30"))
+
+
+class UpstreamUnavailable(Exception):
+    """PokeAPI could not be reached, timed out, errored, or the circuit is open."""
+
+
+class CircuitBreaker:
+    """Closed, open or half-open, based on consecutive upstream failures.
+
+    While open every call is refused. After ``reset_timeout`` one call is let
+    through as a probe; its outcome closes the circuit or opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("PokeAPI circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self.probing:
+                logger.warning(
+                    f"PokeAPI circuit open for {self.reset_timeout:.0f}s "
+                    f"after {self.failures} failures"
+                )
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+async def _attempt(client: httpx.AsyncClient, url: str, timeout: float) -> dict | None:
+    """One GET. A 4xx means the resource doesn't exist; anything else is a failure."""
+    response = await client.get(url, timeout=timeout)
+    if 400 <= response.status_code < 500 and response.status_code != 429:
+        return None
+    response.raise_for_status()
+    return response.json()
+
+
+async def hedged_get(
+    client: httpx.AsyncClient,
+    url: str,
+    breaker: CircuitBreaker,
+    timeout: float = UPSTREAM_TIMEOUT,
+    hedge_delay: float = UPSTREAM_HEDGE_DELAY,
+    max_attempts: int = UPSTREAM_MAX_ATTEMPTS,
+) -> dict | None:
+    """GET a JSON resource, racing a second attempt if the first is slow.
+
+    A new attempt starts whenever the in-flight ones have taken longer than
+    ``hedge_delay`` or one of them fails, up to ``max_attempts`` in total. The
+    first answer wins and the rest are cancelled.
+
+    Returns:
+        dict | None: The decoded JSON, or None if PokeAPI says it doesn't exist.
+    Raises:
+        UpstreamUnavailable: If the circuit is open or every attempt failed.
+    """
+    if not breaker.allow():
+        raise UpstreamUnavailable(f"PokeAPI circuit is open, not fetching {url}")
+
+    # A half-open probe gets a single attempt
+    if breaker.state != "closed":
+        max_attempts = 1
+
+    pending: set[asyncio.Task] = set()
+    attempts = 0
+    last_error: Exception | None = None
+    try:
+        while True:
+            if attempts < max_attempts:
+                pending.add(asyncio.create_task(_attempt(client, url, timeout)))
+                attempts += 1
+
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if attempts < max_attempts else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is None:
+                    breaker.record_success()
+                    return task.result()
+                last_error = task.exception()
+                logger.warning(f"PokeAPI attempt for {url} failed: {last_error!r}")
+
+            if not pending and attempts >= max_attempts:
+                breaker.record_failure()
+                raise UpstreamUnavailable(
+                    f"PokeAPI failed after {attempts} attempts: {last_error!r}"
+                )
+    except asyncio.CancelledError:
+        # Let another call probe if this one was abandoned mid-probe
+        breaker.probing = False
+        raise
+    finally:
+        for task in pending:
+            task.cancel()
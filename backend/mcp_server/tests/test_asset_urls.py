@@ -0,0 +1,22 @@
+from backend.mcp_server.app.asset_urls import proxy_pokemon_assets
+
+
+def test_pokemon_data_asset_urls_are_proxied():
+    data = {
+        "id": 25,
+        "name": "pikachu",
+        "sprites": {
+            "default": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/25.png"
+        },
+        "default_sprite": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/25.png",
+        "cry_url": "https://play.pokemonshowdown.com/audio/cries/pikachu.mp3",
+        "cry_url_backup": "https://example.com/25.ogg",
+    }
+
+    proxied = proxy_pokemon_assets(data)
+
+    assert proxied["sprites"]["default"] == "/service/assets/sprites/pokemon/25.png"
+    assert proxied["default_sprite"] == "/service/assets/sprites/pokemon/25.png"
+    assert proxied["cry_url"] == "/service/assets/showdown-cries/pikachu.mp3"
+    assert proxied["cry_url_backup"] == "https://example.com/25.ogg"
+    assert data["cry_url"].startswith("https://")
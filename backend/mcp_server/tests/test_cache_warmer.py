@@ -0,0 +1,86 @@
+import asyncio
+import datetime
+
+from backend.mcp_server.app.cache_warmer import CacheWarmer, PopularityTracker
+
+
+def test_cache_warmer_refreshes_popular_entries_before_expiry():
+    popularity = PopularityTracker()
+    for name, requests in [("pikachu", 10), ("eevee", 5), ("mew", 2), ("ditto", 1)]:
+        popularity.touch(name, requests)
+
+    now = datetime.datetime.now()
+    cached = {
+        # Past the latest possible deadline (a day and a half before expiry)
+        "pikachu": now - datetime.timedelta(days=6, hours=12),
+        # Nowhere near expiry
+        "eevee": now - datetime.timedelta(days=1),
+        # Popular but not cached at all
+        "mew": None,
+        "ditto": now - datetime.timedelta(days=6, hours=23),
+    }
+    refreshed = []
+
+    async def last_updated(names):
+        return {name: cached[name] for name in names}
+
+    async def refresh(name):
+        refreshed.append(name)
+        return True
+
+    warmer = CacheWarmer(
+        popularity,
+        ttl=datetime.timedelta(days=7),
+        last_updated=last_updated,
+        refresh=refresh,
+        top_n=3,
+        per_minute=6000,
+    )
+
+    assert asyncio.run(warmer.warm()) == 2
+    # ditto is about to expire but isn't in the top 3
+    assert refreshed == ["pikachu", "mew"]
+
+
+def test_cache_warmer_backs_off_failed_refreshes():
+    popularity = PopularityTracker()
+    popularity.touch("missingno", 10)
+    popularity.touch("pikachu", 5)
+    attempts = []
+
+    async def last_updated(names):
+        # Neither is cached: missingno 404s upstream, pikachu keeps failing to store
+        return {}
+
+    async def refresh(name):
+        attempts.append(name)
+        return name == "pikachu" and len(attempts) > 4
+
+    warmer = CacheWarmer(
+        popularity,
+        ttl=datetime.timedelta(days=7),
+        last_updated=last_updated,
+        refresh=refresh,
+        per_minute=6000,
+        retry_after=0.1,
+    )
+
+    async def run():
+        assert await warmer.warm() == 0
+        # Both are backing off, so the next pass refreshes nothing
+        assert await warmer.warm() == 0
+        assert attempts == ["missingno", "pikachu"]
+
+        await asyncio.sleep(0.15)
+        assert await warmer.warm() == 0
+        assert attempts == ["missingno", "pikachu"] * 2
+
+        # The second failure doubles the wait
+        await asyncio.sleep(0.15)
+        assert await warmer.warm() == 0
+        await asyncio.sleep(0.1)
+        assert await warmer.warm() == 1
+        assert attempts == ["missingno", "pikachu"] * 3
+
+    asyncio.run(run())
+    assert list(warmer._backoff) == ["missingno"]
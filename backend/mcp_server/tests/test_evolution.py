@@ -0,0 +1,99 @@
+import datetime
+
+from backend.mcp_server.app.evolution import EvolutionGraph, compact_evolution_chain
+
+EEVEE_CHAIN = {
+    "id": 67,
+    "chain": {
+        "species": {"name": "eevee", "url": "https://pokeapi.co/api/v2/species/133/"},
+        "evolution_details": [],
+        "evolves_to": [
+            {
+                "species": {"name": "vaporeon"},
+                "evolution_details": [
+                    {
+                        "trigger": {"name": "use-item"},
+                        "item": {"name": "water-stone"},
+                        "min_level": None,
+                        "needs_overworld_rain": False,
+                        "time_of_day": "",
+                    }
+                ],
+                "evolves_to": [],
+            },
+            {
+                "species": {"name": "espeon"},
+                "evolution_details": [
+                    {
+                        "trigger": {"name": "level-up"},
+                        "min_happiness": 160,
+                        "time_of_day": "day",
+                    }
+                ],
+                "evolves_to": [],
+            },
+        ],
+    },
+}
+
+
+def test_compact_evolution_chain_keeps_set_conditions_in_stage_order():
+    chain = compact_evolution_chain(EEVEE_CHAIN)
+
+    assert chain["chain_id"] == 67
+    assert chain["stages"] == [
+        {"species": "eevee", "stage": 1, "evolves_from": None, "conditions": []},
+        {
+            "species": "vaporeon",
+            "stage": 2,
+            "evolves_from": "eevee",
+            "conditions": [{"trigger": "use-item", "item": "water-stone"}],
+        },
+        {
+            "species": "espeon",
+            "stage": 2,
+            "evolves_from": "eevee",
+            "conditions": [
+                {"trigger": "level-up", "min_happiness": 160, "time_of_day": "day"}
+            ],
+        },
+    ]
+
+
+def test_evolution_graph_looks_up_species_and_aliases():
+    graph = EvolutionGraph()
+    chain = compact_evolution_chain(EEVEE_CHAIN)
+    graph.add(chain, last_updated=datetime.datetime.now() - datetime.timedelta(days=60))
+
+    assert len(graph) == 1
+    assert graph.lookup("espeon")["pokemon"] == "espeon"
+    assert [stage["species"] for stage in graph.lookup("vaporeon")["stages"]] == [
+        "eevee",
+        "vaporeon",
+        "espeon",
+    ]
+    assert graph.lookup("eevee-starter") is None
+    assert graph.is_stale(67)
+    assert graph.is_stale(999)
+
+    assert graph.add_alias("eevee-starter", "eevee")
+    assert not graph.add_alias("eevee-starter", "eevee")
+    assert not graph.add_alias("missingno-a", "missingno")
+    assert graph.lookup("eevee-starter")["pokemon"] == "eevee"
+
+    # Replacing a chain drops species that are no longer in it
+    graph.add({"chain_id": 67, "stages": chain["stages"][:2]})
+    assert graph.lookup("espeon") is None
+    assert graph.lookup("vaporeon")["chain_id"] == 67
+    assert not graph.is_stale(67)
+
+    # Lookups hand out a copy of the stages
+    graph.lookup("eevee")["stages"].clear()
+    assert len(graph.lookup("eevee")["stages"]) == 2
+
+    # Aliases are kept on the chain, so a graph loaded from storage has them
+    stored = graph.chains[67]
+    assert stored["aliases"] == {"eevee-starter": "eevee"}
+    reloaded = EvolutionGraph()
+    reloaded.add(stored)
+    assert reloaded.lookup("eevee-starter")["chain_id"] == 67
@@ -0,0 +1,85 @@
+import asyncio
+
+from backend.mcp_server.app import pokeapi_mcp_server as server
+from backend.mcp_server.app.cache_warmer import PopularityTracker
+
+
+def test_get_many_pokemon_data(database_url, records, run_with_store, monkeypatch):
+    fetched = {record["name"]: record for record in records[1:]}
+    fetched.update({str(record["id"]): record for record in records})
+    lookups, upserts = [], []
+    in_flight = peak = 0
+
+    async def fetch_essential_data(name):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return fetched.get(name)
+
+    monkeypatch.setattr(server, "DATABASE_INITIALIZED", True)
+    monkeypatch.setattr(server, "FETCH_CONCURRENCY", 2)
+    monkeypatch.setattr(server, "POPULARITY", PopularityTracker())
+    monkeypatch.setattr(server, "fetch_essential_data", fetch_essential_data)
+
+    async def test(store):
+        get_many_pokemon = store.get_many_pokemon
+        upsert_pokemon = store.upsert_pokemon
+
+        async def spy_get_many(names):
+            lookups.append(names)
+            return await get_many_pokemon(names)
+
+        async def spy_upsert(records):
+            upserts.append([record["name"] for record in records])
+            return await upsert_pokemon(records)
+
+        monkeypatch.setattr(store, "get_many_pokemon", spy_get_many)
+        monkeypatch.setattr(store, "upsert_pokemon", spy_upsert)
+        monkeypatch.setattr(server, "get_store", lambda: store)
+        await upsert_pokemon([records[0]])
+
+        too_many = await server.get_many_pokemon_data(["pikachu"] * 11)
+        assert "error" in too_many
+
+        requested = ["Charizard", "pikachu", "missingno", "dragonite", "384"]
+        result = await server.get_many_pokemon_data(requested + ["PIKACHU"])
+        cached = await store.list_pokemon()
+        popular = sorted(server.POPULARITY.scores)
+        batch_upserts = list(upserts)
+
+        # A pokedex number is counted under the pokemon's name, hit or miss
+        charizard = await server.get_basic_pokemon_data("6")
+        assert charizard["name"] == "charizard"
+        pikachu = await server.get_basic_pokemon_data("Pikachu")
+        assert pikachu["cache_status"] == "hit"
+        assert upserts[len(batch_upserts) :] == [["charizard"]]
+        assert "6" not in server.POPULARITY.scores
+
+        cached = sorted(entry.pokemon_name for entry in cached)
+        return result, cached, popular, batch_upserts
+
+    result, cached, popular, upserts = run_with_store(database_url, test)
+
+    assert [entry["pokemon_name"] for entry in result["results"]] == [
+        "Charizard",
+        "pikachu",
+        "missingno",
+        "dragonite",
+        "384",
+        "PIKACHU",
+    ]
+    charizard, pikachu, missingno, dragonite, rayquaza, again = result["results"]
+    assert charizard["data"]["id"] == 6
+    assert pikachu["data"]["id"] == again["data"]["id"] == 25
+    assert missingno == {"pokemon_name": "missingno", "error": "Pokemon not found"}
+    assert rayquaza["data"]["id"] == 384
+
+    # One lookup for the batch, one upsert for everything fetched, and no
+    # more fetches at once than FETCH_CONCURRENCY
+    assert lookups == [["charizard", "pikachu", "missingno", "dragonite", "384"]]
+    assert upserts == [["pikachu", "dragonite", "rayquaza"]]
+    assert peak == 2
+    assert cached == ["charizard", "dragonite", "pikachu", "rayquaza"]
+    assert popular == ["charizard", "dragonite", "pikachu", "rayquaza"]
@@ -0,0 +1,69 @@
+import pytest
+from backend.mcp_server.app.snapshot import Snapshot, SnapshotError, write_snapshot
+
+RECORDS = [
+    {"id": 25, "name": "pikachu", "types": ["electric"]},
+    {"id": 6, "name": "charizard", "types": ["fire", "flying"]},
+    {"id": 487, "name": "giratina-altered", "types": ["ghost", "dragon"]},
+    {"id": 133, "name": "eevee", "types": ["normal"]},
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "pokedex.snap"
+    # A repeated name keeps only its last record
+    assert write_snapshot(str(path), RECORDS + [{**RECORDS[0], "height": 4}]) == 4
+    return path
+
+
+def test_snapshot_roundtrip(snapshot_path):
+    snapshot = Snapshot(str(snapshot_path))
+    try:
+        assert len(snapshot) == snapshot.count == 4
+        assert snapshot.created_at.year >= 2024
+        assert snapshot.get("pikachu") == {**RECORDS[0], "height": 4}
+        assert snapshot.get("giratina-altered")["id"] == 487
+        assert snapshot.get(6)["name"] == "charizard"
+        assert snapshot.get("133")["name"] == "eevee"
+        assert snapshot.get("missingno") is None
+        assert snapshot.get("zzz") is None
+        assert snapshot.get(0) is None
+        assert snapshot.get(999) is None
+        assert snapshot.entries() == [
+            {"id": 6, "name": "charizard"},
+            {"id": 133, "name": "eevee"},
+            {"id": 487, "name": "giratina-altered"},
+            {"id": 25, "name": "pikachu"},
+        ]
+    finally:
+        snapshot.close()
+
+
+def test_empty_snapshot(tmp_path):
+    path = tmp_path / "empty.snap"
+    write_snapshot(str(path), [])
+
+    snapshot = Snapshot(str(path))
+    assert snapshot.get("pikachu") is None
+    assert snapshot.get(25) is None
+    assert snapshot.entries() == []
+
+
+@pytest.mark.parametrize("keep", [0, 10, 100, -1])
+def test_truncated_snapshot_is_rejected(snapshot_path, keep):
+    data = snapshot_path.read_bytes()
+    snapshot_path.write_bytes(data[:keep])
+
+    with pytest.raises(SnapshotError):
+        Snapshot(str(snapshot_path))
+
+
+def test_bad_magic_and_missing_files_are_rejected(snapshot_path, tmp_path):
+    data = snapshot_path.read_bytes()
+    snapshot_path.write_bytes(b"NOTASNAP" + data[8:])
+
+    with pytest.raises(SnapshotError, match="not a version 1 snapshot"):
+        Snapshot(str(snapshot_path))
+    with pytest.raises(SnapshotError, match="Cannot open"):
+        Snapshot(str(tmp_path / "missing.snap"))
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+import pytest
+from backend.mcp_server.app.upstream import (
+    CircuitBreaker,
+    UpstreamUnavailable,
+    hedged_get,
+)
+
+
+def test_hedged_get_races_a_slow_upstream():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        if request.url.path.endswith("missingno"):
+            return httpx.Response(404)
+        return httpx.Response(200, json={"name": "pikachu", "call": len(calls)})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            breaker = CircuitBreaker()
+            found = await hedged_get(
+                client, "http://pokeapi.test/pokemon/pikachu", breaker, hedge_delay=0.05
+            )
+            missing = await hedged_get(
+                client, "http://pokeapi.test/pokemon/missingno", breaker
+            )
+            return found, missing
+
+    found, missing = asyncio.run(run())
+
+    assert found == {"name": "pikachu", "call": 2}
+    assert missing is None
+
+
+def test_circuit_breaker_fails_fast_then_probes():
+    calls = []
+    healthy = False
+
+    def handler(request):
+        calls.append(request.url.path)
+        if healthy:
+            return httpx.Response(200, json={"ok": True})
+        return httpx.Response(503)
+
+    async def run():
+        nonlocal healthy
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+            for _ in range(2):
+                with pytest.raises(UpstreamUnavailable):
+                    await hedged_get(client, "http://pokeapi.test/x", breaker)
+            assert breaker.state == "open"
+            attempts = len(calls)
+
+            with pytest.raises(UpstreamUnavailable):
+                await hedged_get(client, "http://pokeapi.test/x", breaker)
+            assert len(calls) == attempts
+
+            await asyncio.sleep(0.06)
+            healthy = True
+            assert await hedged_get(client, "http://pokeapi.test/x", breaker) == {
+                "ok": True
+            }
+            assert len(calls) == attempts + 1
+            assert breaker.state == "closed"
+
+    asyncio.run(run())
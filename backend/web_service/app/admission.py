@@ -0,0 +1,255 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional
+
+from backend.web_service.app.llm_context import count_tokens
+from backend.web_service.app.metrics import metrics
+from backend.web_service.app.schemas import ErrorResponse
+from litestar import MediaType, Request
+from litestar.response import Response
+
+logger = logging.getLogger("admission")
+
+PROVIDERS = ("openai", "anthropic", "groq")
+
+# Defaults per provider, overridable with e.g. OPENAI_MAX_CONCURRENCY.
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+DEFAULT_MAX_WAIT = 10.0
+
+
+class Priority(IntEnum):
+    """Queue priority of an LLM call; lower values are admitted first."""
+
+    TEXT = 0
+    AUDIO = 1
+    IMAGE = 2
+
+
+class AdmissionRejected(Exception):
+    """A provider call was turned away instead of being queued or run."""
+
+    def __init__(self, provider: str, reason: str, status_code: int, retry_after: int):
+        super().__init__(f"{provider} is busy: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def admission_rejected_handler(request: Request, exc: AdmissionRejected) -> Response:
+    """Turn an AdmissionRejected into a 429 or 503 with Retry-After."""
+    return Response(
+        content=ErrorResponse(error=str(exc)),
+        status_code=exc.status_code,
+        media_type=MediaType.JSON,
+        headers={"retry-after": str(exc.retry_after)},
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of a prompt, for budgeting against provider limits."""
+    return count_tokens(text)
+
+
+class TokenBucket:
+    """A per-minute budget that refills continuously."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.available = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(
+            self.capacity, self.available + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until ``amount`` is available (0 if it is available now)."""
+        self._refill()
+        # A single request bigger than the whole budget waits for a full bucket
+        needed = min(amount, self.capacity)
+        if self.available >= needed:
+            return 0.0
+        return (needed - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+
+class ProviderLimiter:
+    """Concurrency limit, request/token budgets and a bounded priority queue.
+
+    Calls are admitted immediately when a slot and budget are free and nobody
+    is waiting. Otherwise they queue by priority; a full queue rejects with
+    429 straight away and a call that waits longer than ``max_wait`` is
+    rejected with 503.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        requests_per_minute: Optional[float] = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: Optional[float] = DEFAULT_TOKENS_PER_MINUTE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.running = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        metrics.gauge(f"admission.{name}.queue_depth", lambda: len(self._waiters))
+        metrics.gauge(f"admission.{name}.running", lambda: self.running)
+
+    @classmethod
+    def from_env(cls, name: str) -> "ProviderLimiter":
+        prefix = name.upper()
+
+        def setting(key: str, default: float) -> float:
+            return float(os.environ.get(f"{prefix}_{key}", default))
+
+        return cls(
+            name,
+            max_concurrency=int(setting("MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            max_queue=int(setting("MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+            requests_per_minute=setting(
+                "REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE
+            ),
+            tokens_per_minute=setting("TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE),
+            max_wait=setting("MAX_WAIT", DEFAULT_MAX_WAIT),
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _budget_delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self.requests:
+            delay = max(delay, self.requests.delay_for(1))
+        if self.tokens and tokens:
+            delay = max(delay, self.tokens.delay_for(tokens))
+        return delay
+
+    def _start(self, tokens: int) -> None:
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens and tokens:
+            self.tokens.take(tokens)
+        self.running += 1
+
+    def _reject(self, reason: str, status_code: int) -> AdmissionRejected:
+        metrics.inc(f"admission.{self.name}.rejected.{reason.replace(' ', '_')}")
+        logger.warning(f"Rejected {self.name} call: {reason}")
+        return AdmissionRejected(
+            self.name, reason, status_code, retry_after=max(1, round(self.max_wait))
+        )
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters and self.running < self.max_concurrency:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            delay = self._budget_delay(tokens)
+            if delay > 0:
+                # Out of budget: try again once enough of it has refilled
+                self._timer = asyncio.get_running_loop().call_later(
+                    delay, self._dispatch
+                )
+                return
+
+            heapq.heappop(self._waiters)
+            self._start(tokens)
+            future.set_result(None)
+
+    async def acquire(self, priority: Priority, tokens: int = 0) -> None:
+        started = time.monotonic()
+
+        if (
+            not self._waiters
+            and self.running < self.max_concurrency
+            and self._budget_delay(tokens) == 0
+        ):
+            self._start(tokens)
+        else:
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject("queue full", 429)
+
+            future = asyncio.get_running_loop().create_future()
+            entry = [priority, next(self._sequence), future, tokens]
+            heapq.heappush(self._waiters, entry)
+            self._dispatch()
+
+            try:
+                await asyncio.wait_for(future, timeout=self.max_wait)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                if future.done() and not future.cancelled():
+                    # Admitted just as we gave up; hand the slot back
+                    self.release()
+                elif entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._reject("wait timeout", 503) from None
+                raise
+
+        metrics.inc(f"admission.{self.name}.admitted")
+        metrics.observe(
+            f"admission.{self.name}.wait_seconds", time.monotonic() - started
+        )
+
+    def release(self) -> None:
+        self.running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority, tokens: int = 0) -> AsyncIterator[None]:
+        """Hold a slot with this provider for the duration of the block."""
+        await self.acquire(priority, tokens)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class AdmissionController:
+    """The shared set of per-provider limiters."""
+
+    def __init__(self, limiters: Dict[str, ProviderLimiter]) -> None:
+        self.limiters = limiters
+
+    @classmethod
+    def from_env(cls, providers=PROVIDERS) -> "AdmissionController":
+        return cls({name: ProviderLimiter.from_env(name) for name in providers})
+
+    def admit(self, provider: str, priority: Priority, tokens: int = 0):
+        return self.limiters[provider].admit(priority, tokens)
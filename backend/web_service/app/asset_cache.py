@@ -0,0 +1,342 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional, Tuple
+
+import httpx
+from backend.mcp_server.app.asset_urls import ASSET_ORIGINS
+from backend.web_service.app.static_assets import etag_matches
+from litestar import Request, get
+from litestar.background_tasks import BackgroundTask
+from litestar.handlers import HTTPRouteHandler
+from litestar.response import Response, Stream
+
+logger = logging.getLogger("asset-cache")
+
+ASSET_CACHE_DIR = os.environ.get(
+    "ASSET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "pokedex-assets")
+)
+ASSET_CACHE_MAX_BYTES = int(os.environ.get("ASSET_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Sprites and cries are tiny; anything bigger is not something we should cache.
+MAX_ASSET_BYTES = 5 * 1024 * 1024
+FETCH_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+
+# Upstream files at a given URL never change, so clients may keep them forever.
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class AssetNotFound(Exception):
+    """The upstream host has no such asset."""
+
+
+class AssetUnavailable(Exception):
+    """The asset could not be fetched from the upstream host."""
+
+
+@dataclass
+class CachedAsset:
+    """An asset stored in the disk cache."""
+
+    key: str
+    path: Path
+    size: int
+    media_type: str
+
+
+class AssetCache:
+    """Size-bounded LRU disk cache in front of the upstream asset hosts.
+
+    Each asset is fetched once: concurrent requests for the same missing asset
+    share one upstream fetch. Recency is tracked in memory; after a restart the
+    existing files are re-adopted in order of when they were fetched.
+    """
+
+    def __init__(
+        self,
+        directory: str = ASSET_CACHE_DIR,
+        max_bytes: int = ASSET_CACHE_MAX_BYTES,
+        origins: Optional[Dict[str, str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.origins = origins if origins is not None else ASSET_ORIGINS
+        self._client = client
+        self._entries: "OrderedDict[str, CachedAsset]" = OrderedDict()
+        self._total_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load_existing()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _load_existing(self) -> None:
+        files = []
+        for path in self.directory.iterdir():
+            if path.is_file() and not path.name.startswith("."):
+                files.append((path.stat(), path))
+
+        for stat, path in sorted(files, key=lambda item: item[0].st_mtime):
+            key = path.name.split(".", 1)[0]
+            self._add(key, path, stat.st_size)
+        self._evict()
+
+        logger.info(
+            f"Asset cache has {len(self._entries)} files ({self._total_bytes} bytes)"
+        )
+
+    def upstream_url(self, origin: str, path: str) -> Optional[str]:
+        """Build the upstream URL for an asset, rejecting unknown origins."""
+        base = self.origins.get(origin)
+        path = path.lstrip("/")
+        if base is None or not path or ".." in path.split("/"):
+            return None
+        return base + path
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def _add(self, key: str, path: Path, size: int) -> CachedAsset:
+        media_type, _ = mimetypes.guess_type(path.name)
+        asset = CachedAsset(key, path, size, media_type or "application/octet-stream")
+        self._entries[key] = asset
+        self._total_bytes += size
+        return asset
+
+    def _forget(self, asset: CachedAsset) -> None:
+        if self._entries.get(asset.key) is asset:
+            del self._entries[asset.key]
+            self._total_bytes -= asset.size
+
+    def _evict(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the bound.
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, asset = self._entries.popitem(last=False)
+            self._total_bytes -= asset.size
+            try:
+                asset.path.unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted {asset.path.name} from the asset cache")
+
+    async def get(self, origin: str, path: str) -> CachedAsset:
+        """Return a cached asset, fetching it from upstream on a miss.
+
+        Raises:
+            AssetNotFound: If the origin is unknown or upstream returns 404.
+            AssetUnavailable: If upstream could not be reached.
+        """
+        url = self.upstream_url(origin, path)
+        if url is None:
+            raise AssetNotFound(f"Unknown asset {origin}/{path}")
+
+        key = self.key_for(url)
+        asset = self._entries.get(key)
+        if asset is not None:
+            self._entries.move_to_end(key)
+            return asset
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch(key, url))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(inflight)
+
+    async def open(self, origin: str, path: str) -> Tuple[CachedAsset, BinaryIO]:
+        """Return a cached asset with its file open for reading.
+
+        An open file stays readable even if eviction deletes it while it is
+        being served. If it was evicted between the lookup and the open, it is
+        fetched again once.
+        """
+        for _ in range(2):
+            asset = await self.get(origin, path)
+            try:
+                return asset, open(asset.path, "rb")
+            except FileNotFoundError:
+                self._forget(asset)
+        raise AssetUnavailable(f"{origin}/{path} was evicted while being served")
+
+    async def _fetch(self, key: str, url: str) -> CachedAsset:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=FETCH_TIMEOUT, follow_redirects=True
+            )
+
+        try:
+            response = await self._client.get(url)
+        except httpx.HTTPError as e:
+            raise AssetUnavailable(f"Error fetching {url}: {e}") from e
+
+        if response.status_code == 404:
+            raise AssetNotFound(f"{url} not found upstream")
+        if response.status_code != 200:
+            raise AssetUnavailable(f"{url} returned {response.status_code}")
+        if len(response.content) > MAX_ASSET_BYTES:
+            raise AssetUnavailable(f"{url} is larger than {MAX_ASSET_BYTES} bytes")
+
+        suffix = Path(url).suffix
+        path = self.directory / f"{key}{suffix}"
+        await asyncio.to_thread(self._write_file, path, response.content)
+        logger.info(f"Cached {url} ({len(response.content)} bytes)")
+
+        asset = self._add(key, path, len(response.content))
+        self._evict()
+        return asset
+
+    def _write_file(self, path: Path, content: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @staticmethod
+    async def read_range(file: BinaryIO, start: int, end: int) -> bytes:
+        """Read the inclusive byte range [start, end] of an open asset file."""
+
+        def read() -> bytes:
+            file.seek(start)
+            return file.read(end - start + 1)
+
+        return await asyncio.to_thread(read)
+
+    @staticmethod
+    async def iter_file(file: BinaryIO) -> AsyncIterator[bytes]:
+        """Stream an open asset file, closing it when done.
+
+        If the client disconnects before the stream starts, the generator
+        never runs; the proxy also closes the file once the response ends.
+        """
+        try:
+            while chunk := await asyncio.to_thread(file.read, READ_CHUNK_SIZE):
+                yield chunk
+        finally:
+            file.close()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range Range header into an inclusive (start, end).
+
+    Returns None when the range can't be satisfied. Multi-range requests are
+    treated as unsatisfiable rather than answered with multipart bodies.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or size == 0:
+        return None
+
+    start, end = match.groups()
+    if not start:
+        if not end or int(end) == 0:
+            return None
+        # Suffix range: the last N bytes.
+        return max(size - int(end), 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def create_asset_proxy_router(
+    cache: AssetCache,
+    path: str = "/service/assets",
+    opt: Optional[Dict[str, Any]] = None,
+) -> HTTPRouteHandler:
+    """Create the route handler serving proxied sprites and cries from ``cache``."""
+
+    @get(
+        f"{path}/{{origin:str}}/{{asset_path:path}}",
+        opt=opt,
+        include_in_schema=False,
+    )
+    async def asset_proxy(request: Request, origin: str, asset_path: str) -> Response:
+        try:
+            asset, file = await cache.open(origin, asset_path)
+        except AssetNotFound:
+            return Response(content=b"", status_code=404)
+        except AssetUnavailable as e:
+            logger.warning(str(e))
+            return Response(content=b"", status_code=502)
+
+        etag = f'"{asset.key}"'
+        headers = {
+            "accept-ranges": "bytes",
+            "cache-control": ASSET_CACHE_CONTROL,
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, etag):
+            file.close()
+            return Response(
+                content=b"", status_code=304, headers={**headers, "etag": etag}
+            )
+
+        range_header = request.headers.get("range")
+        if range_header:
+            byte_range = parse_range(range_header, asset.size)
+            if byte_range is None:
+                file.close()
+                return Response(
+                    content=b"",
+                    status_code=416,
+                    headers={**headers, "content-range": f"bytes */{asset.size}"},
+                )
+            start, end = byte_range
+            try:
+                content = await cache.read_range(file, start, end)
+            finally:
+                file.close()
+            return Response(
+                content=content,
+                status_code=206,
+                media_type=asset.media_type,
+                headers={
+                    **headers,
+                    "etag": etag,
+                    "content-range": f"bytes {start}-{end}/{asset.size}",
+                },
+            )
+
+        return Stream(
+            content=cache.iter_file(file),
+            media_type=asset.media_type,
+            headers={
+                **headers,
+                "etag": etag,
+                "content-length": str(asset.size),
+                "content-disposition": "inline",
+            },
+            background=BackgroundTask(file.close),
+        )
+
+    return asset_proxy
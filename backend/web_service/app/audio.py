@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import os
+import shutil
+import subprocess
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from backend.web_service.app.metrics import metrics
+
+logger = logging.getLogger("audio")
+
+FFMPEG = os.environ.get("FFMPEG_PATH") or shutil.which("ffmpeg")
+AUDIO_NORMALIZE = os.environ.get("AUDIO_NORMALIZE", "true").lower() != "false"
+AUDIO_WORKERS = int(os.environ.get("AUDIO_WORKERS", "2"))
+FFMPEG_TIMEOUT = 30
+
+# Whisper works on 16 kHz mono, so nothing above that is worth uploading
+SAMPLE_RATE = 16_000
+BYTES_PER_SECOND = SAMPLE_RATE * 2  # 16-bit PCM
+
+# Leading/trailing audio quieter than this peak (about -45 dBFS) is silence;
+# keep a little padding so the first and last words aren't clipped.
+SILENCE_PEAK = 180
+SILENCE_FRAME_SECONDS = 0.02
+SILENCE_PADDING_SECONDS = 0.15
+
+OPUS_BITRATE = "24k"
+
+# Anything ffmpeg can read -> 16 kHz mono raw PCM
+DECODE_ARGS = ["-i", "pipe:0", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le"]
+# Raw PCM -> Opus tuned for speech, in an Ogg container
+ENCODE_ARGS = ["-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-i", "pipe:0"]
+ENCODE_ARGS += ["-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip"]
+ENCODE_ARGS += ["-f", "ogg"]
+
+AUDIO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=AUDIO_WORKERS, thread_name_prefix="audio-normalize"
+)
+
+
+class AudioNormalizationError(Exception):
+    """ffmpeg is missing or could not process the audio."""
+
+
+class SilentRecording(Exception):
+    """The recording has no speech in it, so there is nothing to transcribe."""
+
+
+@dataclass
+class NormalizedAudio:
+    """Audio ready for transcription, with what normalizing it saved."""
+
+    data: bytes
+    suffix: str
+    original_bytes: int
+    original_seconds: float | None = None
+    seconds: float | None = None
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    @property
+    def seconds_saved(self) -> float:
+        if self.original_seconds is None or self.seconds is None:
+            return 0.0
+        return self.original_seconds - self.seconds
+
+
+def _ffmpeg(args: list[str], data: bytes) -> bytes:
+    if not FFMPEG:
+        raise AudioNormalizationError("ffmpeg is not installed")
+    try:
+        result = subprocess.run(
+            [FFMPEG, "-hide_banner", "-loglevel", "error", *args],
+            input=data,
+            capture_output=True,
+            timeout=FFMPEG_TIMEOUT,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise AudioNormalizationError(e.stderr.decode(errors="replace").strip()) from e
+    except subprocess.TimeoutExpired as e:
+        raise AudioNormalizationError("ffmpeg timed out") from e
+    return result.stdout
+
+
+def trim_silence(pcm: bytes) -> bytes:
+    """Drop leading and trailing silence from 16 kHz mono s16le PCM."""
+    samples = array("h", pcm)
+    frame = int(SAMPLE_RATE * SILENCE_FRAME_SECONDS)
+    frames = range(0, len(samples), frame)
+
+    def is_loud(start: int) -> bool:
+        chunk = samples[start : start + frame]
+        return max(chunk) > SILENCE_PEAK or -min(chunk) > SILENCE_PEAK
+
+    loud = [start for start in frames if is_loud(start)]
+    if not loud:
+        return b""
+
+    padding = int(SAMPLE_RATE * SILENCE_PADDING_SECONDS)
+    start = max(0, loud[0] - padding)
+    end = min(len(samples), loud[-1] + frame + padding)
+    return samples[start:end].tobytes()
+
+
+def normalize_audio(audio_data: bytes) -> NormalizedAudio:
+    """Downmix to mono, resample to 16 kHz, trim silence and encode as Opus.
+
+    This blocks on ffmpeg; run it in AUDIO_EXECUTOR.
+    """
+    pcm = _ffmpeg([*DECODE_ARGS, "pipe:1"], audio_data)
+    trimmed = trim_silence(pcm)
+    if not trimmed:
+        raise SilentRecording("The recording is silent")
+
+    encoded = _ffmpeg([*ENCODE_ARGS, "pipe:1"], trimmed)
+    return NormalizedAudio(
+        data=encoded,
+        suffix=".ogg",
+        original_bytes=len(audio_data),
+        original_seconds=len(pcm) / BYTES_PER_SECOND,
+        seconds=len(trimmed) / BYTES_PER_SECOND,
+    )
+
+
+async def prepare_for_transcription(
+    audio_data: bytes, suffix: str = ".webm"
+) -> NormalizedAudio:
+    """Normalize audio off the event loop, falling back to the original bytes.
+
+    Raises SilentRecording if the audio decodes to nothing but silence.
+    """
+    original = NormalizedAudio(
+        data=audio_data, suffix=suffix, original_bytes=len(audio_data)
+    )
+    if not AUDIO_NORMALIZE:
+        return original
+
+    started = time.monotonic()
+    try:
+        loop = asyncio.get_running_loop()
+        normalized = await loop.run_in_executor(
+            AUDIO_EXECUTOR, normalize_audio, audio_data
+        )
+    except AudioNormalizationError as e:
+        logger.warning(f"Sending audio as recorded, could not normalize it: {e}")
+        metrics.inc("audio.normalize_failed")
+        return original
+
+    # Opus at voice bitrates is almost always smaller, but never send more
+    if normalized.bytes_saved < 0:
+        return original
+
+    metrics.observe("audio.normalize_seconds", time.monotonic() - started)
+    metrics.inc("audio.bytes_saved", normalized.bytes_saved)
+    metrics.inc("audio.seconds_saved", normalized.seconds_saved)
+    logger.info(
+        f"Normalized audio from {normalized.original_bytes} to "
+        f"{len(normalized.data)} bytes and {normalized.original_seconds:.2f}s "
+        f"to {normalized.seconds:.2f}s"
+    )
+    return normalized
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from backend.web_service.app.metrics import metrics
+from litestar.types import Receive
+
+logger = logging.getLogger("coalesce")
+
+
+class ClientDisconnected(Exception):
+    """The client went away before its response was ready."""
+
+
+def normalize_query(query: str) -> str:
+    """Key for a chat query: case and whitespace don't change the answer."""
+    return " ".join(query.casefold().split())
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """Run concurrent calls with the same key once and share the result.
+
+    The first caller for a key starts the work as a task; callers that arrive
+    while it is running wait on the same task. A caller that is cancelled
+    (e.g. its client disconnected) stops waiting without affecting the
+    others, and the work itself is only cancelled once nobody is waiting.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.in_flight: Dict[str, _Flight] = {}
+
+        metrics.gauge(f"coalesce.{name}.in_flight", lambda: len(self.in_flight))
+
+    async def run(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self.in_flight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(work()))
+            self.in_flight[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            metrics.inc(f"coalesce.{self.name}.executed")
+        else:
+            metrics.inc(f"coalesce.{self.name}.coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                logger.info(f"Last waiter for {self.name} request left, cancelling it")
+                metrics.inc(f"coalesce.{self.name}.cancelled")
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _finish(self, key: str, flight: _Flight) -> None:
+        if self.in_flight.get(key) is flight:
+            del self.in_flight[key]
+        # Nobody may be left to see an error; mark it retrieved
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+
+async def _disconnected(receive: Receive) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(receive: Receive, work: Awaitable[Any]) -> Any:
+    """Await ``work``, cancelling it if the client disconnects first.
+
+    Call this once the request body has been read; the next ASGI message is
+    then the disconnect.
+    """
+    work = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_disconnected(receive))
+    try:
+        await asyncio.wait({work, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if not work.done():
+            work.cancel()
+            raise ClientDisconnected()
+        return work.result()
+    finally:
+        watcher.cancel()
+        if not work.done():
+            work.cancel()
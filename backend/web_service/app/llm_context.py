@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, List, Optional
+
+from backend.web_service.app.metrics import metrics
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional at runtime
+    tiktoken = None
+
+logger = logging.getLogger("llm-context")
+
+# Tool output the model is told never to mention, or has no use for; the
+# frontend and search logging get it from raw_data.
+PRESENTATION_FIELDS = frozenset(
+    {
+        "sprites",
+        "animated_sprites",
+        "default_sprite",
+        "cry_url",
+        "cry_url_backup",
+        "cache_status",
+        "last_updated",
+    }
+)
+
+# Most tokens of tool output passed to the model for a single tool result.
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("LLM_CONTEXT_TOKEN_BUDGET", "1500"))
+
+TOKEN_ENCODING = "o200k_base"
+
+
+# Loaded by load_encoding at startup. Until then, or if it can't be loaded,
+# token counts are estimated rather than loading it on the event loop.
+ENCODING = None
+
+
+async def load_encoding() -> None:
+    """Load the tiktoken encoding in a thread, so no request waits for it."""
+    global ENCODING
+    if tiktoken is None or ENCODING is not None:
+        return
+    try:
+        ENCODING = await asyncio.to_thread(tiktoken.get_encoding, TOKEN_ENCODING)
+    except Exception as e:
+        # The encoding is downloaded on first use, which can fail offline
+        logger.warning(f"Falling back to estimated token counts: {e}")
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken, or estimate about four characters per token."""
+    if ENCODING is not None:
+        return len(ENCODING.encode(text))
+    return len(text) // 4 + 1
+
+
+def strip_presentation(value: Any) -> Any:
+    """Drop sprite and cry URLs anywhere in a tool result."""
+    if isinstance(value, dict):
+        return {
+            key: strip_presentation(item)
+            for key, item in value.items()
+            if key not in PRESENTATION_FIELDS and item is not None
+        }
+    if isinstance(value, list):
+        return [strip_presentation(item) for item in value]
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _lists(value: Any) -> List[list]:
+    """Every list in a JSON value, outermost first."""
+    if isinstance(value, dict):
+        found, children = [], value.values()
+    elif isinstance(value, list):
+        found, children = [value], value
+    else:
+        return []
+    for child in children:
+        found.extend(_lists(child))
+    return found
+
+
+def _fit(value: Any, budget: int) -> str:
+    """Serialize, halving the longest lists until the result fits the budget."""
+    text = _dumps(value)
+    while count_tokens(text) > budget:
+        longest = max(_lists(value), key=len, default=None)
+        if longest is None or len(longest) < 2:
+            break
+        del longest[(len(longest) + 1) // 2 :]
+        if isinstance(value, dict):
+            value["truncated"] = True
+        text = _dumps(value)
+
+    if count_tokens(text) > budget:
+        # Nothing left to drop cleanly; cut the text itself
+        text = text[: budget * 4] + "…"
+    return text
+
+
+def compact_context(output: Any, budget: Optional[int] = None) -> str:
+    """Turn a tool result into compact model context under a token budget.
+
+    Presentation-only fields are removed, JSON is serialized without
+    whitespace and, if it is still over budget, list items are dropped from
+    the end. Text that isn't JSON is passed through, truncated if needed.
+    """
+    budget = budget or CONTEXT_TOKEN_BUDGET
+    raw = output if isinstance(output, str) else _dumps(output)
+
+    if isinstance(output, str):
+        try:
+            output = json.loads(output)
+        except json.JSONDecodeError:
+            output = None
+
+    if output is None:
+        text = raw if count_tokens(raw) <= budget else raw[: budget * 4] + "…"
+    else:
+        text = _fit(strip_presentation(output), budget)
+
+    metrics.observe("llm.context.raw_tokens", count_tokens(raw))
+    metrics.observe("llm.context.tokens", count_tokens(text))
+    return text
+
+
+def record_usage(pipeline: str, *responses: Any) -> None:
+    """Record the input and output tokens one request used across its LLM calls.
+
+    Works with both Responses API (input_tokens/output_tokens) and Chat
+    Completions (prompt_tokens/completion_tokens) usage objects.
+    """
+    input_tokens = output_tokens = 0
+    for response in responses:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            continue
+        input_tokens += (
+            getattr(usage, "input_tokens", None)
+            or getattr(usage, "prompt_tokens", None)
+            or 0
+        )
+        output_tokens += (
+            getattr(usage, "output_tokens", None)
+            or getattr(usage, "completion_tokens", None)
+            or 0
+        )
+
+    metrics.inc(f"llm.{pipeline}.requests")
+    metrics.observe(f"llm.{pipeline}.input_tokens", input_tokens)
+    metrics.observe(f"llm.{pipeline}.output_tokens", output_tokens)
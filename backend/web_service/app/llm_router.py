@@ -0,0 +1,372 @@
+"""Route each LLM stage to a model, hedging slow calls to a second provider.
+
+Every stage has an ordered list of targets, configured as comma-separated
+``provider:model`` pairs, e.g.
+
+    LLM_ROUTE_ANSWER=openai:gpt-4o-mini,groq:llama-3.3-70b-versatile
+
+The first target is asked first. If it hasn't answered within its recent
+LLM_HEDGE_PERCENTILE latency for that stage, the next target is asked too,
+and the first valid answer wins; the other request is cancelled. A target
+that fails or answers with something unusable hands over to the next one
+straight away. A single target disables hedging for that stage.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from anthropic import AsyncAnthropic
+from backend.web_service.app.admission import (
+    AdmissionController,
+    Priority,
+    estimate_tokens,
+)
+from backend.web_service.app.metrics import metrics
+from groq import AsyncGroq
+from openai import AsyncOpenAI
+
+logger = logging.getLogger("llm-router")
+
+STAGES = ("routing", "answer", "vision")
+DEFAULT_ROUTES = {
+    "routing": "openai:gpt-4o-mini,groq:llama-3.3-70b-versatile",
+    "answer": "openai:gpt-4o-mini,groq:llama-3.3-70b-versatile",
+    "vision": "openai:gpt-4o-mini,groq:meta-llama/llama-4-scout-17b-16e-instruct",
+}
+
+# Hedge after this percentile of the first target's recent latency, clamped to
+# a sane range, or after the default delay until there are enough samples.
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_DEFAULT_DELAY = float(os.environ.get("LLM_HEDGE_DEFAULT_DELAY", "4.0"))
+LLM_HEDGE_MIN_DELAY = float(os.environ.get("LLM_HEDGE_MIN_DELAY", "0.5"))
+LLM_HEDGE_MAX_DELAY = float(os.environ.get("LLM_HEDGE_MAX_DELAY", "15.0"))
+
+# Anthropic requires an output limit; the others run without one, as before
+ANTHROPIC_MAX_TOKENS = 4096
+IMAGE_INPUT_TOKENS = 1000
+
+CODE_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL)
+JSON_OBJECT = re.compile(r"({.*})", re.DOTALL)
+
+
+@dataclass
+class Target:
+    provider: str
+    model: str
+
+    def __str__(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+@dataclass
+class ToolCall:
+    name: str
+    arguments: Dict[str, Any]
+
+
+@dataclass
+class LLMResult:
+    """One model's answer: its text, the JSON in it and any tool calls."""
+
+    target: Target
+    text: str
+    response: Any
+    data: Optional[Any] = None
+    tool_calls: List[ToolCall] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return bool(self.tool_calls) or self.data is not None
+
+
+def parse_targets(spec: str) -> List[Target]:
+    targets = []
+    for entry in spec.split(","):
+        provider, _, model = entry.strip().partition(":")
+        if not model:
+            raise ValueError(f"LLM route entry must be provider:model, got {entry!r}")
+        targets.append(Target(provider, model))
+    return targets
+
+
+def parse_json(text: str) -> Optional[Any]:
+    """The JSON object in a model's answer, allowing code fences or chatter."""
+    text = text.strip()
+    fenced = CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    match = JSON_OBJECT.search(text)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            pass
+    return None
+
+
+class LLMRouter:
+    """Call the model configured for a stage, hedging across providers."""
+
+    def __init__(
+        self, admission: AdmissionController, routes: Dict[str, List[Target]]
+    ) -> None:
+        self.admission = admission
+        self.routes = routes
+        self.clients: Dict[str, Any] = {}
+
+    @classmethod
+    def from_env(cls, admission: AdmissionController) -> "LLMRouter":
+        routes = {
+            stage: parse_targets(
+                os.environ.get(f"LLM_ROUTE_{stage.upper()}", DEFAULT_ROUTES[stage])
+            )
+            for stage in STAGES
+        }
+        return cls(admission, routes)
+
+    def client(self, provider: str) -> Any:
+        if provider not in self.clients:
+            if provider == "openai":
+                self.clients[provider] = AsyncOpenAI()
+            elif provider == "anthropic":
+                self.clients[provider] = AsyncAnthropic()
+            elif provider == "groq":
+                self.clients[provider] = AsyncGroq(
+                    api_key=os.environ.get("GROQ_API_KEY", "")
+                )
+            else:
+                raise ValueError(f"Unknown LLM provider {provider}")
+        return self.clients[provider]
+
+    def hedge_delay(self, stage: str, target: Target) -> float:
+        """How long to give a target before asking the next one as well."""
+        summary = metrics.summary(f"llm.{stage}.{target.provider}.seconds")
+        if summary is None or len(summary.values) < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY
+        delay = summary.percentile(LLM_HEDGE_PERCENTILE)
+        return min(LLM_HEDGE_MAX_DELAY, max(LLM_HEDGE_MIN_DELAY, delay))
+
+    async def complete(
+        self,
+        stage: str,
+        system: str,
+        prompt: str,
+        priority: Priority,
+        output_tokens: int,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        image: Optional[Tuple[bytes, str]] = None,
+    ) -> LLMResult:
+        """Ask the stage's targets until one gives a valid answer.
+
+        Args:
+            stage (str): One of STAGES; picks the targets.
+            system (str): System prompt.
+            prompt (str): The user message.
+            priority (Priority): Admission priority of the calls.
+            output_tokens (int): Output tokens to budget for.
+            tools (list): MCP tools as name/description/parameters dicts.
+            image (tuple): Image bytes and their media type.
+        Returns:
+            LLMResult: The first valid answer, or failing that the first
+            answer at all. Raises the last error if every target failed.
+        """
+        targets = self.routes[stage]
+        tokens = estimate_tokens(system + prompt) + output_tokens
+        if image:
+            tokens += IMAGE_INPUT_TOKENS
+
+        launched: Dict[asyncio.Task, Target] = {}
+        deadline = 0.0
+
+        def launch() -> None:
+            nonlocal deadline
+            target = targets[len(launched)]
+            call = self._call(
+                target, stage, system, prompt, priority, tokens, tools, image
+            )
+            launched[asyncio.create_task(call)] = target
+            deadline = time.monotonic() + self.hedge_delay(stage, target)
+
+        launch()
+        pending = set(launched)
+        fallback: Optional[LLMResult] = None
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                more = len(launched) < len(targets)
+                timeout = max(0.0, deadline - time.monotonic()) if more else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    logger.info(f"Hedging {stage} to {targets[len(launched)]}")
+                    metrics.inc(f"llm.{stage}.hedged")
+                    launch()
+                    pending = set(task for task in launched if not task.done())
+                    continue
+
+                for task in done:
+                    target = launched[task]
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning(f"{stage} call to {target} failed: {e}")
+                        metrics.inc(f"llm.{stage}.{target.provider}.errors")
+                        error = e
+                        continue
+                    if result.valid:
+                        metrics.inc(f"llm.{stage}.{target.provider}.wins")
+                        return result
+                    logger.warning(f"{stage} call to {target} gave no usable answer")
+                    fallback = fallback or result
+
+                # Something failed: don't wait out the delay to try the next one
+                if len(launched) < len(targets):
+                    launch()
+                    pending = set(task for task in launched if not task.done())
+        finally:
+            for task in launched:
+                task.cancel()
+
+        if fallback is not None:
+            return fallback
+        raise error or RuntimeError(f"No LLM targets for {stage}")
+
+    async def _call(
+        self,
+        target: Target,
+        stage: str,
+        system: str,
+        prompt: str,
+        priority: Priority,
+        tokens: int,
+        tools: Optional[List[Dict[str, Any]]],
+        image: Optional[Tuple[bytes, str]],
+    ) -> LLMResult:
+        async with self.admission.admit(target.provider, priority, tokens):
+            started = time.monotonic()
+            try:
+                if target.provider == "anthropic":
+                    result = await self._anthropic(target, system, prompt, tools, image)
+                elif target.provider == "groq":
+                    result = await self._groq(target, system, prompt, tools, image)
+                else:
+                    result = await self._openai(target, system, prompt, tools, image)
+            except asyncio.CancelledError:
+                # A call that lost the race was cut short, so its time would
+                # drag the hedge percentile down; keep it apart
+                metrics.observe(
+                    f"llm.{stage}.{target.provider}.cancelled_seconds",
+                    time.monotonic() - started,
+                )
+                raise
+            metrics.observe(
+                f"llm.{stage}.{target.provider}.seconds", time.monotonic() - started
+            )
+        result.data = parse_json(result.text) if result.text else None
+        return result
+
+    async def _openai(self, target, system, prompt, tools, image) -> LLMResult:
+        content: Any = prompt
+        if image:
+            data, media_type = image
+            content = [
+                {"type": "input_text", "text": prompt},
+                {"type": "input_image", "image_url": data_url(data, media_type)},
+            ]
+        request: Dict[str, Any] = {
+            "model": target.model,
+            "input": chat_messages(system, content),
+        }
+        if tools:
+            request["tools"] = [{"type": "function", **tool} for tool in tools]
+
+        response = await self.client("openai").responses.create(**request)
+        tool_calls = [
+            ToolCall(item.name, json.loads(item.arguments))
+            for item in response.output or []
+            if item.type == "function_call"
+        ]
+        return LLMResult(target, response.output_text, response, tool_calls=tool_calls)
+
+    async def _groq(self, target, system, prompt, tools, image) -> LLMResult:
+        content: Any = prompt
+        if image:
+            data, media_type = image
+            content = [
+                {"type": "text", "text": prompt},
+                {"type": "image_url", "image_url": {"url": data_url(data, media_type)}},
+            ]
+        request: Dict[str, Any] = {
+            "model": target.model,
+            "messages": chat_messages(system, content),
+        }
+        if tools:
+            request["tools"] = [
+                {"type": "function", "function": tool} for tool in tools
+            ]
+
+        response = await self.client("groq").chat.completions.create(**request)
+        message = response.choices[0].message
+        tool_calls = [
+            ToolCall(call.function.name, json.loads(call.function.arguments))
+            for call in message.tool_calls or []
+        ]
+        return LLMResult(target, message.content or "", response, tool_calls=tool_calls)
+
+    async def _anthropic(self, target, system, prompt, tools, image) -> LLMResult:
+        content: List[Dict[str, Any]] = [{"type": "text", "text": prompt}]
+        if image:
+            data, media_type = image
+            source = {
+                "type": "base64",
+                "media_type": media_type,
+                "data": base64.b64encode(data).decode(),
+            }
+            content.insert(0, {"type": "image", "source": source})
+        request: Dict[str, Any] = {
+            "model": target.model,
+            "max_tokens": ANTHROPIC_MAX_TOKENS,
+            "messages": [{"role": "user", "content": content}],
+        }
+        if system:
+            request["system"] = system
+        if tools:
+            request["tools"] = [
+                {
+                    "name": tool["name"],
+                    "description": tool["description"] or "",
+                    "input_schema": tool["parameters"],
+                }
+                for tool in tools
+            ]
+
+        response = await self.client("anthropic").messages.create(**request)
+        text = "".join(block.text for block in response.content if block.type == "text")
+        tool_calls = [
+            ToolCall(block.name, block.input)
+            for block in response.content
+            if block.type == "tool_use"
+        ]
+        return LLMResult(target, text, response, tool_calls=tool_calls)
+
+
+def chat_messages(system: str, content: Any) -> List[Dict[str, Any]]:
+    messages = [{"role": "system", "content": system}] if system else []
+    return messages + [{"role": "user", "content": content}]
+
+
+def data_url(data: bytes, media_type: str) -> str:
+    return f"data:{media_type};base64,{base64.b64encode(data).decode()}"
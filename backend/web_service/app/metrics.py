@@ -0,0 +1,80 @@
+import math
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+class Summary:
+    """Count, sum and percentiles over a rolling window of observations."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.values: deque = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        self.values.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """The q-th percentile (0-100) of the recent window, or None if empty."""
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        index = min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.maximum if self.count else None,
+        }
+
+
+class MetricsRegistry:
+    """Process-wide counters, gauges and summaries for /service/metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+        self.summaries: Dict[str, Summary] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Register a gauge whose value is read when metrics are collected."""
+        self.gauges[name] = read
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                summary = self.summaries[name] = Summary()
+            summary.observe(value)
+
+    def summary(self, name: str) -> Optional[Summary]:
+        return self.summaries.get(name)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(sorted(self.counters.items())),
+                "gauges": {name: read() for name, read in sorted(self.gauges.items())},
+                "summaries": {
+                    name: summary.snapshot()
+                    for name, summary in sorted(self.summaries.items())
+                },
+            }
+
+
+metrics = MetricsRegistry()
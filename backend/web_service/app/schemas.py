@@ -0,0 +1,109 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+logger = logging.getLogger("pokeapi-web-server")
+
+
+class Section(msgspec.Struct):
+    """One titled block of a structured Pokédex answer."""
+
+    title: str
+    content: str
+
+
+class StructuredData(msgspec.Struct):
+    """The sectioned answer the frontend renders."""
+
+    sections: List[Section]
+
+
+class PokemonData(msgspec.Struct):
+    """The Pokémon data card returned by the get_basic_pokemon_data tool."""
+
+    id: int
+    name: str
+    height: Optional[int] = None
+    weight: Optional[int] = None
+    types: List[str] = []
+    abilities: List[str] = []
+    base_stats: Dict[str, int] = {}
+    sprites: Dict[str, str] = {}
+    animated_sprites: Dict[str, str] = {}
+    default_sprite: Optional[str] = None
+    cry_url: Optional[str] = None
+    cry_url_backup: Optional[str] = None
+    # Where the data came from: hit, miss, stale or snapshot
+    cache_status: Optional[str] = None
+    # When the data was cached, as an ISO timestamp
+    last_updated: Optional[str] = None
+    # Set when expired data is served because PokeAPI is unavailable
+    stale: bool = False
+    warning: Optional[str] = None
+
+
+class Identification(msgspec.Struct):
+    """The result of identifying a Pokémon in an image."""
+
+    pokemon_identified: bool = False
+    pokemon_name: Optional[str] = None
+    confidence: Optional[str] = None
+
+
+class ChatResponse(msgspec.Struct):
+    structured_data: Optional[StructuredData]
+    text: str
+    pokemon_data: Optional[PokemonData]
+
+
+class ImageAnalysisResponse(msgspec.Struct):
+    identification: Identification
+    pokemon_data: Optional[PokemonData]
+    structured_data: Optional[StructuredData]
+    raw_markdown: str
+
+
+class TranscriptResponse(msgspec.Struct):
+    transcript: str
+
+
+class ErrorResponse(msgspec.Struct):
+    error: str
+
+
+def to_pokemon_data(data: Any) -> Optional[PokemonData]:
+    """Convert a tool result into a data card, or None if it isn't one.
+
+    Tools other than get_basic_pokemon_data (and its error results) produce
+    other shapes; those are not a data card the frontend can display.
+    """
+    if not isinstance(data, dict) or "error" in data:
+        return None
+    try:
+        return msgspec.convert(data, PokemonData, strict=False)
+    except msgspec.ValidationError as e:
+        logger.debug(f"Tool result is not Pokémon data: {e}")
+        return None
+
+
+def to_structured_data(data: Any, fallback_text: str) -> Optional[StructuredData]:
+    """Convert model output into sections, wrapping anything malformed."""
+    if data is None:
+        return None
+    try:
+        return msgspec.convert(data, StructuredData, strict=False)
+    except msgspec.ValidationError as e:
+        logger.warning(f"Structured data did not match the expected shape: {e}")
+        return StructuredData(
+            sections=[Section(title="Response", content=fallback_text)]
+        )
+
+
+def to_identification(data: Any) -> Identification:
+    """Convert the vision model's JSON into an Identification."""
+    try:
+        return msgspec.convert(data, Identification, strict=False)
+    except msgspec.ValidationError as e:
+        logger.warning(f"Identification did not match the expected shape: {e}")
+        return Identification()
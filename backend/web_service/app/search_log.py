@@ -0,0 +1,207 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from backend.db.database import get_db_session
+from backend.db.models.search_history import SearchHistory
+from backend.web_service.app.metrics import metrics
+from sqlalchemy import insert
+
+logger = logging.getLogger("search-log")
+
+SEARCH_LOG_BATCH_SIZE = int(os.environ.get("SEARCH_LOG_BATCH_SIZE", "100"))
+SEARCH_LOG_FLUSH_INTERVAL = float(os.environ.get("SEARCH_LOG_FLUSH_INTERVAL", "5"))
+SEARCH_LOG_MAX_PENDING = int(os.environ.get("SEARCH_LOG_MAX_PENDING", "10000"))
+# Optional JSON-lines file for rows that don't fit in memory; dropped without it
+SEARCH_LOG_SPILL_PATH = os.environ.get("SEARCH_LOG_SPILL_PATH")
+
+# Cache statuses reported by the MCP server that mean no PokeAPI call was made
+CACHE_HIT_STATUSES = {"hit", "stale", "snapshot"}
+
+
+class SearchLogger:
+    """Write-behind queue of searches, flushed to search_history in batches.
+
+    record() never touches the database: rows are buffered in memory and a
+    background task writes them with one multi-row INSERT whenever
+    ``batch_size`` rows are waiting or ``flush_interval`` seconds have passed.
+    Past ``max_pending`` rows, new rows are spilled to ``spill_path`` (and
+    replayed once the database catches up) or dropped.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = SEARCH_LOG_BATCH_SIZE,
+        flush_interval: float = SEARCH_LOG_FLUSH_INTERVAL,
+        max_pending: int = SEARCH_LOG_MAX_PENDING,
+        spill_path: Optional[str] = SEARCH_LOG_SPILL_PATH,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.spill_path = spill_path
+        self.pending: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+        metrics.gauge("search_log.pending", lambda: len(self.pending))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._replay_spill()
+            self._task = asyncio.create_task(self._run())
+            logger.info("Search logging started")
+
+    async def stop(self) -> None:
+        """Stop the background task once it has flushed everything pending.
+
+        The task is woken up rather than cancelled, so a batch that is being
+        written when stop() is called is not lost.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._stopping = False
+        logger.info("Search logging stopped")
+
+    def record(
+        self,
+        query: str,
+        source: str,
+        resolved_pokemon: Optional[str] = None,
+        cache_hit: Optional[bool] = None,
+        latency_ms: Optional[int] = None,
+    ) -> None:
+        """Queue one search for the next batch. Never blocks or raises."""
+        if not self.running:
+            return
+
+        row = {
+            "query": query,
+            "source": source,
+            "resolved_pokemon": resolved_pokemon,
+            "cache_hit": cache_hit,
+            "latency_ms": latency_ms,
+            "created_at": time.time(),
+        }
+        if len(self.pending) >= self.max_pending:
+            self._spill([row])
+            return
+
+        self.pending.append(row)
+        metrics.inc("search_log.recorded")
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self.pending:
+                if not await self.flush():
+                    break
+                if len(self.pending) < self.batch_size:
+                    break
+
+            if not self.pending and not self._stopping:
+                self._replay_spill()
+
+        # Final drain for stop(); whatever cannot be written is spilled
+        while self.pending:
+            if not await self.flush():
+                break
+        if self.pending:
+            self._spill(list(self.pending))
+            self.pending.clear()
+
+    async def flush(self) -> bool:
+        """Write up to one batch. Returns False if the insert failed."""
+        batch = [
+            self.pending.popleft()
+            for _ in range(min(self.batch_size, len(self.pending)))
+        ]
+        if not batch:
+            return True
+
+        started = time.monotonic()
+        try:
+            # One multi-row INSERT ... VALUES per batch
+            statement = insert(SearchHistory).values(
+                [self._to_columns(row) for row in batch]
+            )
+            async with get_db_session() as session:
+                await session.execute(statement)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} searches: {e}")
+            metrics.inc("search_log.flush_errors")
+            # Put the batch back for the next attempt, as far as there is room
+            room = max(0, self.max_pending - len(self.pending))
+            self.pending.extendleft(reversed(batch[:room]))
+            self._spill(batch[room:])
+            return False
+
+        metrics.inc("search_log.written", len(batch))
+        metrics.observe("search_log.flush_seconds", time.monotonic() - started)
+        return True
+
+    @staticmethod
+    def _to_columns(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            **row,
+            "created_at": datetime.datetime.fromtimestamp(row["created_at"]),
+        }
+
+    def _spill(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if not self.spill_path:
+            metrics.inc("search_log.dropped", len(rows))
+            return
+        try:
+            with open(self.spill_path, "a") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+            metrics.inc("search_log.spilled", len(rows))
+        except OSError as e:
+            logger.error(f"Error spilling searches to {self.spill_path}: {e}")
+            metrics.inc("search_log.dropped", len(rows))
+
+    def _replay_spill(self) -> None:
+        """Queue spilled rows again, as many as fit without spilling."""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        replaying = f"{self.spill_path}.replay"
+        try:
+            os.replace(self.spill_path, replaying)
+            with open(replaying) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            os.remove(replaying)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Error replaying spilled searches: {e}")
+            return
+
+        room = max(0, self.max_pending - len(self.pending))
+        self.pending.extend(rows[:room])
+        self._spill(rows[room:])
+        logger.info(f"Replaying {min(room, len(rows))} spilled searches")
+        if len(self.pending) >= self.batch_size:
+            self._wakeup.set()
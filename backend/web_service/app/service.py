@@ -1,40 +1,154 @@
 import asyncio
-import base64
+import datetime
 import json
 import logging
 import os
-import re
 import subprocess
+import time
 from contextlib import AsyncExitStack
+from email.utils import formatdate, parsedate_to_datetime
 from functools import partial
 from typing import Annotated, Any, Dict, Optional
 
 import uvicorn
-from anthropic import Anthropic
 from backend.db.database import init_db
+from backend.web_service.app.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Priority,
+    admission_rejected_handler,
+)
+from backend.web_service.app.asset_cache import AssetCache, create_asset_proxy_router
+from backend.web_service.app.audio import SilentRecording, prepare_for_transcription
+from backend.web_service.app.coalesce import (
+    ClientDisconnected,
+    RequestCoalescer,
+    cancel_on_disconnect,
+    normalize_query,
+)
+from backend.web_service.app.llm_context import (
+    compact_context,
+    load_encoding,
+    record_usage,
+)
+from backend.web_service.app.llm_router import LLMRouter
+from backend.web_service.app.metrics import metrics
+from backend.web_service.app.schemas import (
+    ChatResponse,
+    ErrorResponse,
+    ImageAnalysisResponse,
+    TranscriptResponse,
+    to_identification,
+    to_pokemon_data,
+    to_structured_data,
+)
+from backend.web_service.app.search_log import CACHE_HIT_STATUSES, SearchLogger
+from backend.web_service.app.sprite_matcher import SpriteMatcher
+from backend.web_service.app.static_assets import (
+    create_static_assets_router,
+    etag_matches,
+)
+from backend.web_service.app.voice import SectionCallback, VoiceSession
 from dotenv import load_dotenv
 from groq import Groq
-from litestar import Litestar, MediaType, post
+from litestar import Litestar, MediaType, Request, WebSocket, get, post, websocket
+from litestar.config.compression import CompressionConfig
 from litestar.datastructures import UploadFile
 from litestar.enums import RequestEncodingType
 from litestar.params import Body
 from litestar.response import Response
-from litestar.static_files import create_static_files_router
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from openai import OpenAI
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("pokeapi-web-server")
 
+# Environment variables passed through to the MCP server process
+MCP_SERVER_ENV = ("DATABASE_URL", "ASSET_PROXY_PREFIX", "POKEDEX_SNAPSHOT")
+
+# System prompts for picking tools (or answering directly) and for the answer
+ROUTING_PROMPT = """You are a Pokédex. Determine if the user is asking about a Pokémon. Use tools to answer; when describing a Pokémon, get both its basic data and its evolution chain. Otherwise respond with the following structure:
+
+{
+  "sections": [
+    {
+      "title": "Summary",
+      "content": "Answer as a Pokédex would by answering in a way that would be useful to a Pokémon trainer. If the user asked a specific question answer it here. If the user asked for a Pokémon that doesn't exist, tell them that you don't have any data on that Pokémon. Do not include links to cries or sprites here."
+    }
+  ]
+}
+
+Respond with ONLY valid JSON that follows this structure."""
+
+ANSWER_PROMPT = """You are a Pokédex. Answer the user's question using the tool results.
+
+Structure your response as a JSON object with the following sections:
+
+{
+  "sections": [
+    {
+      "title": "Summary",
+      "content": "Answer as a Pokédex would by naming the Pokémon and giving a brief description and some facts about the Pokémon that would be useful to a Pokémon trainer. If the user asked a specific question answer it here. If the user asked for a Pokémon that doesn't exist, tell them that you don't have any data on that Pokémon. Do not include links to cries or sprites here."
+    },
+    {
+      "title": "Types",
+      "content": "The Pokémon's primary and secondary types"
+    },
+    {
+      "title": "Base Stats",
+      "content": "- HP: [value]\\n- Attack: [value]\\n- Defense: [value]\\n- Sp. Attack: [value]\\n- Sp. Defense: [value]\\n- Speed: [value]"
+    },
+    {
+      "title": "Abilities",
+      "content": "List and brief description of abilities"
+    },
+    {
+      "title": "Evolution",
+      "content": "Evolution chain information"
+    },
+    {
+      "title": "Additional Info",
+      "content": "Other notable facts or interesting trivia about the Pokemon. Do not include links to cries or sprites here."
+    }
+  ]
+}
+
+Format the content of each section in Markdown. If a section doesn't have relevant information, you can omit it. For multiple Pokémon, add a separate object for each in an array.
+Do not make up information or Pokémon that don't exist. If you don't know the answer, leave the section out.
+If a user asks about nidoran without specifying gender, default to nidoran-m.
+Respond with ONLY valid JSON that follows this structure - do not include any explanatory text outside the JSON."""
+
+# Output tokens reserved per LLM call when budgeting provider token limits
+ROUTING_OUTPUT_TOKENS = 200
+ANSWER_OUTPUT_TOKENS = 1000
+
+TRANSCRIPTION_PROMPT = (
+    "Expect Pokémon names and terms. Correct spelling to match known Pokémon names."
+)
+
+# The data card only changes when its cache entry is refreshed (weekly), so let
+# browsers and CDNs keep it for a day and revalidate it with the ETag after that.
+POKEMON_CACHE_CONTROL = os.environ.get(
+    "POKEMON_CACHE_CONTROL", "public, max-age=86400, stale-while-revalidate=3600"
+)
+# Served from an expired entry while PokeAPI is down; check back soon
+STALE_CACHE_CONTROL = "public, max-age=60"
+NOT_FOUND_CACHE_CONTROL = "public, max-age=300"
+
+# Responses smaller than this aren't worth the CPU to compress.
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "1024"))
+
+# Per-provider concurrency, rate and queue limits for LLM and transcription calls
+admission = AdmissionController.from_env()
+# Which model answers each stage, hedged to a second provider when slow
+llm_router = LLMRouter.from_env(admission)
+
 
 class MCPClient:
     def __init__(self):
         self.session: Optional[ClientSession] = None
         self.exit_stack = AsyncExitStack()
-        self.openai = OpenAI()
-        self.anthropic = Anthropic()
         self.groq_client = Groq(api_key=os.environ.get("GROQ_API_KEY", ""))
 
     async def get_session(self):
@@ -43,10 +157,11 @@ class MCPClient:
         return self.session
 
     async def initialize_session(self):
+        env = {key: os.environ[key] for key in MCP_SERVER_ENV if key in os.environ}
         server_params = StdioServerParameters(
             command="python",
             args=["-m", "backend.mcp_server.app.pokeapi_mcp_server"],
-            env={"DATABASE_URL": os.environ.get("DATABASE_URL")},
+            env=env,
         )
 
         self.stdio, self.write = await self.exit_stack.enter_async_context(
@@ -77,11 +192,19 @@ class MCPClient:
         try:
             import tempfile
 
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".webm")
+            # Mono 16 kHz Opus without the silence: smaller and shorter to transcribe
+            try:
+                audio = await prepare_for_transcription(audio_data)
+            except SilentRecording:
+                # Nothing was said; don't pay the provider to tell us so
+                metrics.inc("audio.silent")
+                return ""
+
+            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=audio.suffix)
             temp_file_path = temp_file.name
             try:
                 with open(temp_file_path, "wb") as f:
-                    f.write(audio_data)
+                    f.write(audio.data)
 
                 loop = asyncio.get_event_loop()
                 transcription_func = partial(
@@ -94,7 +217,8 @@ class MCPClient:
                     language=language if language else None,
                 )
 
-                transcription = await loop.run_in_executor(None, transcription_func)
+                async with admission.admit("groq", Priority.AUDIO):
+                    transcription = await loop.run_in_executor(None, transcription_func)
                 return transcription.text
             finally:
                 import os
@@ -106,32 +230,12 @@ class MCPClient:
             raise
 
     async def process_query(self, query: str) -> Dict[str, Any]:
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a Pokédex. Determine if the user is asking about a Pokémon. Use a tool to answer, or respond with the following structure:
-
-{
-  "sections": [
-    {
-      "title": "Summary",
-      "content": "Answer as a Pokédex would by answering in a way that would be useful to a Pokémon trainer. If the user asked a specific question answer it here. If the user asked for a Pokémon that doesn't exist, tell them that you don't have any data on that Pokémon. Do not include links to cries or sprites here."
-    }
-  ]
-}
-
-Respond with ONLY valid JSON that follows this structure.""",
-            },
-            {"role": "user", "content": query},
-        ]
-
-        logger.info(f"messages: {json.dumps(messages)}")
+        logger.info(f"query: {query}")
 
         try:
             response = await self.session.list_tools()
             available_tools = [
                 {
-                    "type": "function",
                     "name": tool.name,
                     "description": tool.description,
                     "parameters": tool.inputSchema,
@@ -139,149 +243,95 @@ Respond with ONLY valid JSON that follows this structure.""",
                 for tool in response.tools
             ]
 
-            completion = self.openai.responses.create(
-                model="gpt-4o-mini", input=messages, tools=available_tools
+            routed = await llm_router.complete(
+                "routing",
+                ROUTING_PROMPT,
+                query,
+                Priority.TEXT,
+                ROUTING_OUTPUT_TOKENS,
+                tools=available_tools,
             )
-
-            logger.debug(f"completion: {json.dumps(completion.to_dict(), indent=2)}")
+            logger.info(f"Routing answered by {routed.target}")
 
             raw_data = None
 
-            if completion.output and hasattr(completion.output[0], "name"):
-                tool_call = completion.output[0]
-                messages.append(tool_call)
-
-                function_name = tool_call.name
-                function_args = json.loads(tool_call.arguments)
-                logger.info(f"Calling tool {function_name} with args {function_args}")
-
-                result = await self.session.call_tool(function_name, function_args)
-                logger.debug(f"Result: {result.model_dump_json()}")
-
-                try:
-                    content_text = result.content[0].text
-                    raw_data = json.loads(content_text)
-                except (json.JSONDecodeError, IndexError, AttributeError) as e:
-                    logger.error(f"Error parsing result content: {e}")
-
-                messages.append(
-                    {
-                        "type": "function_call_output",
-                        "call_id": tool_call.call_id,
-                        "output": result.content[0].text,
-                    }
-                )
-
-                messages.append(
-                    {
-                        "role": "system",
-                        "content": """Structure your response as a JSON object with the following sections:
-
-{
-  "sections": [
-    {
-      "title": "Summary",
-      "content": "Answer as a Pokédex would by naming the Pokémon and giving a brief description and some facts about the Pokémon that would be useful to a Pokémon trainer. If the user asked a specific question answer it here. If the user asked for a Pokémon that doesn't exist, tell them that you don't have any data on that Pokémon. Do not include links to cries or sprites here."
-    },
-    {
-      "title": "Types",
-      "content": "The Pokémon's primary and secondary types"
-    },
-    {
-      "title": "Base Stats",
-      "content": "- HP: [value]\\n- Attack: [value]\\n- Defense: [value]\\n- Sp. Attack: [value]\\n- Sp. Defense: [value]\\n- Speed: [value]"
-    },
-    {
-      "title": "Abilities",
-      "content": "List and brief description of abilities"
-    },
-    {
-      "title": "Evolution",
-      "content": "Evolution chain information"
-    },
-    {
-      "title": "Additional Info",
-      "content": "Other notable facts or interesting trivia about the Pokemon. Do not include links to cries or sprites here."
-    }
-  ]
-}
-
-Format the content of each section in Markdown. If a section doesn't have relevant information, you can omit it. For multiple Pokémon, add a separate object for each in an array.
-Do not make up information or Pokémon that don't exist. If you don't know the answer, leave the section out.
-If a user asks about nidoran without specifying gender, default to nidoran-m.
-Respond with ONLY valid JSON that follows this structure - do not include any explanatory text outside the JSON.""",
-                    }
+            if routed.tool_calls:
+                for tool_call in routed.tool_calls:
+                    logger.info(
+                        f"Calling tool {tool_call.name} with args {tool_call.arguments}"
+                    )
+                # The calls don't depend on each other, so make them all at once
+                results = await asyncio.gather(
+                    *(
+                        self.session.call_tool(tool_call.name, tool_call.arguments)
+                        for tool_call in routed.tool_calls
+                    )
                 )
 
-                final_response = self.openai.responses.create(
-                    model="gpt-4o-mini", input=messages
+                tool_results = []
+                parsed_results = []
+                for tool_call, result in zip(routed.tool_calls, results):
+                    function_name = tool_call.name
+                    function_args = tool_call.arguments
+                    logger.debug(f"Result: {result.model_dump_json()}")
+                    content_text = result.content[0].text
+                    try:
+                        parsed_results.append((function_name, json.loads(content_text)))
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Error parsing result content: {e}")
+                    tool_results.append(
+                        f"{function_name}({json.dumps(function_args)}) returned:\n"
+                        f"{compact_context(content_text)}"
+                    )
+                raw_data = card_data(parsed_results)
+
+                final_response = await llm_router.complete(
+                    "answer",
+                    ANSWER_PROMPT,
+                    f"{query}\n\nTool results:\n\n" + "\n\n".join(tool_results),
+                    Priority.TEXT,
+                    ANSWER_OUTPUT_TOKENS,
                 )
+                record_usage("chat", routed.response, final_response.response)
 
-                try:
-                    response_text = final_response.output_text.strip()
-                    if response_text.startswith("```json") and response_text.endswith(
-                        "```"
-                    ):
-                        response_text = response_text[7:-3].strip()
-                    elif response_text.startswith("```") and response_text.endswith(
-                        "```"
-                    ):
-                        response_text = response_text[3:-3].strip()
-
-                    structured_data = json.loads(response_text)
-                    return {
-                        "structured_data": structured_data,
-                        "raw_markdown": self._convert_structured_to_markdown(
-                            structured_data
-                        ),
-                        "raw_data": raw_data,
-                    }
-                except json.JSONDecodeError as e:
-                    logger.error(f"Error parsing structured response: {e}")
+                structured_data = final_response.data
+                if structured_data is None:
+                    logger.error("Could not parse structured response as JSON")
                     return {
                         "structured_data": None,
-                        "raw_markdown": final_response.output_text,
+                        "raw_markdown": final_response.text,
                         "raw_data": raw_data,
                     }
+                return {
+                    "structured_data": structured_data,
+                    "raw_markdown": self._convert_structured_to_markdown(
+                        structured_data
+                    ),
+                    "raw_data": raw_data,
+                }
             else:
                 logger.info("Model responded directly without using tools")
-                try:
-                    # Try to parse the response as JSON directly
-                    response_text = completion.output[0].content[0].text.strip()
-
-                    # Clean up the response if it has markdown code blocks
-                    if response_text.startswith("```json") and response_text.endswith(
-                        "```"
-                    ):
-                        response_text = response_text[7:-3].strip()
-                    elif response_text.startswith("```") and response_text.endswith(
-                        "```"
-                    ):
-                        response_text = response_text[3:-3].strip()
-
-                    structured_data = json.loads(response_text)
-                    return {
-                        "structured_data": structured_data,
-                        "raw_markdown": self._convert_structured_to_markdown(
-                            structured_data
-                        ),
-                        "raw_data": None,
-                    }
-                except (json.JSONDecodeError, Exception) as e:
-                    logger.error(f"Error parsing direct response: {e}")
+                record_usage("chat", routed.response)
+                structured_data = routed.data
+                if structured_data is None:
+                    logger.error("Could not parse direct response as JSON")
                     # If parsing fails, use the text as is
                     return {
                         "structured_data": {
-                            "sections": [
-                                {
-                                    "title": "Response",
-                                    "content": completion.output[0].content[0].text,
-                                }
-                            ]
+                            "sections": [{"title": "Response", "content": routed.text}]
                         },
-                        "raw_markdown": completion.output[0].content[0].text,
+                        "raw_markdown": routed.text,
                         "raw_data": None,
                     }
+                return {
+                    "structured_data": structured_data,
+                    "raw_markdown": self._convert_structured_to_markdown(
+                        structured_data
+                    ),
+                    "raw_data": None,
+                }
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error in process_query: {e}")
             return {
@@ -308,34 +358,167 @@ Respond with ONLY valid JSON that follows this structure - do not include any ex
         return markdown.strip()
 
 
+def card_data(results: list) -> Any:
+    """Pick the tool result the data card shows.
+
+    Args:
+        results (list): (tool name, parsed result) pairs in the order the
+            model called the tools.
+    Returns:
+        The first get_basic_pokemon_data result, so a question about several
+        pokemon shows the one the model looked up first; without one, the
+        first tool result, or None if there were none.
+    """
+    for name, data in results:
+        if name == "get_basic_pokemon_data":
+            return data
+    return results[0][1] if results else None
+
+
 mcp_client = MCPClient()
+asset_cache = AssetCache()
+search_log = SearchLogger()
+sprite_matcher = SpriteMatcher.from_env()
+# Identical chat queries that arrive together share one process_query run
+chat_requests = RequestCoalescer("chat")
 
 
 @post("/service/pokemon/chat")
-async def pokedex_chat(data: Dict[str, str]) -> Dict[str, Any]:
+async def pokedex_chat(request: Request, data: Dict[str, str]) -> Response:
     try:
         query = data.get("query", "")
         if not query:
             return Response(
-                content={"error": "You need to ask something."},
+                content=ErrorResponse(error="You need to ask something."),
                 status_code=404,
                 media_type="application/json",
             )
-        response = await mcp_client.process_query(query)
+        started = time.monotonic()
+        response = await cancel_on_disconnect(
+            request.receive,
+            chat_requests.run(
+                normalize_query(query), partial(mcp_client.process_query, query)
+            ),
+        )
+        log_search(query, "chat", response["raw_data"], started)
         return Response(
-            content={
-                "structured_data": response["structured_data"],
-                "text": response["raw_markdown"],
-                "pokemon_data": response["raw_data"],
-            },
+            content=to_chat_response(response),
             status_code=200,
             media_type="application/json",
         )
+    except AdmissionRejected:
+        raise
+    except ClientDisconnected:
+        logger.info("Client disconnected before its chat response was ready")
+        # Nobody will read this; 499 is the conventional "client closed request"
+        return Response(content=b"", status_code=499)
     except Exception as e:
         logger.error(f"There was an error chatting with Pokedex: {e}")
         return Response(
-            content={"error": str(e)}, status_code=500, media_type="application/json"
+            content=ErrorResponse(error=str(e)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@get("/service/pokemon/{name:str}", media_type=MediaType.JSON)
+async def get_pokemon_data(request: Request, name: str) -> Response:
+    """The data card for one Pokémon, without going through the LLM."""
+    try:
+        session = await mcp_client.get_session()
+        result = await session.call_tool(
+            "get_basic_pokemon_data", {"pokemon_name": name}
+        )
+        data = json.loads(result.content[0].text)
+    except Exception as e:
+        logger.error(f"Error getting Pokémon data for {name}: {e}")
+        return Response(
+            content=ErrorResponse(error=str(e)),
+            status_code=500,
+            media_type=MediaType.JSON,
+        )
+
+    card = to_pokemon_data(data)
+    if card is None:
+        not_found = data.get("error") == "Pokemon not found"
+        return Response(
+            content=ErrorResponse(error=data.get("error", "No data available")),
+            status_code=404 if not_found else 503,
+            media_type=MediaType.JSON,
+            headers={
+                "cache-control": NOT_FOUND_CACHE_CONTROL if not_found else "no-store"
+            },
+        )
+
+    # The card keeps stale, warning and last_updated, so the body says what the
+    # headers do
+    headers = {
+        "cache-control": STALE_CACHE_CONTROL if card.stale else POKEMON_CACHE_CONTROL
+    }
+    last_updated = parse_last_updated(card.last_updated)
+    if last_updated is not None:
+        # Weak, since cache_status and the content encoding can change while
+        # the cached data stays the same
+        headers["etag"] = f'W/"{card.id}-{int(last_updated.timestamp())}"'
+        headers["last-modified"] = formatdate(last_updated.timestamp(), usegmt=True)
+        if not_modified(request, headers["etag"], last_updated):
+            metrics.inc("pokemon_data.not_modified")
+            return Response(content=b"", status_code=304, headers=headers)
+
+    return Response(
+        content=card, status_code=200, media_type=MediaType.JSON, headers=headers
+    )
+
+
+def parse_last_updated(value: Optional[str]) -> Optional[datetime.datetime]:
+    """The cache time the MCP server sent, as an aware datetime."""
+    if not value:
+        return None
+    try:
+        # Naive timestamps from pokemon_cache are in server local time
+        return datetime.datetime.fromisoformat(value).astimezone()
+    except ValueError:
+        return None
+
+
+def not_modified(request: Request, etag: str, last_updated: datetime.datetime) -> bool:
+    """Whether the client's conditional headers say its copy is current."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(last_updated.timestamp()) <= int(since.timestamp())
+
+
+@websocket("/service/voice")
+async def voice_session(socket: WebSocket) -> None:
+    """Transcribe and answer voice queries without a round trip in between."""
+
+    async def transcribe(audio_data: bytes) -> str:
+        return await mcp_client.transcribe_audio(audio_data, TRANSCRIPTION_PROMPT, "en")
+
+    async def answer(query: str, on_section: SectionCallback) -> ChatResponse:
+        started = time.monotonic()
+        response = await chat_requests.run(
+            normalize_query(query), partial(mcp_client.process_query, query)
         )
+        log_search(query, "voice", response["raw_data"], started)
+        chat_response = to_chat_response(response)
+        # The answer model replies in one piece, so every section is ready at once
+        if chat_response.structured_data:
+            for section in chat_response.structured_data.sections:
+                await on_section(section)
+        return chat_response
+
+    await VoiceSession(socket, transcribe, answer).run()
 
 
 @post("/service/speech-to-text", media_type=MediaType.JSON)
@@ -345,7 +528,7 @@ async def speech_to_text(
     try:
         if not data:
             return Response(
-                content={"error": "No audio file provided"},
+                content=ErrorResponse(error="No audio file provided"),
                 status_code=400,
                 media_type=MediaType.JSON,
             )
@@ -358,7 +541,7 @@ async def speech_to_text(
 
         if not audio_data:
             return Response(
-                content={"error": "Empty audio file"},
+                content=ErrorResponse(error="Empty audio file"),
                 status_code=400,
                 media_type=MediaType.JSON,
             )
@@ -366,19 +549,22 @@ async def speech_to_text(
         logger.info(f"Audio data size: {len(audio_data)} bytes")
 
         language = "en"
-        prompt = "Expect Pokémon names and terms. Correct spelling to match known Pokémon names."
 
-        transcript = await mcp_client.transcribe_audio(audio_data, prompt, language)
+        transcript = await mcp_client.transcribe_audio(
+            audio_data, TRANSCRIPTION_PROMPT, language
+        )
 
         return Response(
-            content={"transcript": transcript},
+            content=TranscriptResponse(transcript=transcript),
             status_code=200,
             media_type=MediaType.JSON,
         )
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error in speech-to-text endpoint: {str(e)}")
         return Response(
-            content={"error": str(e)},
+            content=ErrorResponse(error=str(e)),
             status_code=500,
             media_type=MediaType.JSON,
         )
@@ -391,7 +577,7 @@ async def analyze_image(
     try:
         if not data:
             return Response(
-                content={"error": "No image file provided"},
+                content=ErrorResponse(error="No image file provided"),
                 status_code=400,
                 media_type=MediaType.JSON,
             )
@@ -400,18 +586,18 @@ async def analyze_image(
             f"Received image file: {data.filename}, content_type: {data.content_type}"
         )
 
+        started = time.monotonic()
         image_data = await data.read()
 
         if not image_data:
             return Response(
-                content={"error": "Empty image file"},
+                content=ErrorResponse(error="Empty image file"),
                 status_code=400,
                 media_type=MediaType.JSON,
             )
 
         logger.info(f"Image data size: {len(image_data)} bytes")
 
-        base64_image = base64.b64encode(image_data).decode("utf-8")
         identification_prompt = """
         You're a Pokémon expert. Look at this image and identify if there's a Pokémon in it. 
         
@@ -432,38 +618,45 @@ async def analyze_image(
         If you see nidoran without clear gender, use "nidoran-m".
         """
 
+        # Screenshots of official sprites don't need the vision model
+        sprite_match = (
+            await sprite_matcher.identify(image_data) if sprite_matcher else None
+        )
+
         try:
-            identification_response = await asyncio.to_thread(
-                lambda: mcp_client.openai.responses.create(
-                    model="gpt-4o-mini",
-                    input=[
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "input_text", "text": identification_prompt},
-                                {
-                                    "type": "input_image",
-                                    "image_url": f"data:image/jpeg;base64,{base64_image}",
-                                },
-                            ],
-                        }
-                    ],
+            llm_responses = []
+            if sprite_match:
+                logger.info(
+                    f"Matched a {sprite_match.pokemon_name} sprite locally "
+                    f"(similarity {sprite_match.similarity:.3f})"
                 )
-            )
-
-            # Find JSON in the response
-            json_match = re.search(
-                r"({.*})", identification_response.output_text, re.DOTALL
-            )
-            if not json_match:
-                logger.error("No JSON found in GPT-4o-mini identification response")
-                return Response(
-                    content={"error": "Could not parse image analysis results"},
-                    status_code=500,
-                    media_type=MediaType.JSON,
+                image_id_result = {
+                    "pokemon_identified": True,
+                    "pokemon_name": sprite_match.pokemon_name,
+                    "confidence": "high",
+                }
+            else:
+                identification = await llm_router.complete(
+                    "vision",
+                    "",
+                    identification_prompt,
+                    Priority.IMAGE,
+                    ROUTING_OUTPUT_TOKENS,
+                    image=(image_data, data.content_type or "image/jpeg"),
                 )
+                logger.info(f"Image identified by {identification.target}")
+                llm_responses.append(identification.response)
+                if not isinstance(identification.data, dict):
+                    logger.error("No JSON found in image identification response")
+                    return Response(
+                        content=ErrorResponse(
+                            error="Could not parse image analysis results"
+                        ),
+                        status_code=500,
+                        media_type=MediaType.JSON,
+                    )
 
-            image_id_result = json.loads(json_match.group(1))
+                image_id_result = identification.data
 
             # If a Pokémon was identified, get its data
             pokemon_data = None
@@ -526,35 +719,25 @@ Respond with ONLY valid JSON that follows this structure - do not include any ex
                         assistant_message = f"""I've identified a {pokemon_data["name"]} in a photo with {image_id_result["confidence"]} confidence.
 Here's the Pokémon's data:
 
-{json.dumps(pokemon_data, indent=2)}
+{compact_context(pokemon_data)}
 
 Generate a structured Pokédex response about this Pokémon."""
 
-                        # Get structured response from GPT
-                        gpt_response = await asyncio.to_thread(
-                            lambda: mcp_client.openai.chat.completions.create(
-                                model="gpt-4o-mini",
-                                temperature=0.7,
-                                messages=[
-                                    {"role": "system", "content": system_prompt},
-                                    {"role": "assistant", "content": assistant_message},
-                                ],
-                            )
+                        gpt_response = await llm_router.complete(
+                            "answer",
+                            system_prompt,
+                            assistant_message,
+                            Priority.IMAGE,
+                            ANSWER_OUTPUT_TOKENS,
                         )
+                        llm_responses.append(gpt_response.response)
 
-                        response_text = gpt_response.choices[0].message.content.strip()
-                        # Clean up the response if it has markdown code blocks
-                        if response_text.startswith(
-                            "```json"
-                        ) and response_text.endswith("```"):
-                            response_text = response_text[7:-3].strip()
-                        elif response_text.startswith("```") and response_text.endswith(
-                            "```"
-                        ):
-                            response_text = response_text[3:-3].strip()
-
-                        structured_response = json.loads(response_text)
+                        structured_response = gpt_response.data
+                        if structured_response is None:
+                            raise ValueError("The response was not valid JSON")
 
+                    except AdmissionRejected:
+                        raise
                     except Exception as e:
                         logger.error(
                             f"Error processing Pokemon data or generating response: {e}"
@@ -567,6 +750,8 @@ Generate a structured Pokédex response about this Pokémon."""
                                 }
                             ]
                         }
+                except AdmissionRejected:
+                    raise
                 except Exception as e:
                     logger.error(f"Error getting Pokémon data: {e}")
                     structured_response = {
@@ -588,15 +773,26 @@ Generate a structured Pokédex response about this Pokémon."""
                     ]
                 }
 
+            record_usage("image", *llm_responses)
+            # Log what the image showed; the uploaded file's name is the user's
+            # business and says nothing about the search
+            identified = image_id_result.get("pokemon_identified") and (
+                image_id_result.get("pokemon_name")
+            )
+            log_search(identified or "image", "image", pokemon_data, started)
+
             # Build the response with all the data we've collected
-            analysis_result = {
-                "identification": image_id_result,
-                "pokemon_data": pokemon_data,
-                "structured_data": structured_response,
-                "raw_markdown": convert_structured_to_markdown(structured_response)
+            raw_markdown = (
+                convert_structured_to_markdown(structured_response)
                 if structured_response
-                else "No data available",
-            }
+                else "No data available"
+            )
+            analysis_result = ImageAnalysisResponse(
+                identification=to_identification(image_id_result),
+                pokemon_data=to_pokemon_data(pokemon_data),
+                structured_data=to_structured_data(structured_response, raw_markdown),
+                raw_markdown=raw_markdown,
+            )
 
             return Response(
                 content=analysis_result,
@@ -604,23 +800,57 @@ Generate a structured Pokédex response about this Pokémon."""
                 media_type=MediaType.JSON,
             )
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Error in image analysis: {str(e)}")
             return Response(
-                content={"error": f"Image analysis failed: {str(e)}"},
+                content=ErrorResponse(error=f"Image analysis failed: {str(e)}"),
                 status_code=500,
                 media_type=MediaType.JSON,
             )
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error processing image: {str(e)}")
         return Response(
-            content={"error": str(e)},
+            content=ErrorResponse(error=str(e)),
             status_code=500,
             media_type=MediaType.JSON,
         )
 
 
+@get("/service/metrics", media_type=MediaType.JSON)
+async def service_metrics() -> Dict[str, Any]:
+    return metrics.snapshot()
+
+
+def log_search(query: str, source: str, pokemon_data: Any, started: float) -> None:
+    """Queue a search for search_history with what it resolved to."""
+    resolved_pokemon = cache_status = None
+    if isinstance(pokemon_data, dict) and "error" not in pokemon_data:
+        resolved_pokemon = pokemon_data.get("name")
+        cache_status = pokemon_data.get("cache_status")
+    search_log.record(
+        query,
+        source,
+        resolved_pokemon=resolved_pokemon,
+        cache_hit=cache_status in CACHE_HIT_STATUSES if cache_status else None,
+        latency_ms=round((time.monotonic() - started) * 1000),
+    )
+
+
+def to_chat_response(response: Dict[str, Any]) -> ChatResponse:
+    return ChatResponse(
+        structured_data=to_structured_data(
+            response["structured_data"], response["raw_markdown"]
+        ),
+        text=response["raw_markdown"],
+        pokemon_data=to_pokemon_data(response["raw_data"]),
+    )
+
+
 # Add this helper function for converting structured data to markdown
 def convert_structured_to_markdown(structured_data):
     if not structured_data or "sections" not in structured_data:
@@ -635,8 +865,13 @@ def convert_structured_to_markdown(structured_data):
 
 async def startup() -> None:
     logger.info("Running app starup")
+    await load_encoding()
     await mcp_client.initialize_session()
 
+    if os.environ.get("POKEDEX_SNAPSHOT"):
+        logger.info("Serving Pokemon data from a snapshot, skipping the database")
+        return
+
     logger.info("Initializing database connection")
     await init_db()
     logger.info("Running database migrations")
@@ -651,25 +886,48 @@ async def startup() -> None:
         logger.error(f"Error running database migrations: {str(e)}")
         # Consider whether to fail startup or continue
 
+    search_log.start()
+
 
 async def cleanup() -> None:
+    await search_log.stop()
     await mcp_client.cleanup()
     logger.info("MCP client connection terminated")
+    await asset_cache.close()
+
 
+asset_proxy_router = create_asset_proxy_router(
+    asset_cache, opt={"skip_compression": True}
+)
 
-static_files_router = create_static_files_router(
-    directories=["frontend/dist"],
+static_files_router = create_static_assets_router(
+    directory="frontend/dist",
     path="/",
-    html_mode=True,
     name="frontend-artifact",
-    include_in_schema=False,
+    opt={"skip_compression": True},
 )
 
 app = Litestar(
-    route_handlers=[pokedex_chat, speech_to_text, analyze_image, static_files_router],
+    route_handlers=[
+        pokedex_chat,
+        get_pokemon_data,
+        speech_to_text,
+        voice_session,
+        analyze_image,
+        service_metrics,
+        asset_proxy_router,
+        static_files_router,
+    ],
     debug=True,
     on_startup=[startup],
     on_shutdown=[cleanup],
+    exception_handlers={AdmissionRejected: admission_rejected_handler},
+    compression_config=CompressionConfig(
+        backend="brotli",
+        brotli_gzip_fallback=True,
+        minimum_size=COMPRESSION_MINIMUM_SIZE,
+        exclude_opt_key="skip_compression",
+    ),
 )
 
 if __name__ == "__main__":
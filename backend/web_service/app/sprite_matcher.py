@@ -0,0 +1,255 @@
+"""Identify official sprites locally before asking a vision model.
+
+Many uploaded images are screenshots or prints of official sprites. Those
+are matched on the CPU against an index of sprite features: each image is
+cropped to its foreground, flattened onto white, shrunk to a small square and
+turned into a unit vector, so nearest-neighbour search is one matrix-vector
+product. Only a confident match is returned; anything else goes to the
+vision model as before.
+
+Build the index from the sprites of every cached pokemon with:
+
+    python -m backend.web_service.app.sprite_matcher build sprites.npz
+
+and point SPRITE_INDEX_PATH at it. Needs the ``vision`` extra (NumPy and
+Pillow); without it, or without an index, every image goes to the model.
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from backend.web_service.app.metrics import metrics
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # pragma: no cover - the vision extra is optional at runtime
+    np = None
+    Image = None
+
+logger = logging.getLogger("sprite-matcher")
+
+SPRITE_INDEX_PATH = os.environ.get("SPRITE_INDEX_PATH")
+# Cosine similarity the best sprite must reach, and how far it must be ahead
+# of the best sprite of any other pokemon, to skip the vision model.
+SPRITE_MATCH_THRESHOLD = float(os.environ.get("SPRITE_MATCH_THRESHOLD", "0.9"))
+SPRITE_MATCH_MARGIN = float(os.environ.get("SPRITE_MATCH_MARGIN", "0.05"))
+
+# Side of the square each image is reduced to before comparing, and the
+# length of the RGB feature vector that leaves
+FEATURE_SIZE = 24
+FEATURE_LENGTH = FEATURE_SIZE**2 * 3
+# Large uploads are shrunk to this first; sprites are 96px anyway
+MAX_DECODE_SIZE = 256
+# How far (summed over RGB) a pixel must be from the border colour to count as
+# foreground in images without transparency
+BACKGROUND_TOLERANCE = 48
+
+# Front-facing sprites; nobody photographs a back sprite
+SPRITE_KEYS = ("default", "shiny", "female", "shiny_female")
+
+
+@dataclass
+class SpriteMatch:
+    """The pokemon whose sprite an image matched, and how closely."""
+
+    pokemon_name: str
+    similarity: float
+    margin: float
+
+
+def image_features(image: "Image.Image") -> "np.ndarray":
+    """Unit feature vector of an image's foreground on a white square."""
+    image.thumbnail((MAX_DECODE_SIZE, MAX_DECODE_SIZE))
+    pixels = np.asarray(image.convert("RGBA"), dtype=np.int16)
+    rgb, alpha = pixels[..., :3], pixels[..., 3]
+
+    if alpha.min() < 255:
+        mask = alpha > 127
+    else:
+        # No transparency: whatever differs from the border colour is the subject
+        border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]])
+        background = np.median(border, axis=0)
+        mask = np.abs(rgb - background).sum(axis=-1) > BACKGROUND_TOLERANCE
+
+    rows, columns = np.nonzero(mask)
+    if len(rows):
+        top, bottom = rows.min(), rows.max() + 1
+        left, right = columns.min(), columns.max() + 1
+        rgb, mask = rgb[top:bottom, left:right], mask[top:bottom, left:right]
+    rgb = np.where(mask[..., None], rgb, 255).astype(np.uint8)
+
+    # Pad to a square so the aspect ratio survives the resize
+    height, width = mask.shape
+    side = max(height, width)
+    square = np.full((side, side, 3), 255, dtype=np.uint8)
+    top, left = (side - height) // 2, (side - width) // 2
+    square[top : top + height, left : left + width] = rgb
+
+    small = Image.fromarray(square).resize(
+        (FEATURE_SIZE, FEATURE_SIZE), Image.Resampling.BOX
+    )
+    vector = np.asarray(small, dtype=np.float32).ravel() / 255
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def decode_features(image_data: bytes) -> "np.ndarray":
+    image = Image.open(io.BytesIO(image_data))
+    # JPEG can decode straight at a reduced scale, which is much cheaper
+    image.draft("RGB", (MAX_DECODE_SIZE, MAX_DECODE_SIZE))
+    return image_features(image)
+
+
+class SpriteMatcher:
+    """Nearest-neighbour search over an index of sprite feature vectors."""
+
+    def __init__(self, vectors: "np.ndarray", names: "np.ndarray") -> None:
+        self.vectors = vectors
+        self.names = names
+
+    @classmethod
+    def load(cls, path: str) -> "SpriteMatcher":
+        """Load an index, rejecting one built with other feature settings."""
+        with np.load(path) as index:
+            vectors, names = index["vectors"].astype(np.float32), index["names"]
+        if vectors.ndim != 2 or vectors.shape[1] != FEATURE_LENGTH:
+            raise ValueError(
+                f"expected {FEATURE_LENGTH} features per sprite, "
+                f"got vectors of shape {vectors.shape}"
+            )
+        if len(vectors) != len(names):
+            raise ValueError(f"{len(vectors)} vectors for {len(names)} names")
+        return cls(vectors, names)
+
+    @classmethod
+    def from_env(cls) -> Optional["SpriteMatcher"]:
+        """The matcher for SPRITE_INDEX_PATH, or None if it can't be used."""
+        if not SPRITE_INDEX_PATH:
+            return None
+        if np is None:
+            logger.warning("SPRITE_INDEX_PATH is set but NumPy or Pillow is missing")
+            return None
+        try:
+            matcher = cls.load(SPRITE_INDEX_PATH)
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not load sprite index {SPRITE_INDEX_PATH}: {e}")
+            return None
+        logger.info(f"Loaded {len(matcher.names)} sprites from {SPRITE_INDEX_PATH}")
+        return matcher
+
+    def match(self, features: "np.ndarray") -> Optional[SpriteMatch]:
+        """The pokemon these features match confidently, if any."""
+        if not len(self.names):
+            return None
+        similarities = self.vectors @ features
+        best = int(np.argmax(similarities))
+        name = str(self.names[best])
+        others = similarities[self.names != name]
+        runner_up = float(others.max()) if len(others) else -1.0
+
+        similarity = float(similarities[best])
+        margin = similarity - runner_up
+        if similarity < SPRITE_MATCH_THRESHOLD or margin < SPRITE_MATCH_MARGIN:
+            return None
+        return SpriteMatch(pokemon_name=name, similarity=similarity, margin=margin)
+
+    async def identify(self, image_data: bytes) -> Optional[SpriteMatch]:
+        """Match an uploaded image off the event loop; None means ask the model."""
+        started = time.monotonic()
+        try:
+            features = await asyncio.to_thread(decode_features, image_data)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.info(f"Could not decode image for sprite matching: {e}")
+            return None
+        try:
+            match = self.match(features)
+        except Exception as e:
+            logger.error(f"Error matching image against sprites: {e}")
+            metrics.inc("sprite_match.errors")
+            return None
+        metrics.observe("sprite_match.seconds", time.monotonic() - started)
+        metrics.inc("sprite_match.hits" if match else "sprite_match.misses")
+        return match
+
+
+def write_index(path: str, sprites: list[tuple[str, bytes]]) -> int:
+    """Write the features of (pokemon name, sprite image) pairs to an index."""
+    vectors, names = [], []
+    for name, image_data in sprites:
+        try:
+            vectors.append(decode_features(image_data))
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning(f"Skipping a sprite of {name}: {e}")
+            continue
+        names.append(name)
+
+    matrix = np.stack(vectors) if vectors else np.empty((0, FEATURE_LENGTH))
+    with open(path, "wb") as f:
+        np.savez_compressed(f, vectors=matrix.astype(np.float32), names=np.array(names))
+    return len(names)
+
+
+async def fetch_sprites(records: list[dict], concurrency: int) -> list[tuple]:
+    """Download the front-facing sprites of each essential data record."""
+    urls = [
+        (record["name"], url)
+        for record in records
+        for key, url in (record.get("sprites") or {}).items()
+        if key in SPRITE_KEYS and url
+    ]
+    logger.info(f"Fetching {len(urls)} sprites of {len(records)} pokemon")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+
+        async def fetch(name: str, url: str) -> tuple | None:
+            async with semaphore:
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    logger.warning(f"Could not fetch {url}: {e}")
+                    return None
+                return name, response.content
+
+        sprites = await asyncio.gather(*(fetch(name, url) for name, url in urls))
+    return [sprite for sprite in sprites if sprite]
+
+
+def records_from_snapshot(path: str) -> list[dict]:
+    from backend.mcp_server.app.snapshot import Snapshot
+
+    snapshot = Snapshot(path)
+    return [snapshot.get(entry["name"]) for entry in snapshot.entries()]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build a sprite matcher index.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Write a sprite index file")
+    build.add_argument("path")
+    build.add_argument(
+        "--snapshot",
+        help="Read pokemon from this snapshot instead of the pokemon_cache table",
+    )
+    build.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.snapshot:
+        records = records_from_snapshot(args.snapshot)
+    else:
+        from backend.mcp_server.app.snapshot import records_from_cache
+
+        records = asyncio.run(records_from_cache())
+    sprites = asyncio.run(fetch_sprites(records, args.concurrency))
+    logger.info(f"Indexed {write_index(args.path, sprites)} sprites to {args.path}")
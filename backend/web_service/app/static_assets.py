@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from litestar import asgi
+from litestar.handlers import ASGIRouteHandler
+from litestar.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional at runtime
+    brotli = None
+
+logger = logging.getLogger("static-assets")
+
+# Files worth compressing at build time, and the smallest one we bother with.
+COMPRESSIBLE_SUFFIXES = {
+    ".css",
+    ".html",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".mjs",
+    ".svg",
+    ".txt",
+    ".webmanifest",
+    ".xml",
+}
+MIN_COMPRESS_SIZE = 1024
+
+# Content-Encoding name -> suffix of the precompressed sibling file, in
+# order of preference.
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+# Vite emits content-hashed file names under assets/, so those never change.
+HASHED_ASSETS_DIR = "assets"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class AssetVariant:
+    """One stored representation of a static file."""
+
+    path: Path
+    size: int
+    etag: str
+
+
+@dataclass
+class StaticAsset:
+    """A static file together with its precompressed variants."""
+
+    media_type: str
+    cache_control: str
+    last_modified: str
+    identity: AssetVariant
+    encoded: Dict[str, AssetVariant] = field(default_factory=dict)
+
+
+def _etag_for(path: Path, encoding: str) -> str:
+    digest = hashlib.blake2b(path.read_bytes(), digest_size=12).hexdigest()
+    return f'"{digest}-{encoding}"'
+
+
+def precompress_directory(directory: str, min_size: int = MIN_COMPRESS_SIZE) -> int:
+    """Write .br and .gz siblings for every compressible file in a build directory.
+
+    Args:
+        directory (str): The build output directory, e.g. frontend/dist.
+        min_size (int): Files smaller than this are left uncompressed.
+    Returns:
+        int: The number of compressed files written.
+    """
+    if brotli is None:
+        logger.warning("brotli is not installed, only writing gzip variants")
+
+    written = 0
+    for path in Path(directory).rglob("*"):
+        if (
+            not path.is_file()
+            or path.suffix not in COMPRESSIBLE_SUFFIXES
+            or path.stat().st_size < min_size
+        ):
+            continue
+
+        raw = path.read_bytes()
+        candidates = [(".gz", gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            candidates.append((".br", brotli.compress(raw, quality=11)))
+
+        for suffix, compressed in candidates:
+            # A variant that isn't smaller is worse than serving the original.
+            if len(compressed) >= len(raw):
+                continue
+            path.with_name(path.name + suffix).write_bytes(compressed)
+            written += 1
+
+    logger.info(f"Wrote {written} precompressed files in {directory}")
+    return written
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into a mapping of coding -> q-value."""
+    accepted = {}
+    for item in header.split(","):
+        parts = [part.strip() for part in item.split(";")]
+        coding = parts[0].lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+
+class StaticAssets:
+    """ASGI app serving a Vite build with precompressed variants.
+
+    The build directory is indexed once on startup. Each request picks the
+    best variant for the client's Accept-Encoding, answers If-None-Match with
+    a 304 and, when the server advertises the ``http.response.pathsend`` or
+    ``http.response.zerocopysend`` extension, hands the file to the server
+    instead of reading it through Python.
+    """
+
+    def __init__(self, directory: str, index_file: str = "index.html") -> None:
+        self.directory = Path(directory)
+        self.index_file = index_file
+        self.assets: Dict[str, StaticAsset] = {}
+        self._build_index()
+
+    def _build_index(self) -> None:
+        if not self.directory.is_dir():
+            logger.warning(f"Static directory {self.directory} does not exist")
+            return
+
+        encoded_suffixes = {suffix for _, suffix in ENCODING_SUFFIXES}
+        for path in self.directory.rglob("*"):
+            if not path.is_file() or path.suffix in encoded_suffixes:
+                continue
+
+            relative = path.relative_to(self.directory).as_posix()
+            stat = path.stat()
+            media_type, _ = mimetypes.guess_type(path.name)
+            if relative.startswith(f"{HASHED_ASSETS_DIR}/"):
+                cache_control = IMMUTABLE_CACHE_CONTROL
+            else:
+                cache_control = REVALIDATE_CACHE_CONTROL
+
+            asset = StaticAsset(
+                media_type=media_type or "application/octet-stream",
+                cache_control=cache_control,
+                last_modified=formatdate(stat.st_mtime, usegmt=True),
+                identity=AssetVariant(path, stat.st_size, _etag_for(path, "identity")),
+            )
+            for encoding, suffix in ENCODING_SUFFIXES:
+                variant_path = path.with_name(path.name + suffix)
+                if variant_path.is_file():
+                    asset.encoded[encoding] = AssetVariant(
+                        variant_path,
+                        variant_path.stat().st_size,
+                        _etag_for(variant_path, encoding),
+                    )
+            self.assets[relative] = asset
+
+        logger.info(f"Indexed {len(self.assets)} static files in {self.directory}")
+
+    def resolve(self, path: str) -> Tuple[Optional[StaticAsset], int]:
+        """Map a request path to an asset, following html_mode conventions."""
+        relative = path.strip("/")
+        if relative in self.assets:
+            return self.assets[relative], 200
+
+        index = f"{relative}/{self.index_file}" if relative else self.index_file
+        if index in self.assets:
+            return self.assets[index], 200
+
+        return self.assets.get("404.html"), 404
+
+    @staticmethod
+    def select_variant(
+        asset: StaticAsset, accept_encoding: str
+    ) -> Tuple[AssetVariant, Optional[str]]:
+        """Pick the preferred encoded variant the client accepts."""
+        if asset.encoded and accept_encoding:
+            accepted = parse_accept_encoding(accept_encoding)
+            wildcard = accepted.get("*", 0.0)
+            for encoding, _ in ENCODING_SUFFIXES:
+                if encoding in asset.encoded and accepted.get(encoding, wildcard) > 0:
+                    return asset.encoded[encoding], encoding
+        return asset.identity, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope.get("method", "GET")
+        if method not in ("GET", "HEAD"):
+            await self._send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+
+        asset, status = self.resolve(scope["path"])
+        if asset is None:
+            await self._send_empty(send, 404, [])
+            return
+
+        request_headers = {
+            key.decode("latin-1").lower(): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        variant, encoding = self.select_variant(
+            asset, request_headers.get("accept-encoding", "")
+        )
+
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"etag", variant.etag.encode()),
+            (b"cache-control", asset.cache_control.encode()),
+            (b"last-modified", asset.last_modified.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+
+        if_none_match = request_headers.get("if-none-match")
+        if (
+            status == 200
+            and if_none_match
+            and etag_matches(if_none_match, variant.etag)
+        ):
+            await self._send_empty(send, 304, headers)
+            return
+
+        headers.append((b"content-type", asset.media_type.encode()))
+        headers.append((b"content-length", str(variant.size).encode()))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode()))
+
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        if method == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        await self._send_file(scope, send, variant)
+
+    @staticmethod
+    async def _send_empty(
+        send: Send, status: int, headers: List[Tuple[bytes, bytes]]
+    ) -> None:
+        await send(
+            {"type": "http.response.start", "status": status, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _send_file(scope: Scope, send: Send, variant: AssetVariant) -> None:
+        extensions = scope.get("extensions") or {}
+
+        if "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(variant.path)})
+            return
+
+        if "http.response.zerocopysend" in extensions:
+            with open(variant.path, "rb") as f:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": f,
+                        "count": variant.size,
+                        "more_body": False,
+                    }
+                )
+            return
+
+        with open(variant.path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, READ_CHUNK_SIZE)
+                more_body = len(chunk) == READ_CHUNK_SIZE
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": more_body,
+                    }
+                )
+                if not more_body:
+                    break
+
+
+def create_static_assets_router(
+    directory: str,
+    path: str = "/",
+    name: Optional[str] = None,
+    opt: Optional[Dict[str, Any]] = None,
+) -> ASGIRouteHandler:
+    """Create a route handler mounting a precompressed static build at ``path``."""
+    assets = StaticAssets(directory)
+
+    @asgi(path, is_mount=True, name=name, opt=opt, include_in_schema=False)
+    async def static_assets(scope: Scope, receive: Receive, send: Send) -> None:
+        await assets(scope, receive, send)
+
+    return static_assets
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(
+        description="Precompress a frontend build with brotli and gzip."
+    )
+    parser.add_argument("directory", nargs="?", default="frontend/dist")
+    parser.add_argument("--min-size", type=int, default=MIN_COMPRESS_SIZE)
+    args = parser.parse_args()
+    precompress_directory(args.directory, args.min_size)
@@ -0,0 +1,167 @@
+"""Voice queries over one WebSocket: audio in, transcript and answer out.
+
+Protocol, per utterance:
+
+- the client sends the recording as binary messages, in as many chunks as it
+  likes, then ``{"type": "end"}`` once speech has ended. An utterance also
+  ends when no audio has arrived for VOICE_SPEECH_END_SECONDS.
+- the server replies ``{"type": "transcript", "transcript": ...}``, one
+  ``{"type": "section", "index": ..., "section": ...}`` per answer section as
+  soon as it is ready, then ``{"type": "done", "text": ..., "pokemon_data": ...}``.
+  If anything fails it sends ``{"type": "error", "error": ...}`` instead and
+  the connection stays open for the next utterance.
+
+Utterances are answered in order. If the client disconnects, the utterance
+being answered is cancelled. Messages from the receiving side (errors) and the
+answering side go out one at a time.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+import msgspec
+from backend.web_service.app.admission import AdmissionRejected
+from backend.web_service.app.metrics import metrics
+from backend.web_service.app.schemas import ChatResponse, Section
+from litestar import WebSocket
+from litestar.exceptions import WebSocketDisconnect
+
+logger = logging.getLogger("voice")
+
+VOICE_SPEECH_END_SECONDS = float(os.environ.get("VOICE_SPEECH_END_SECONDS", "1.5"))
+VOICE_MAX_AUDIO_BYTES = int(os.environ.get("VOICE_MAX_AUDIO_BYTES", str(10 * 2**20)))
+# Utterances waiting behind the one being answered
+VOICE_MAX_PENDING = int(os.environ.get("VOICE_MAX_PENDING", "2"))
+
+# Called by an answer with each section as soon as it is ready
+SectionCallback = Callable[[Section], Awaitable[None]]
+
+
+class VoiceSession:
+    """Turn the utterances on one WebSocket into transcripts and answers.
+
+    ``answer(query, on_section)`` hands each section to ``on_section`` as soon
+    as it has it, and returns the whole response once it is done.
+    """
+
+    def __init__(
+        self,
+        socket: WebSocket,
+        transcribe: Callable[[bytes], Awaitable[str]],
+        answer: Callable[[str, SectionCallback], Awaitable[ChatResponse]],
+    ) -> None:
+        self.socket = socket
+        self.transcribe = transcribe
+        self.answer = answer
+        self.utterances: asyncio.Queue[bytes] = asyncio.Queue(VOICE_MAX_PENDING)
+        self.chunks: list[bytes] = []
+        self.size = 0
+        self._send_lock = asyncio.Lock()
+
+    async def run(self) -> None:
+        await self.socket.accept()
+        metrics.inc("voice.sessions")
+        worker = asyncio.create_task(self._answer_utterances())
+        try:
+            await self._receive_utterances()
+        except WebSocketDisconnect:
+            logger.info("Voice client disconnected")
+        finally:
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+
+    async def _receive_utterances(self) -> None:
+        while True:
+            timeout = VOICE_SPEECH_END_SECONDS if self.chunks else None
+            try:
+                message = await asyncio.wait_for(self.socket.receive(), timeout)
+            except asyncio.TimeoutError:
+                await self._end_utterance()
+                continue
+
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(detail="disconnect event")
+            if message.get("bytes"):
+                await self._add_chunk(message["bytes"])
+            elif message.get("text"):
+                await self._control(message["text"])
+
+    async def _add_chunk(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > VOICE_MAX_AUDIO_BYTES:
+            self.chunks, self.size = [], 0
+            await self._send_error("Recording is too long")
+            return
+        self.chunks.append(chunk)
+
+    async def _control(self, text: str) -> None:
+        try:
+            command = json.loads(text)
+        except json.JSONDecodeError:
+            command = None
+        if isinstance(command, dict) and command.get("type") == "end":
+            await self._end_utterance()
+        else:
+            await self._send_error(f"Unknown message: {text[:100]}")
+
+    async def _end_utterance(self) -> None:
+        audio, self.chunks, self.size = b"".join(self.chunks), [], 0
+        if not audio:
+            return
+        if self.utterances.full():
+            await self._send_error("Still answering earlier questions")
+            return
+        self.utterances.put_nowait(audio)
+
+    async def _answer_utterances(self) -> None:
+        while True:
+            audio = await self.utterances.get()
+            try:
+                await self._answer(audio)
+            except asyncio.CancelledError:
+                raise
+            except WebSocketDisconnect:
+                return
+            except AdmissionRejected as e:
+                await self._send_error(str(e), retry_after=e.retry_after)
+            except Exception as e:
+                logger.error(f"Error answering voice query: {e}")
+                await self._send_error(str(e))
+
+    async def _answer(self, audio: bytes) -> None:
+        transcript = (await self.transcribe(audio)).strip()
+        if not transcript:
+            await self._send_error("No speech was recognized")
+            return
+        await self._send({"type": "transcript", "transcript": transcript})
+
+        sent = 0
+
+        async def send_section(section: Section) -> None:
+            nonlocal sent
+            await self._send({"type": "section", "index": sent, "section": section})
+            sent += 1
+
+        response = await self.answer(transcript, send_section)
+        await self._send(
+            {
+                "type": "done",
+                "text": response.text,
+                "pokemon_data": response.pokemon_data,
+            }
+        )
+        metrics.inc("voice.queries")
+
+    async def _send_error(self, error: str, retry_after: Optional[int] = None) -> None:
+        message: dict[str, Any] = {"type": "error", "error": error}
+        if retry_after is not None:
+            message["retry_after"] = retry_after
+        await self._send(message)
+
+    async def _send(self, message: dict[str, Any]) -> None:
+        # The receive loop and the worker both send; keep frames whole
+        async with self._send_lock:
+            await self.socket.send_data(msgspec.json.encode(message).decode())
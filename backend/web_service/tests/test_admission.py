@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from backend.web_service.app.admission import (
+    AdmissionRejected,
+    Priority,
+    ProviderLimiter,
+)
+
+
+def test_admission_queues_by_priority_and_sheds_load():
+    limiter = ProviderLimiter(
+        "test-priority",
+        max_concurrency=1,
+        max_queue=2,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+    )
+    order = []
+
+    async def call(name, priority):
+        try:
+            async with limiter.admit(priority):
+                order.append(name)
+                await asyncio.sleep(0.01)
+        except AdmissionRejected as e:
+            order.append(f"{name}:{e.status_code}")
+
+    async def run():
+        first = asyncio.create_task(call("first", Priority.TEXT))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(call("image", Priority.IMAGE)),
+            asyncio.create_task(call("text", Priority.TEXT)),
+        ]
+        await asyncio.sleep(0)
+        await call("overflow", Priority.TEXT)
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(run())
+
+    assert order == ["first", "overflow:429", "text", "image"]
+    assert limiter.running == 0
+    assert limiter.queue_depth == 0
+
+
+def test_admission_rejects_after_max_wait():
+    limiter = ProviderLimiter(
+        "test-timeout",
+        max_concurrency=1,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+        max_wait=0.05,
+    )
+
+    async def run():
+        async with limiter.admit(Priority.TEXT):
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with limiter.admit(Priority.TEXT):
+                    pass
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert rejected.status_code == 503
+    assert rejected.retry_after == 1
+    assert limiter.running == 0
+    assert limiter.queue_depth == 0
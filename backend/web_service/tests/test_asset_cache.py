@@ -0,0 +1,163 @@
+import asyncio
+import os
+from collections import Counter
+
+import httpx
+from backend.web_service.app.asset_cache import AssetCache, create_asset_proxy_router
+from litestar import Litestar, get
+from litestar.response import Response
+from litestar.testing import TestClient
+
+ORIGIN_FILES = {
+    "pokemon/25.png": bytes(range(256)) * 4,
+    "pokemon/1.png": b"b" * 600,
+    "pokemon/4.png": b"c" * 600,
+}
+
+
+def make_origin():
+    """A local stand-in for the upstream sprite host that counts requests."""
+    hits = Counter()
+
+    @get("/sprites/{file_path:path}", sync_to_thread=False)
+    def origin_file(file_path: str) -> Response:
+        hits[file_path] += 1
+        content = ORIGIN_FILES.get(file_path.lstrip("/"))
+        if content is None:
+            return Response(content=b"", status_code=404)
+        return Response(content=content, media_type="image/png")
+
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=Litestar([origin_file])),
+        base_url="http://origin.test",
+    )
+    return client, hits
+
+
+def make_cache(tmp_path, max_bytes=1024 * 1024):
+    client, hits = make_origin()
+    cache = AssetCache(
+        directory=str(tmp_path),
+        max_bytes=max_bytes,
+        origins={"sprites": "http://origin.test/sprites/"},
+        client=client,
+    )
+    return cache, hits
+
+
+def test_asset_proxy_fetches_once_and_serves_ranges(tmp_path):
+    cache, hits = make_cache(tmp_path)
+    app = Litestar([create_asset_proxy_router(cache)])
+
+    with TestClient(app) as client:
+        first = client.get("/service/assets/sprites/pokemon/25.png")
+        assert first.status_code == 200
+        assert first.content == ORIGIN_FILES["pokemon/25.png"]
+        assert "immutable" in first.headers["cache-control"]
+
+        partial = client.get(
+            "/service/assets/sprites/pokemon/25.png", headers={"range": "bytes=10-19"}
+        )
+        assert partial.status_code == 206
+        assert partial.content == ORIGIN_FILES["pokemon/25.png"][10:20]
+        assert partial.headers["content-range"] == "bytes 10-19/1024"
+
+        suffix = client.get(
+            "/service/assets/sprites/pokemon/25.png", headers={"range": "bytes=-4"}
+        )
+        assert suffix.content == ORIGIN_FILES["pokemon/25.png"][-4:]
+
+        unsatisfiable = client.get(
+            "/service/assets/sprites/pokemon/25.png", headers={"range": "bytes=5000-"}
+        )
+        assert unsatisfiable.status_code == 416
+
+        not_modified = client.get(
+            "/service/assets/sprites/pokemon/25.png",
+            headers={"if-none-match": first.headers["etag"]},
+        )
+        assert not_modified.status_code == 304
+
+    assert hits["/pokemon/25.png"] == 1
+
+
+def test_asset_proxy_rejects_unknown_assets(tmp_path):
+    cache, hits = make_cache(tmp_path)
+    app = Litestar([create_asset_proxy_router(cache)])
+
+    with TestClient(app) as client:
+        assert client.get("/service/assets/sprites/pokemon/999.png").status_code == 404
+        assert client.get("/service/assets/elsewhere/pokemon/1.png").status_code == 404
+        assert client.get("/service/assets/sprites/../secret.png").status_code == 404
+
+    assert "/secret.png" not in hits
+
+
+def test_asset_cache_evicts_least_recently_used(tmp_path):
+    cache, hits = make_cache(tmp_path, max_bytes=1700)
+
+    async def run():
+        first = await cache.get("sprites", "pokemon/1.png")
+        await cache.get("sprites", "pokemon/4.png")
+        # Touch 1.png so 4.png becomes the least recently used entry.
+        await cache.get("sprites", "pokemon/1.png")
+        await cache.get("sprites", "pokemon/25.png")
+        return first
+
+    first = asyncio.run(run())
+
+    assert first.key in cache
+    assert cache.total_bytes <= 1700
+    assert sorted(p.name.split(".")[0] for p in tmp_path.iterdir()) == sorted(
+        [first.key, cache.key_for("http://origin.test/sprites/pokemon/25.png")]
+    )
+    assert hits["/pokemon/1.png"] == 1
+
+
+def test_asset_cache_serves_files_evicted_while_open(tmp_path):
+    cache, hits = make_cache(tmp_path, max_bytes=1700)
+
+    async def run():
+        asset, file = await cache.open("sprites", "pokemon/25.png")
+        # Fill the cache so 25.png is evicted and unlinked mid-response
+        await cache.get("sprites", "pokemon/1.png")
+        await cache.get("sprites", "pokemon/4.png")
+        assert not os.path.exists(asset.path)
+        head = await cache.read_range(file, 0, 9)
+        file.seek(0)
+        body = b"".join([chunk async for chunk in cache.iter_file(file)])
+        return head, body, file
+
+    head, body, file = asyncio.run(run())
+
+    assert head == ORIGIN_FILES["pokemon/25.png"][:10]
+    assert body == ORIGIN_FILES["pokemon/25.png"]
+    assert file.closed
+
+
+def test_asset_cache_refetches_files_evicted_before_open(tmp_path):
+    cache, hits = make_cache(tmp_path)
+
+    async def run():
+        asset = await cache.get("sprites", "pokemon/25.png")
+        os.unlink(asset.path)
+        asset, file = await cache.open("sprites", "pokemon/25.png")
+        with file:
+            return file.read()
+
+    assert asyncio.run(run()) == ORIGIN_FILES["pokemon/25.png"]
+    assert hits["/pokemon/25.png"] == 2
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    cache, hits = make_cache(tmp_path)
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get("sprites", "pokemon/25.png") for _ in range(5))
+        )
+
+    assets = asyncio.run(run())
+
+    assert len({asset.key for asset in assets}) == 1
+    assert hits["/pokemon/25.png"] == 1
@@ -0,0 +1,51 @@
+import asyncio
+import math
+from array import array
+from types import SimpleNamespace
+
+import pytest
+from backend.web_service.app import audio
+
+
+def test_trim_silence_keeps_speech_with_padding():
+    rate = audio.SAMPLE_RATE
+    silence = [0] * rate
+    tone = [int(8000 * math.sin(2 * math.pi * 440 * i / rate)) for i in range(rate)]
+    pcm = array("h", silence + tone + silence).tobytes()
+
+    trimmed = audio.trim_silence(pcm)
+
+    seconds = len(trimmed) / audio.BYTES_PER_SECOND
+    assert 1.0 <= seconds <= 1.0 + 2 * audio.SILENCE_PADDING_SECONDS + 0.05
+    assert audio.trim_silence(array("h", silence).tobytes()) == b""
+
+
+def test_audio_is_sent_as_recorded_without_ffmpeg(monkeypatch):
+    monkeypatch.setattr(audio, "FFMPEG", None)
+
+    prepared = asyncio.run(audio.prepare_for_transcription(b"webm bytes"))
+
+    assert prepared.data == b"webm bytes"
+    assert prepared.suffix == ".webm"
+    assert prepared.bytes_saved == 0
+
+
+def test_silent_recordings_are_not_sent_for_transcription(monkeypatch):
+    service = pytest.importorskip("backend.web_service.app.service")
+    silence = array("h", [0] * audio.SAMPLE_RATE).tobytes()
+    monkeypatch.setattr(audio, "FFMPEG", "ffmpeg")
+    monkeypatch.setattr(audio, "_ffmpeg", lambda args, data: silence)
+
+    with pytest.raises(audio.SilentRecording):
+        asyncio.run(audio.prepare_for_transcription(b"webm bytes"))
+
+    def create(**kwargs):
+        raise AssertionError("a silent recording reached the provider")
+
+    groq_client = SimpleNamespace(
+        audio=SimpleNamespace(transcriptions=SimpleNamespace(create=create))
+    )
+    monkeypatch.setattr(service.mcp_client, "groq_client", groq_client)
+
+    transcript = asyncio.run(service.mcp_client.transcribe_audio(b"webm bytes"))
+    assert transcript == ""
@@ -0,0 +1,58 @@
+import asyncio
+
+from backend.web_service.app.coalesce import RequestCoalescer, normalize_query
+
+
+def test_coalescer_shares_one_run_and_survives_a_disconnect():
+    coalescer = RequestCoalescer("test")
+    runs = []
+
+    async def process_query():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"text": "Pikachu"}
+
+    async def run():
+        key = normalize_query("  Tell me about   PIKACHU ")
+        assert key == normalize_query("tell me about pikachu")
+
+        first = asyncio.create_task(coalescer.run(key, process_query))
+        second = asyncio.create_task(coalescer.run(key, process_query))
+        leaving = asyncio.create_task(coalescer.run(key, process_query))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+
+        results = await asyncio.gather(first, second)
+        assert leaving.cancelled()
+        return results
+
+    assert asyncio.run(run()) == [{"text": "Pikachu"}] * 2
+    assert len(runs) == 1
+    assert coalescer.in_flight == {}
+
+
+def test_coalescer_cancels_work_when_every_waiter_leaves():
+    coalescer = RequestCoalescer("test-cancel")
+    cancelled = []
+
+    async def process_query():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def run():
+        waiters = [
+            asyncio.create_task(coalescer.run("pikachu", process_query))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert cancelled == [1]
+    assert coalescer.in_flight == {}
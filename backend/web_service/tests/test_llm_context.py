@@ -0,0 +1,60 @@
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+from backend.web_service.app import llm_context
+from backend.web_service.app.llm_context import compact_context, count_tokens
+
+
+def test_compact_context_drops_presentation_fields_and_fits_budget():
+    pikachu = {
+        "id": 25,
+        "name": "pikachu",
+        "types": ["electric"],
+        "base_stats": {"hp": 35, "speed": 90},
+        "sprites": {"default": "/service/assets/sprites/pokemon/25.png"},
+        "default_sprite": "/service/assets/sprites/pokemon/25.png",
+        "cry_url": "/service/assets/showdown-cries/pikachu.mp3",
+    }
+
+    context = json.loads(compact_context(json.dumps(pikachu, indent=2)))
+    assert context == {
+        "id": 25,
+        "name": "pikachu",
+        "types": ["electric"],
+        "base_stats": {"hp": 35, "speed": 90},
+    }
+
+    batch = {
+        "count": 10,
+        "results": [{"pokemon_name": "pikachu", "data": pikachu}] * 10,
+    }
+    text = compact_context(batch, budget=100)
+    assert count_tokens(text) <= 100
+    context = json.loads(text)
+    assert context["truncated"] is True
+    assert 0 < len(context["results"]) < 10
+
+
+def test_token_encoding_loads_off_the_event_loop(monkeypatch):
+    loaded_on = []
+
+    class Encoding:
+        def encode(self, text):
+            return text.split()
+
+    def get_encoding(name):
+        loaded_on.append(threading.get_ident())
+        return Encoding()
+
+    monkeypatch.setattr(llm_context, "ENCODING", None)
+    monkeypatch.setattr(
+        llm_context, "tiktoken", SimpleNamespace(get_encoding=get_encoding)
+    )
+
+    # Estimated until the encoding has been loaded
+    assert count_tokens("one two three four five six") == 7
+    asyncio.run(llm_context.load_encoding())
+    assert count_tokens("one two three four five six") == 6
+    assert loaded_on and loaded_on[0] != threading.get_ident()
@@ -0,0 +1,76 @@
+import asyncio
+
+from backend.web_service.app import llm_router
+from backend.web_service.app.admission import (
+    AdmissionController,
+    Priority,
+)
+from backend.web_service.app.metrics import metrics
+
+
+def make_router(routes, answers):
+    """A router whose providers answer from ``answers``: (delay, text) each."""
+    admission = AdmissionController.from_env()
+    router = llm_router.LLMRouter(
+        admission,
+        {stage: llm_router.parse_targets(spec) for stage, spec in routes.items()},
+    )
+    cancelled = []
+
+    def provider(name):
+        async def call(target, system, prompt, tools, image):
+            delay, text = answers[name]
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            return llm_router.LLMResult(target, text, response=None)
+
+        return call
+
+    router._openai = provider("openai")
+    router._groq = provider("groq")
+    return router, cancelled
+
+
+def test_llm_router_hedges_slow_calls_and_cancels_the_loser(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_DEFAULT_DELAY", 0.05)
+    router, cancelled = make_router(
+        {"answer": "openai:slow,groq:fast"},
+        {"openai": (5, '{"late": true}'), "groq": (0, '```json\n{"ok": 1}\n```')},
+    )
+
+    names = ("openai.seconds", "openai.cancelled_seconds", "groq.seconds")
+
+    def observed():
+        summaries = [metrics.summary(f"llm.answer.{name}") for name in names]
+        return [summary.count if summary else 0 for summary in summaries]
+
+    before = observed()
+    result = asyncio.run(router.complete("answer", "", "hi", Priority.TEXT, 10))
+
+    assert str(result.target) == "groq:fast"
+    assert result.data == {"ok": 1}
+    assert cancelled == ["openai"]
+    # The loser's cut-short time stays out of the latency hedging is based on
+    assert [after - count for after, count in zip(observed(), before)] == [0, 1, 1]
+
+
+def test_llm_router_skips_invalid_answers_without_waiting(monkeypatch):
+    monkeypatch.setattr(llm_router, "LLM_HEDGE_DEFAULT_DELAY", 5)
+    router, cancelled = make_router(
+        {"answer": "openai:broken,groq:fine"},
+        {"openai": (0, "Sorry, no JSON here"), "groq": (0, '{"ok": 2}')},
+    )
+
+    async def run():
+        started = asyncio.get_running_loop().time()
+        result = await router.complete("answer", "", "hi", Priority.TEXT, 10)
+        return result, asyncio.get_running_loop().time() - started
+
+    result, elapsed = asyncio.run(run())
+
+    assert result.data == {"ok": 2}
+    assert elapsed < 1
+    assert cancelled == []
@@ -0,0 +1,76 @@
+import msgspec
+from backend.web_service.app.schemas import (
+    ChatResponse,
+    Section,
+    StructuredData,
+    to_identification,
+    to_pokemon_data,
+    to_structured_data,
+)
+
+
+def test_to_structured_data_wraps_malformed_output():
+    sections = {"sections": [{"title": "Summary", "content": "Electric mouse"}]}
+    assert to_structured_data(sections, "text") == StructuredData(
+        sections=[Section(title="Summary", content="Electric mouse")]
+    )
+    assert to_structured_data(None, "text") is None
+    assert to_structured_data({"sections": "oops"}, "fallback") == StructuredData(
+        sections=[Section(title="Response", content="fallback")]
+    )
+
+
+def test_to_pokemon_data_keeps_cache_fields_and_rejects_other_shapes():
+    card = to_pokemon_data(
+        {
+            "id": 25,
+            "name": "pikachu",
+            "types": ["electric"],
+            "cache_status": "stale",
+            "last_updated": "2025-03-01T12:00:00",
+            "stale": True,
+            "warning": "Upstream unavailable",
+            "unknown_field": "ignored",
+        }
+    )
+    assert card.name == "pikachu"
+    assert card.cache_status == "stale"
+    assert card.last_updated == "2025-03-01T12:00:00"
+    assert card.stale is True
+    assert card.warning == "Upstream unavailable"
+    assert to_pokemon_data({"id": 1, "name": "bulbasaur"}).stale is False
+
+    assert to_pokemon_data({"error": "Pokemon not found"}) is None
+    assert to_pokemon_data({"chain_id": 10, "stages": []}) is None
+    assert to_pokemon_data([{"id": 25, "name": "pikachu"}]) is None
+
+
+def test_to_identification_defaults_on_bad_shape():
+    identified = to_identification(
+        {"pokemon_identified": True, "pokemon_name": "eevee", "confidence": "high"}
+    )
+    assert identified.pokemon_name == "eevee"
+    assert (
+        to_identification({"pokemon_identified": "maybe?"}).pokemon_identified is False
+    )
+
+
+def test_chat_response_encodes_to_the_frontend_shape():
+    response = ChatResponse(
+        structured_data=StructuredData(sections=[Section("Summary", "Fast")]),
+        text="## Summary\n\nFast",
+        pokemon_data=to_pokemon_data({"id": 25, "name": "pikachu", "stale": True}),
+    )
+
+    encoded = msgspec.json.decode(msgspec.json.encode(response))
+
+    assert encoded["structured_data"] == {
+        "sections": [{"title": "Summary", "content": "Fast"}]
+    }
+    assert encoded["text"] == "## Summary\n\nFast"
+    assert encoded["pokemon_data"]["name"] == "pikachu"
+    assert encoded["pokemon_data"]["stale"] is True
+    assert encoded["pokemon_data"]["types"] == []
+    assert msgspec.json.decode(
+        msgspec.json.encode(ChatResponse(None, "text", None))
+    ) == {"structured_data": None, "text": "text", "pokemon_data": None}
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from backend.web_service.app import search_log
+from backend.web_service.app.search_log import SearchLogger
+
+
+class FakeDatabase:
+    """Stands in for get_db_session, keeping the queries of each INSERT."""
+
+    def __init__(self):
+        self.batches = []
+        self.down = False
+        self.delay = 0
+
+    @asynccontextmanager
+    async def session(self):
+        if self.down:
+            raise ConnectionError("database is down")
+        yield SimpleNamespace(execute=self.execute)
+
+    async def execute(self, statement):
+        await asyncio.sleep(self.delay)
+        params = statement.compile().params
+        rows = sorted(
+            (int(key.rpartition("_m")[2]), value)
+            for key, value in params.items()
+            if key.startswith("query_m")
+        )
+        self.batches.append([query for _, query in rows])
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(search_log, "get_db_session", database.session)
+    return database
+
+
+def test_search_log_flushes_full_batches(database):
+    async def run():
+        logger = SearchLogger(batch_size=2, flush_interval=60, spill_path=None)
+        logger.record("ignored", "chat")
+        logger.start()
+        for query in ["a", "b", "c"]:
+            logger.record(query, "chat", resolved_pokemon=query, latency_ms=5)
+        await asyncio.sleep(0.05)
+        flushed = list(database.batches)
+        await logger.stop()
+        return flushed
+
+    # Nothing is recorded before start; the odd row out waits for stop()
+    assert asyncio.run(run()) == [["a", "b"]]
+    assert database.batches == [["a", "b"], ["c"]]
+
+
+def test_search_log_flushes_on_interval(database):
+    async def run():
+        logger = SearchLogger(batch_size=100, flush_interval=0.05, spill_path=None)
+        logger.start()
+        logger.record("pikachu", "voice")
+        await asyncio.sleep(0.2)
+        flushed = list(database.batches)
+        await logger.stop()
+        return flushed
+
+    assert asyncio.run(run()) == [["pikachu"]]
+
+
+def test_search_log_drains_on_stop(database):
+    async def run():
+        logger = SearchLogger(batch_size=2, flush_interval=60, spill_path=None)
+        logger.start()
+        for query in "abcde":
+            logger.record(query, "chat")
+        await logger.stop()
+        return logger
+
+    logger = asyncio.run(run())
+
+    assert database.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert not logger.pending
+    assert not logger.running
+
+
+def test_search_log_stop_keeps_the_batch_in_flight(database):
+    database.delay = 0.1
+
+    async def run():
+        logger = SearchLogger(batch_size=2, flush_interval=60, spill_path=None)
+        logger.start()
+        for query in "abc":
+            logger.record(query, "chat")
+        await asyncio.sleep(0.01)
+        # The first batch is being written when stop() is called
+        assert [row["query"] for row in logger.pending] == ["c"]
+        await logger.stop()
+        return logger
+
+    logger = asyncio.run(run())
+
+    assert database.batches == [["a", "b"], ["c"]]
+    assert not logger.pending
+
+
+def test_search_log_spills_and_replays(database, tmp_path):
+    spill_path = tmp_path / "searches.jsonl"
+    database.down = True
+
+    async def record_while_down():
+        logger = SearchLogger(
+            batch_size=2, flush_interval=60, max_pending=2, spill_path=str(spill_path)
+        )
+        logger.start()
+        logger.record("a", "chat")
+        logger.record("b", "chat")
+        await asyncio.sleep(0.05)
+        # The failed batch went back in the queue, so this one overflows it
+        logger.record("c", "chat")
+        await logger.stop()
+
+    asyncio.run(record_while_down())
+
+    spilled = [json.loads(line) for line in spill_path.read_text().splitlines()]
+    assert [row["query"] for row in spilled] == ["c", "a", "b"]
+    assert database.batches == []
+
+    database.down = False
+
+    async def restart():
+        logger = SearchLogger(
+            batch_size=10, flush_interval=60, spill_path=str(spill_path)
+        )
+        logger.start()
+        assert [row["query"] for row in logger.pending] == ["c", "a", "b"]
+        await logger.stop()
+
+    asyncio.run(restart())
+
+    assert database.batches == [["c", "a", "b"]]
+    assert not spill_path.exists()
@@ -0,0 +1,155 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from backend.web_service.app import llm_router
+from litestar import Litestar
+from litestar.testing import TestClient
+
+
+def test_pokemon_data_endpoint_supports_conditional_requests(monkeypatch):
+    service = pytest.importorskip("backend.web_service.app.service")
+    tool_output = {
+        "id": 25,
+        "name": "pikachu",
+        "types": ["electric"],
+        "cache_status": "hit",
+        "last_updated": "2025-03-01T12:00:00+00:00",
+    }
+    stale_output = {
+        "id": 6,
+        "name": "charizard",
+        "types": ["fire", "flying"],
+        "cache_status": "stale",
+        "stale": True,
+        "last_updated": "2025-01-01T00:00:00+00:00",
+        "warning": "Upstream unavailable; this cached data may be out of date",
+    }
+    outputs = {"pikachu": tool_output, "charizard": stale_output}
+    calls = []
+
+    class Session:
+        async def call_tool(self, name, arguments):
+            name = arguments["pokemon_name"]
+            data = outputs.get(name)
+            # The first lookup fetches from PokeAPI, later ones hit the cache
+            if name == "pikachu" and name not in calls:
+                data = {**data, "cache_status": "miss"}
+            calls.append(name)
+            text = json.dumps(data or {"error": "Pokemon not found"})
+            return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+    async def get_session():
+        return Session()
+
+    monkeypatch.setattr(service.mcp_client, "get_session", get_session)
+    app = Litestar(route_handlers=[service.get_pokemon_data])
+
+    with TestClient(app) as client:
+        response = client.get("/service/pokemon/pikachu")
+        assert response.status_code == 200
+        assert response.json()["name"] == "pikachu"
+        assert response.json()["cache_status"] == "miss"
+        assert response.headers["last-modified"] == "Sat, 01 Mar 2025 12:00:00 GMT"
+        assert "max-age" in response.headers["cache-control"]
+        etag = response.headers["etag"]
+        assert etag.startswith("W/")
+
+        # The copy from the miss is still current once the cache serves a hit
+        revalidated = client.get(
+            "/service/pokemon/pikachu", headers={"if-none-match": etag}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+        hit = client.get("/service/pokemon/pikachu")
+        assert hit.json()["cache_status"] == "hit"
+        assert hit.headers["etag"] == etag
+
+        since = client.get(
+            "/service/pokemon/pikachu",
+            headers={"if-modified-since": "Sat, 01 Mar 2025 12:00:00 GMT"},
+        )
+        assert since.status_code == 304
+        changed = client.get(
+            "/service/pokemon/pikachu", headers={"if-none-match": '"25-0"'}
+        )
+        assert changed.status_code == 200
+
+        assert response.json()["stale"] is False
+        assert response.json()["warning"] is None
+
+        stale = client.get("/service/pokemon/charizard")
+        assert stale.status_code == 200
+        assert stale.json()["stale"] is True
+        assert stale.json()["warning"] == stale_output["warning"]
+        assert stale.json()["last_updated"] == stale_output["last_updated"]
+        assert stale.json()["cache_status"] == "stale"
+        assert stale.headers["cache-control"] == service.STALE_CACHE_CONTROL
+        assert stale.headers["last-modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+
+        assert client.get("/service/pokemon/missingno").status_code == 404
+    assert calls == ["pikachu"] * 5 + ["charizard", "missingno"]
+
+
+def test_process_query_calls_tools_concurrently(monkeypatch):
+    service = pytest.importorskip("backend.web_service.app.service")
+    in_flight = peak = 0
+
+    class Session:
+        async def call_tool(self, name, arguments):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            data = {"tool": name, **arguments}
+            return SimpleNamespace(
+                content=[SimpleNamespace(text=json.dumps(data))],
+                model_dump_json=lambda: json.dumps(data),
+            )
+
+        async def list_tools(self):
+            return SimpleNamespace(tools=[])
+
+    class Router:
+        async def complete(self, stage, system, prompt, *args, **kwargs):
+            if stage == "routing":
+                return SimpleNamespace(
+                    target="fake",
+                    response=None,
+                    tool_calls=[
+                        llm_router.ToolCall(
+                            "get_evolution_chain", {"pokemon_name": "eevee"}
+                        ),
+                        llm_router.ToolCall(
+                            "get_basic_pokemon_data", {"pokemon_name": "eevee"}
+                        ),
+                        llm_router.ToolCall(
+                            "get_basic_pokemon_data", {"pokemon_name": "espeon"}
+                        ),
+                    ],
+                )
+            prompts.append(prompt)
+            sections = [{"title": "Pokémon", "content": "Eevee"}]
+            return SimpleNamespace(response=None, data={"sections": sections}, text="")
+
+    prompts = []
+    monkeypatch.setattr(service.mcp_client, "session", Session(), raising=False)
+    monkeypatch.setattr(service, "llm_router", Router())
+
+    result = asyncio.run(service.mcp_client.process_query("eevee and espeon?"))
+
+    assert peak == 3
+    # The card is the first pokemon the model looked up, not the last
+    assert result["raw_data"] == {
+        "tool": "get_basic_pokemon_data",
+        "pokemon_name": "eevee",
+    }
+    # Results reach the answer prompt in the order the model asked for them
+    tool_results = prompts[0].partition("Tool results:")[2]
+    assert tool_results.index("get_evolution_chain") < tool_results.index("espeon")
+    assert service.card_data([]) is None
+    assert service.card_data([("get_evolution_chain", {"id": 1})]) == {"id": 1}
@@ -0,0 +1,68 @@
+import asyncio
+import io
+
+import pytest
+from backend.web_service.app import sprite_matcher
+
+
+@pytest.fixture
+def make_sprite():
+    """Build sprites with the vision extra, skipping the test without it."""
+    np = pytest.importorskip("numpy")
+    Image = pytest.importorskip("PIL.Image")
+
+    def make(seed):
+        # A 4x6 grid of random colour blocks stands in for pixel art
+        blocks = np.random.default_rng(seed).integers(0, 256, (6, 4, 3))
+        pixels = np.zeros((96, 96, 4), dtype="uint8")
+        pixels[20:80, 28:68, :3] = blocks.repeat(10, axis=0).repeat(10, axis=1)
+        pixels[20:80, 28:68, 3] = 255
+        return Image.fromarray(pixels, "RGBA")
+
+    return make
+
+
+def encode(image, image_format="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def test_sprite_matcher_recognizes_a_screenshot_and_defers_otherwise(
+    tmp_path, make_sprite
+):
+    names = ["bulbasaur", "charmander", "squirtle"]
+    index_path = str(tmp_path / "sprites.npz")
+    sprites = [(name, encode(make_sprite(seed))) for seed, name in enumerate(names)]
+    assert sprite_matcher.write_index(index_path, sprites) == 3
+    matcher = sprite_matcher.SpriteMatcher.load(index_path)
+
+    # Upscaled onto a coloured background and saved as a JPEG, like a screenshot
+    Image = sprite_matcher.Image
+    sprite = make_sprite(1).resize((288, 288), Image.Resampling.NEAREST)
+    screenshot = Image.new("RGB", (400, 360), (40, 90, 160))
+    screenshot.paste(sprite, (50, 30), sprite)
+    match = asyncio.run(matcher.identify(encode(screenshot, "JPEG")))
+    assert match.pokemon_name == "charmander"
+    assert match.similarity > sprite_matcher.SPRITE_MATCH_THRESHOLD
+
+    unknown = asyncio.run(matcher.identify(encode(make_sprite(99))))
+    assert unknown is None
+    assert asyncio.run(matcher.identify(b"not an image")) is None
+
+
+def test_sprite_matcher_rejects_mismatched_indexes(tmp_path, make_sprite):
+    np = sprite_matcher.np
+    index_path = tmp_path / "sprites.npz"
+    np.savez(index_path, vectors=np.zeros((2, 16 * 16 * 3)), names=np.array(["a", "b"]))
+
+    with pytest.raises(ValueError, match=f"{sprite_matcher.FEATURE_LENGTH} features"):
+        sprite_matcher.SpriteMatcher.load(str(index_path))
+
+
+def test_sprite_matcher_failures_defer_to_the_model(make_sprite):
+    np = sprite_matcher.np
+    # An index that slipped past load() with the wrong vector length
+    matcher = sprite_matcher.SpriteMatcher(np.zeros((2, 12)), np.array(["a", "b"]))
+
+    assert asyncio.run(matcher.identify(encode(make_sprite(0)))) is None
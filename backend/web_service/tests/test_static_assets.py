@@ -0,0 +1,111 @@
+import gzip
+
+import pytest
+from backend.web_service.app.static_assets import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    create_static_assets_router,
+    etag_matches,
+    parse_accept_encoding,
+    precompress_directory,
+)
+from litestar import Litestar
+from litestar.testing import TestClient
+
+INDEX_HTML = "<html>" + "<p>Pokédex</p>" * 200 + "</html>"
+APP_JS = "console.log('pikachu');\n" * 200
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "about").mkdir()
+    (tmp_path / "index.html").write_text(INDEX_HTML)
+    (tmp_path / "assets" / "app-3f2a1c.js").write_text(APP_JS)
+    (tmp_path / "assets" / "logo-9b8e7d.png").write_bytes(b"\x89PNG" + b"\0" * 2000)
+    (tmp_path / "about" / "index.html").write_text("<html>about</html>")
+    (tmp_path / "404.html").write_text("<html>not found</html>")
+    return tmp_path
+
+
+def make_client(directory):
+    router = create_static_assets_router(directory=str(directory), path="/")
+    return TestClient(Litestar(route_handlers=[router]))
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.5, identity;q=0, *;q=0.1") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "identity": 0.0,
+        "*": 0.1,
+    }
+    assert parse_accept_encoding("br;q=oops, ,") == {"br": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+def test_etag_matches_weakly():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"anything"')
+    assert not etag_matches('"a"', '"b"')
+
+
+def test_precompress_directory_skips_small_and_binary_files(build_dir):
+    written = precompress_directory(str(build_dir))
+
+    # index.html and the JS bundle get .br and .gz; the PNG and small pages don't
+    assert written == 4
+    assert gzip.decompress((build_dir / "index.html.gz").read_bytes()).decode() == (
+        INDEX_HTML
+    )
+    assert (build_dir / "assets" / "app-3f2a1c.js.br").exists()
+    assert not (build_dir / "assets" / "logo-9b8e7d.png.gz").exists()
+    assert not (build_dir / "about" / "index.html.gz").exists()
+
+
+def test_static_assets_pick_the_best_variant(build_dir):
+    precompress_directory(str(build_dir))
+
+    with make_client(build_dir) as client:
+        path = "/assets/app-3f2a1c.js"
+        brotli = client.get(path, headers={"accept-encoding": "gzip, br"})
+        assert brotli.headers["content-encoding"] == "br"
+        assert brotli.headers["vary"] == "Accept-Encoding"
+        assert brotli.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+        assert brotli.text == APP_JS
+
+        gzipped = client.get(path, headers={"accept-encoding": "gzip, br;q=0"})
+        assert gzipped.headers["content-encoding"] == "gzip"
+        assert gzipped.text == APP_JS
+
+        identity = client.get(path, headers={"accept-encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.content == APP_JS.encode()
+        assert len({brotli.headers["etag"], gzipped.headers["etag"]}) == 2
+
+
+def test_static_assets_revalidate_and_fall_back(build_dir):
+    with make_client(build_dir) as client:
+        index = client.get("/", headers={"accept-encoding": "identity"})
+        assert index.status_code == 200
+        assert index.text == INDEX_HTML
+        assert index.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+        assert "last-modified" in index.headers
+
+        cached = client.get(
+            "/",
+            headers={
+                "accept-encoding": "identity",
+                "if-none-match": index.headers["etag"],
+            },
+        )
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        assert client.get("/about/").text == "<html>about</html>"
+
+        missing = client.get("/no/such/page")
+        assert missing.status_code == 404
+        assert missing.text == "<html>not found</html>"
+
+        assert client.post("/").status_code == 405
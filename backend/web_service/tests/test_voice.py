@@ -0,0 +1,78 @@
+import json
+
+from backend.web_service.app.schemas import ChatResponse, Section, StructuredData
+from backend.web_service.app.voice import VoiceSession
+from litestar import Litestar, WebSocket, websocket
+from litestar.testing import TestClient
+
+
+def test_voice_session_answers_each_utterance_on_one_socket():
+    transcribed = []
+
+    async def transcribe(audio_data):
+        transcribed.append(audio_data)
+        return " pikachu " if audio_data.startswith(b"pika") else ""
+
+    async def answer(query, on_section):
+        sections = [Section(title="Summary", content=query), Section("Stats", "fast")]
+        for section in sections:
+            await on_section(section)
+        return ChatResponse(StructuredData(sections), f"## {query}", None)
+
+    @websocket("/voice")
+    async def voice(socket: WebSocket) -> None:
+        await VoiceSession(socket, transcribe, answer).run()
+
+    with TestClient(Litestar(route_handlers=[voice])) as client:
+        with client.websocket_connect("/voice") as socket:
+            socket.send_bytes(b"pika")
+            socket.send_bytes(b"chu")
+            socket.send_text(json.dumps({"type": "end"}))
+
+            assert socket.receive_json() == {
+                "type": "transcript",
+                "transcript": "pikachu",
+            }
+            assert socket.receive_json()["section"]["content"] == "pikachu"
+            assert socket.receive_json()["index"] == 1
+            assert socket.receive_json() == {
+                "type": "done",
+                "text": "## pikachu",
+                "pokemon_data": None,
+            }
+
+            socket.send_bytes(b"static")
+            socket.send_text(json.dumps({"type": "end"}))
+            assert socket.receive_json()["type"] == "error"
+
+    assert transcribed == [b"pikachu", b"static"]
+
+
+def test_voice_session_streams_sections_before_the_answer_is_done():
+    async def transcribe(audio_data):
+        return "mewtwo"
+
+    async def answer(query, on_section):
+        await on_section(Section(title="Summary", content=query))
+        raise RuntimeError("answer model went away")
+
+    @websocket("/voice")
+    async def voice(socket: WebSocket) -> None:
+        await VoiceSession(socket, transcribe, answer).run()
+
+    with TestClient(Litestar(route_handlers=[voice])) as client:
+        with client.websocket_connect("/voice") as socket:
+            socket.send_bytes(b"mewtwo")
+            socket.send_text(json.dumps({"type": "end"}))
+
+            assert socket.receive_json()["type"] == "transcript"
+            # The first section went out before the answer failed
+            assert socket.receive_json() == {
+                "type": "section",
+                "index": 0,
+                "section": {"title": "Summary", "content": "mewtwo"},
+            }
+            assert socket.receive_json() == {
+                "type": "error",
+                "error": "answer model went away",
+            }